@@ -0,0 +1,72 @@
+"""Compares the tokenizing newick parser with the previous ETE based parser on random trees.
+Run from the CRAAnVis folder: python -m benchmarks.newick_parser_benchmark [number of leaves ...]"""
+
+import random
+import sys
+import time
+
+from benchmarks.ete_newick_parser import _read_newick_from_string, compile_matchers
+from model.newick_parser import _read_newick
+from model.tree import TreeNode
+
+DEFAULT_LEAF_COUNTS = [1000, 10000, 100000]
+REPEATS = 3
+
+
+def produce_random_newick(n_leaves: int, seed: int = 0) -> str:
+    """Random binary tree with named leaves and inner nodes and distances on all nodes but the root."""
+    rng = random.Random(seed)
+    subtrees = [f"L{ix}_{rng.randrange(10 ** 6)}:{rng.uniform(0.01, 2):.5f}" for ix in range(n_leaves)]
+    inner_ix = 0
+    while len(subtrees) > 1:
+        right = subtrees.pop(rng.randrange(len(subtrees)))
+        left = subtrees.pop(rng.randrange(len(subtrees)))
+        inner_ix += 1
+        subtrees.append(f"({left},{right})Inner{inner_ix}:{rng.uniform(0.01, 2):.5f}")
+    return subtrees[0].rsplit(":", 1)[0] + ";"
+
+
+def best_time(parse, newick: str) -> float:
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        tree = parse(newick)
+        times.append(time.perf_counter() - start)
+        # freeing the tree is not part of the parsing time
+        del tree
+    return min(times)
+
+
+def parse_tokenized(newick: str) -> TreeNode:
+    return _read_newick(newick, TreeNode())
+
+
+def parse_ete(newick: str) -> TreeNode:
+    return _read_newick_from_string(newick, TreeNode(), compile_matchers(1), 1, False)
+
+
+def same_tree(tree: TreeNode, other_tree: TreeNode) -> bool:
+    nodes, other_nodes = list(tree.traverse()), list(other_tree.traverse())
+    if len(nodes) != len(other_nodes):
+        return False
+    for node, other_node in zip(nodes, other_nodes):
+        if (node.name, node.distance, len(node.children)) != \
+                (other_node.name, other_node.distance, len(other_node.children)):
+            return False
+    return True
+
+
+def main(leaf_counts):
+    print(f"{'leaves':>8} {'characters':>11} {'ete parser':>11} {'tokenizing':>11} {'speedup':>8}")
+    for n_leaves in leaf_counts:
+        newick = produce_random_newick(n_leaves)
+        if not same_tree(parse_tokenized(newick), parse_ete(newick)):
+            raise RuntimeError(f"Parsers disagree on the tree with {n_leaves} leaves")
+        ete_time = best_time(parse_ete, newick)
+        tokenized_time = best_time(parse_tokenized, newick)
+        print(f"{n_leaves:>8} {len(newick):>11} {ete_time:>10.3f}s {tokenized_time:>10.3f}s "
+              f"{ete_time / tokenized_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_LEAF_COUNTS)
@@ -1,6 +1,7 @@
 from PyQt6.QtCore import Qt, QSettings
 from PyQt6.QtGui import QFont, QPen, QColor
 
+from model.helper_functions import clear_font_fit_cache
 from view.colors.colors import TreeSignalManager
 
 EVENT_WIDTH = 20
@@ -24,6 +25,17 @@ class AppConfig:
         self.headless_render_type = []  # select ["pdf"] or  ["png"] or both ["pdf", "png"]
         self.headless_output_folder_path = ""
         self.zoom_factor = 1.1
+        # built models are cached on disk, keyed by the names, sizes and modification times of the input files
+        self.use_model_cache = True
+        # models of a batch of groups kept in memory, switching between them is instant
+        self.max_loaded_group_models = 4
+
+        # Level of Detail Settings
+        # items drop text, then outlines and color splits, then draw flat color runs below these scales
+        self.level_of_detail = True
+        self.lod_text_scale = 0.4
+        self.lod_outline_scale = 0.2
+        self.lod_flat_scale = 0.1
 
         # Pdf Settings
         self.pdf_width = 1200
@@ -90,6 +102,8 @@ class AppConfig:
         self.event_width = EVENT_WIDTH
         self.event_height = self.event_width
         self.event_font = QFont("Courier New", int(self.event_width / 2.7))
+        # label fonts are fitted once per font, text and width, start over with the new font settings
+        clear_font_fit_cache()
         self.event_line_width = 2
 
         self.leaf_text_height = self.spacer_height
@@ -101,6 +115,8 @@ class AppConfig:
         self.min_array_tree_ratio = 0.33
         self.max_array_tree_ratio = 0.66
         self.scaling_optimization_rounds = 300
+        # "sampled" evaluates a grid of scale factors, "exact" solves on the linear pieces of the tree size
+        self.scaling_mode = "sampled"
 
         # Event Settings
         self.event_color_mode = "horizontal"
@@ -1,4 +1,4 @@
-from typing import List, Dict, Tuple
+from typing import List, Dict
 
 from model.helper_functions import flatten
 
@@ -25,22 +25,143 @@ class ArrayData:
         self.spacers.append(spacer)
 
 
-def find_singular_stretches(sg_events: set, template: List[SpacerData]) -> List[List[Tuple[int, str]]]:
-    """Find singular stretches of spacer gains in the template array."""
-    indices = [spacer.index for spacer in template if spacer.name in sg_events]
-    names = [spacer.name for spacer in template if spacer.name in sg_events]
-    singular_stretches = []
-    if len(indices) > 0:
-        current_stretch = [(indices[0], names[0])]
-        for i in range(1, len(indices)):
-            if indices[i] == indices[i-1] + 1:
-                current_stretch.append((indices[i], names[i]))
-            else:
-                singular_stretches.append(current_stretch)
-                current_stretch = [(indices[i], names[i])]
-        singular_stretches.append(current_stretch)
-
-    return singular_stretches
+# cell codes of the presence matrix
+ABSENT = 0
+PRESENT = 1
+DELETED = 2
+
+
+class PresenceMatrix:
+    """Compact presence/absence matrix of all arrays.
+
+    Rows are arrays, columns are template indices. Each cell holds one byte (ABSENT, PRESENT or DELETED),
+    rows are stored back to back in a single bytearray. Column and row reductions run on slices of that
+    bytearray, so counting is done in C instead of nested Python loops.
+    """
+    def __init__(self, n_columns: int = 0):
+        self.n_columns = n_columns
+        self.data = bytearray()
+        self.row_names: List[str] = []
+        self.row_index: Dict[str, int] = {}
+
+    @property
+    def n_rows(self):
+        return len(self.row_names)
+
+    def __len__(self):
+        return len(self.row_names)
+
+    def __contains__(self, name):
+        return name in self.row_index
+
+    def add_row(self, name: str, codes) -> int:
+        """Append a row of cell codes and return its row number."""
+        codes = bytes(codes)
+        if len(codes) != self.n_columns:
+            raise ValueError(f"Array {name} has length {len(codes)}, expected {self.n_columns}")
+        if name in self.row_index:
+            raise ValueError(f"Array {name} already in presence matrix")
+        self.row_index[name] = len(self.row_names)
+        self.row_names.append(name)
+        self.data.extend(codes)
+        return self.row_index[name]
+
+    def row(self, name: str) -> memoryview:
+        """Return a read-only view of the cell codes of one array."""
+        start = self.row_index[name] * self.n_columns
+        return memoryview(self.data)[start:start + self.n_columns].toreadonly()
+
+    def value(self, name: str, column: int) -> int:
+        return self.data[self.row_index[name] * self.n_columns + column]
+
+    def column_counts(self, *codes, rows: List[str] = None) -> List[int]:
+        """Count the cells holding one of the given codes per column, optionally restricted to some rows."""
+        data = self._sub_matrix(rows)
+        n_columns = self.n_columns
+        return [sum(data[col::n_columns].count(code) for code in codes) for col in range(n_columns)]
+
+    def row_counts(self, *codes, rows: List[str] = None) -> Dict[str, int]:
+        """Count the cells holding one of the given codes per row."""
+        if rows is None:
+            rows = self.row_names
+        n_columns = self.n_columns
+        counts = {}
+        for name in rows:
+            start = self.row_index[name] * n_columns
+            counts[name] = sum(self.data.count(code, start, start + n_columns) for code in codes)
+        return counts
+
+    def column_frequencies(self, *codes, rows: List[str] = None) -> List[float]:
+        """Share of rows holding one of the given codes per column."""
+        n_rows = self.n_rows if rows is None else len(rows)
+        if n_rows == 0:
+            return [0.0] * self.n_columns
+        return [count / n_rows for count in self.column_counts(*codes, rows=rows)]
+
+    def _sub_matrix(self, rows):
+        if rows is None:
+            return self.data
+        n_columns = self.n_columns
+        sub_matrix = bytearray()
+        for name in rows:
+            start = self.row_index[name] * n_columns
+            sub_matrix += self.data[start:start + n_columns]
+        return sub_matrix
+
+
+class SpacerBitsets:
+    """Maps spacer names to bits so sets of spacers can be stored and combined as plain ints.
+
+    Bit i stands for the spacer at template index i, spacer names missing in the template get bits behind
+    the template. Union, intersection and difference of spacer sets become |, & and & ~.
+    """
+    def __init__(self, spacer_names=None):
+        self.name_bit_ix: Dict[str, int] = {}
+        self.bit_ix_names: List[str] = []
+        if spacer_names is None:
+            spacer_names = []
+        for name in spacer_names:
+            self.bit_index(name)
+
+    def bit_index(self, name) -> int:
+        name = str(name)
+        bit_ix = self.name_bit_ix.get(name)
+        if bit_ix is None:
+            bit_ix = len(self.bit_ix_names)
+            self.name_bit_ix[name] = bit_ix
+            self.bit_ix_names.append(name)
+        return bit_ix
+
+    def bit(self, name) -> int:
+        return 1 << self.bit_index(name)
+
+    def encode(self, names) -> int:
+        """Encode an iterable of spacer names (str or int) as bitset."""
+        bits = 0
+        for name in names:
+            bits |= 1 << self.bit_index(name)
+        return bits
+
+    def contains(self, bits: int, name) -> bool:
+        bit_ix = self.name_bit_ix.get(str(name))
+        return bit_ix is not None and (bits >> bit_ix) & 1 == 1
+
+    @staticmethod
+    def indices(bits: int) -> List[int]:
+        """Return the set bit positions (template indices for template spacers) in increasing order."""
+        indices = []
+        while bits:
+            lowest_bit = bits & -bits
+            indices.append(lowest_bit.bit_length() - 1)
+            bits ^= lowest_bit
+        return indices
+
+    def decode(self, bits: int) -> List[str]:
+        return [self.bit_ix_names[bit_ix] for bit_ix in self.indices(bits)]
+
+    @staticmethod
+    def count(bits: int) -> int:
+        return bin(bits).count("1")
 
 
 def find_duplicates(spacer_names_to_numbers):
@@ -79,7 +200,6 @@ def add_array_model(data, model_container):
 
     leaf_rec_spacers = {k: v for k, v in rec_spacers.items() if not k.startswith('Inner')}
     array_names = list(leaf_rec_spacers.keys())
-    number_of_arrays = len(array_names)
 
     if 'metadata' in data:
         metadata = data['metadata']
@@ -105,75 +225,92 @@ def add_array_model(data, model_container):
     model_container.add_template_array(template_array)
 
     # produce all other arrays
-    array_names_losses = leaf_losses_dictionary(model_container.tree)
-
-    for x in range(len(array_names)):
-        new_array = []
-        new_array_name = array_names[x]
-        spacers_existing = leaf_rec_spacers[new_array_name]
-        names_of_deleted_spacers = array_names_losses[new_array_name]
-
-        for exists, spacer_data in zip(spacers_existing, model_container.template.spacers):
-            if exists == 1:
-                new_array.append(1)
-            elif spacer_data.name in names_of_deleted_spacers:
-                new_array.append("d")
+    array_names_losses = model_container.get_upstream_losses()
+    presence_matrix = PresenceMatrix(array_length)
+
+    for new_array_name in array_names:
+        new_array = rec_spacer_codes(new_array_name, leaf_rec_spacers[new_array_name], array_length)
+        mark_deleted_spacers(new_array, array_names_losses[new_array_name])
+        presence_matrix.add_row(new_array_name, new_array)
+    model_container.presence_matrix = presence_matrix
+
+    # add frequencies to template arrays, only the leaf arrays count
+    sp_frequencies = presence_matrix.column_frequencies(PRESENT)
+    sp_d_frequencies = presence_matrix.column_frequencies(PRESENT, DELETED)
+    for spacer, sp_frequency, sp_d_frequency in zip(template_array.spacers, sp_frequencies, sp_d_frequencies):
+        spacer.metadata["sp_frequency"] = sp_frequency
+        spacer.metadata["sp_d_frequency"] = sp_d_frequency
+
+    # the arrays reconstructed at the inner nodes follow the leaf arrays
+    inner_array_names = []
+    if model_container.tree:
+        array_names_gains = model_container.get_upstream_gains()
+        for node in model_container.tree.traverse():
+            if node.is_leaf() or node.name in presence_matrix:
+                continue
+            if node.name in rec_spacers:
+                new_array = rec_spacer_codes(node.name, rec_spacers[node.name], array_length)
             else:
-                new_array.append(0)
-
-        model_container.arrays_dict[new_array_name] = new_array
-
-    # add frequencies to template arrays
-    for x in range(array_length):
-        sp_count = 0
-        sp_d_count = 0
-
-        for array in model_container.arrays_dict.values():
-            if array[x] in [1, "d"]:
-                sp_d_count += 1
-                if array[x] == 1:
-                    sp_count += 1
-        model_container.template.spacers[x].metadata["sp_frequency"] = sp_count/number_of_arrays
-        model_container.template.spacers[x].metadata["sp_d_frequency"] = sp_d_count/number_of_arrays
+                new_array = bytearray(array_length)
+                present_bits = array_names_gains[node.name] & ~array_names_losses[node.name]
+                for ix in SpacerBitsets.indices(present_bits):
+                    if ix < array_length:
+                        new_array[ix] = PRESENT
+            mark_deleted_spacers(new_array, array_names_losses[node.name])
+            presence_matrix.add_row(node.name, new_array)
+            inner_array_names.append(node.name)
+    model_container.inner_array_names = inner_array_names
 
     return model_container
 
 
-def gather_upstream_losses(node, node_set) -> set:
-    """Recursively gather upstream losses"""
-    node_set.update(str(x) for x in flatten(node.events["losses"]))
-    if node.parent:
-        node_set.update(gather_upstream_losses(node.parent, node_set))
-    return node_set
+def rec_spacer_codes(array_name: str, rec_vector, array_length: int) -> bytearray:
+    """Cell codes of a reconstructed array, a vector shorter than the template is padded with ABSENT."""
+    codes = bytearray(rec_vector[:array_length])
+    if len(codes) < array_length:
+        print(f"Array {array_name} has {len(codes)} spacers but the template has {array_length}, "
+              f"the missing spacers are shown as absent.")
+        codes.extend(bytes(array_length - len(codes)))
+    return codes
 
 
-def gather_upstream_gains(node, node_set) -> set:
-    """Recursively gather upstream gains"""
-    node_set.update(str(x) for x in node.events["gains"])
-    node_set.update(str(x) for x in node.events["contradictions"])
-    node_set.update(str(x) for x in node.events["duplications"])
-    node_set.update(str(x) for x in node.events["rearrangements"])
-    node_set.update(str(x) for x in node.events["double_gains"])
-    node_set.update(str(x) for x in node.events["independent_gains"])
-    if node.parent:
-        node_set.update(gather_upstream_gains(node.parent, node_set))
-    return node_set
+def mark_deleted_spacers(codes: bytearray, losses: int):
+    """Mark the absent spacers lost on the way from the root as DELETED."""
+    array_length = len(codes)
+    for ix in SpacerBitsets.indices(losses):
+        if ix < array_length and codes[ix] == ABSENT:
+            codes[ix] = DELETED
 
 
-def leaf_losses_dictionary(root) -> Dict[str, set]:
-    """Produce dictionary leafnames : upstream_losses_set."""
-    leaf_losses = {}
-    for node in root.traverse():
-        if node.is_leaf():
-            leaf_losses[node.name] = set()
-            gather_upstream_losses(node, leaf_losses[node.name])
-    return leaf_losses
+# event types counting as insertion of a spacer into the array of a node and its descendants
+UPSTREAM_GAIN_TYPES = ("gains", "contradictions", "duplications", "rearrangements", "double_gains",
+                       "independent_gains")
+UPSTREAM_LOSS_TYPES = ("losses",)
 
 
-def get_node_by_name(root, name):
-    return_node = None
+def encode_node_events(root, spacer_bitsets: SpacerBitsets) -> Dict[str, Dict[str, int]]:
+    """Produce dictionary nodename : {event_type : bitset of the spacers of that event type}."""
+    node_event_bits = {}
     for node in root.traverse():
-        if node.name == name:
-            return_node = node
-            break
-    return return_node
+        node_event_bits[node.name] = {event_type: spacer_bitsets.encode(flatten(event_list))
+                                      for event_type, event_list in node.events.items()}
+    return node_event_bits
+
+
+def propagate_upstream_events(root, event_types, node_event_bits: Dict[str, Dict[str, int]]) -> Dict[object, int]:
+    """Collect the spacers of event_types on the path from the root to every node in one top-down pass.
+
+    Returns a dictionary node : bitset of spacers. A node without new spacers shares the int of its parent,
+    so memory only grows with the number of events and not with leaves x depth.
+    """
+    upstream_bits = {}
+    for node in root.traverse():  # level order, parents are visited before their children
+        inherited = upstream_bits[node.parent] if node.parent else 0
+        own = 0
+        for event_type in event_types:
+            own |= node_event_bits[node.name][event_type]
+        if own & ~inherited:
+            upstream_bits[node] = inherited | own
+        else:
+            upstream_bits[node] = inherited
+    return upstream_bits
@@ -1,7 +1,132 @@
-import glob
 import json
+import logging
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List
 
+logger = logging.getLogger(__name__)
+
+# the files of a folder are read and parsed on a few threads, this hides the latency of network drives
+FILE_READ_WORKERS = 4
+# characters read at once by JsonObjectStream
+JSON_CHUNK_SIZE = 1 << 16
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class JsonObjectStream:
+    """Reads the members of JSON objects from a text file one at a time.
+
+    Large documents are never held as one string or as one nested Python object: iter_object() yields the keys
+    of an object, and the caller consumes each value before asking for the next key, either with decode_value()
+    or by iterating the nested object with iter_object(). iter_items() yields the members of an object whose
+    values are small enough to be decoded as a whole.
+    """
+    def __init__(self, file, chunk_size=JSON_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def read_chunk(self, size=None) -> bool:
+        chunk = self.file.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next character that is not whitespace, an empty string at the end of the file."""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.read_chunk():
+                return ""
+
+    def consume(self, char):
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def decode_value(self):
+        """Decode the next JSON value."""
+        self.peek()
+        # a value that continues behind the buffer is decoded again from its start once more is read, doubling
+        # the read size keeps the time linear in the size of the value
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # a number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.read_chunk(read_size)
+            read_size *= 2
+
+    def iter_object(self):
+        """Yield the keys of the object at the current position, see the class docstring."""
+        self.consume('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.decode_value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError("Expecting property name", self.buffer, self.pos)
+            self.consume(':')
+            yield key
+            if self.peek() == '}':
+                self.pos += 1
+                return
+            self.consume(',')
+
+    def iter_items(self):
+        """Yield (key, value) of the members of the object at the current position."""
+        self.consume('{')
+        skip_whitespace = _JSON_WHITESPACE.match
+        # the scanner of the decoder, raw_decode without its wrapping
+        scan_once = self.decoder.scan_once
+        # like in decode_value, the read size doubles while one member does not fit into the buffer
+        read_size = self.chunk_size
+        while True:
+            buffer = self.buffer
+            try:
+                pos = skip_whitespace(buffer, self.pos).end()
+                if buffer[pos] == '}':
+                    self.pos = pos + 1
+                    return
+                key, pos = scan_once(buffer, pos)
+                pos = skip_whitespace(buffer, pos).end()
+                if buffer[pos] != ':' or not isinstance(key, str):
+                    raise json.JSONDecodeError("Expecting property name and ':'", buffer, pos)
+                value, pos = scan_once(buffer, skip_whitespace(buffer, pos + 1).end())
+                # the separator behind the value is in the buffer, so a number can not continue in the next chunk
+                pos = skip_whitespace(buffer, pos).end()
+                separator = buffer[pos]
+            except (IndexError, StopIteration, json.JSONDecodeError):
+                # the member continues in the next chunk, decode it again once the chunk is read
+                if not self.read_chunk(read_size):
+                    raise json.JSONDecodeError("Unterminated object", self.buffer, self.pos)
+                read_size *= 2
+                continue
+            if separator not in ',}':
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            read_size = self.chunk_size
+            self.pos = pos + 1
+            yield key, value
+            if separator == '}':
+                return
+
 
 def read_newick(file_path) -> str:
     """
@@ -23,12 +148,18 @@ def read_newick(file_path) -> str:
 
 def read_rec_spacers(file_path) -> Dict:
     """
-    Read rec_spacers.json file into a DataFrame.
-    :return: DataFrame representing rec_spacers
+    Read rec_spacers.json file. The presence vectors are decoded one at a time into bytes.
+    :return: dict representing rec_spacers
     """
     try:
         with open(file_path, 'r') as file:
-            rec_spacers = json.load(file)
+            stream = JsonObjectStream(file)
+            rec_spacers = {}
+            for key in stream.iter_object():
+                if key == 'rec_spacers':
+                    rec_spacers[key] = {array_name: bytes(vector) for array_name, vector in stream.iter_items()}
+                else:
+                    rec_spacers[key] = stream.decode_value()
         return rec_spacers
     except FileNotFoundError:
         print("rec_spacers.json file not found.")
@@ -70,7 +201,7 @@ def read_rec_gains_losses(file_path) -> Dict[str, Dict[str, List[str]]]:
     """
     try:
         with open(file_path, 'r') as file:
-            rec_gains_losses = json.load(file)
+            rec_gains_losses = read_node_events(file)
         return rec_gains_losses
     except FileNotFoundError:
         print("rec_gains_losses.json file not found.")
@@ -82,16 +213,32 @@ def read_other_events(file_path) -> Dict[str, Dict[str, List[str]]]:
     Read other_events.json file.
     :return: dict representing other_events
     """
-    print(file_path)
     try:
         with open(file_path, 'r') as file:
-            other_events = json.load(file)
+            other_events = read_node_events(file)
         return other_events
     except FileNotFoundError:
         print("other_events.json file not found.")
         return {}
 
 
+def read_node_events(file) -> Dict[str, Any]:
+    """Read a file of the form {category: {node name: event list}} node by node.
+
+    Only the event lists of one node are decoded at a time. The lists are the ones TreeNode.set_events stores,
+    the dictionaries by node name are dropped once the tree is built. The events are not decoded into the nodes
+    here, the files are read before the tree is parsed.
+    """
+    stream = JsonObjectStream(file)
+    node_events = {}
+    for category in stream.iter_object():
+        if stream.peek() == '{':
+            node_events[category] = dict(stream.iter_items())
+        else:
+            node_events[category] = stream.decode_value()
+    return node_events
+
+
 def read_json_metadata(file_path) -> Dict[str, Any]:
     """
     Read metadata.json file.
@@ -133,50 +280,80 @@ def deserialize_metadata(serialized_data):
     return deserialized_data
 
 
-def read_all_folder_data(folder_path: str) -> Dict[str, Any]:
+# file name endings of the SpacerPlacer output files, the metadata file is optional
+FOLDER_FILE_TYPES = [".nwk",
+                     "_rec_spacers.json",
+                     "_top_order.json",
+                     "_spacer_names_to_numbers.json",
+                     "_rec_gains_losses.json",
+                     "_other_events.json",
+                     "_metadata.json"]
+# files a folder needs to hold to be read as a SpacerPlacer result
+REQUIRED_FILE_TYPES = [file_type for file_type in FOLDER_FILE_TYPES if file_type != "_metadata.json"]
+
+
+def read_all_folder_data(folder_path: str, file_paths: Dict[str, str] = None) -> Dict[str, Any]:
     """
     Runs all the read functions and stores their output in a dictionary.
     :param folder_path: string representing the directory path
+    :param file_paths: file type : file path as returned by find_file_paths, searched in folder_path if None
     :return: dictionary storing the output of all read functions
     """
-    file_paths = find_file_paths(folder_path,
-                                 [".nwk",
-                                  "_rec_spacers.json",
-                                  "_top_order.json",
-                                  "_spacer_names_to_numbers.json",
-                                  "_rec_gains_losses.json",
-                                  "_other_events.json",
-                                  "_metadata.json"])
-
-    data = {'newick': read_newick(file_paths['.nwk']),
-            'rec_spacers': read_rec_spacers(file_paths['_rec_spacers.json']),
-            'top_order': read_top_order(file_paths['_top_order.json']),
-            'spacer_names_to_numbers': read_spacer_names_to_numbers(file_paths['_spacer_names_to_numbers.json']),
-            'rec_gains_losses': read_rec_gains_losses(file_paths['_rec_gains_losses.json']),
-            'other_events': read_other_events(file_paths['_other_events.json'])}
+    if file_paths is None:
+        file_paths = find_file_paths(folder_path, FOLDER_FILE_TYPES)
 
+    # data key : (read function, file path), a missing file raises the KeyError here as before
+    reads = {'newick': (read_newick, file_paths['.nwk']),
+             'rec_spacers': (read_rec_spacers, file_paths['_rec_spacers.json']),
+             'top_order': (read_top_order, file_paths['_top_order.json']),
+             'spacer_names_to_numbers': (read_spacer_names_to_numbers, file_paths['_spacer_names_to_numbers.json']),
+             'rec_gains_losses': (read_rec_gains_losses, file_paths['_rec_gains_losses.json']),
+             'other_events': (read_other_events, file_paths['_other_events.json'])}
     if '_metadata.json' in file_paths:
-        data['metadata'] = read_json_metadata(file_paths['_metadata.json'])
+        reads['metadata'] = (read_json_metadata, file_paths['_metadata.json'])
+
+    def timed_read(read_function, file_path):
+        start = time.perf_counter()
+        result = read_function(file_path)
+        return result, time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(FILE_READ_WORKERS, len(reads))) as executor:
+        futures = {key: executor.submit(timed_read, read_function, file_path)
+                   for key, (read_function, file_path) in reads.items()}
+        data = {}
+        read_times = {}
+        for key, future in futures.items():
+            data[key], read_times[key] = future.result()
 
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Read %s in %.1f ms: %s", folder_path, (time.perf_counter() - start) * 1000,
+                     ", ".join(f"{os.path.basename(reads[key][1])} {read_time * 1000:.1f} ms"
+                               for key, read_time in read_times.items()))
     return data
 
 
-def find_file_paths(folder_path, file_types):
+def find_file_paths(folder_path, file_types, report_missing=True):
     """
-    Find all files in a folder with a certain file type.
+    Find all files in a folder with a certain file type, in one scan of the folder.
     :param folder_path: string representing the directory path
     :param file_types: list of strings representing file types
+    :param report_missing: print a message for each file type without a file
     :return: dict representing filetypes with corresponding file paths
     """
-    if not folder_path.endswith('/'):
-        folder_path += '/'
-
     file_paths = {}
-    for file_type in file_types:
-        file_path = glob.glob(folder_path + '*' + file_type)
-        if not file_path:
-            print(f"No {file_type} files found.")
-            continue
-        file_paths[file_type] = file_path[0]
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            # like glob, hidden files are skipped
+            if entry.name.startswith('.'):
+                continue
+            for file_type in file_types:
+                if file_type not in file_paths and entry.name.endswith(file_type):
+                    file_paths[file_type] = os.path.join(folder_path, entry.name)
+
+    if report_missing:
+        for file_type in file_types:
+            if file_type not in file_paths:
+                print(f"No {file_type} files found.")
 
     return file_paths
@@ -0,0 +1,111 @@
+import os
+import re
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List
+
+from model.file_reader import find_file_paths, FOLDER_FILE_TYPES, REQUIRED_FILE_TYPES
+from model.model_cache import load_model
+from model.model_container import ModelContainer
+
+
+class GroupInfo:
+    """A SpacerPlacer result folder of a batch, its files are found once when the batch is indexed."""
+
+    def __init__(self, name: str, folder_path: str, file_paths: Dict[str, str]):
+        self.name = name
+        self.folder_path = folder_path
+        # file type : file path, as returned by find_file_paths
+        self.file_paths = file_paths
+
+
+def is_group_folder(folder_path: str) -> bool:
+    """True if the folder holds the files of a SpacerPlacer result."""
+    file_paths = find_file_paths(folder_path, REQUIRED_FILE_TYPES, report_missing=False)
+    return len(file_paths) == len(REQUIRED_FILE_TYPES)
+
+
+def find_group_folders(parent_path: str) -> List[str]:
+    """The subfolders of parent_path that hold SpacerPlacer results, in natural order of their names."""
+    with os.scandir(parent_path) as entries:
+        folder_paths = [entry.path for entry in entries if not entry.name.startswith('.') and entry.is_dir()]
+    return sorted((folder_path for folder_path in folder_paths if is_group_folder(folder_path)),
+                  key=natural_sort_key)
+
+
+def natural_sort_key(path: str):
+    """Sort key that orders the numbers in names by value, g_5 before g_11."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", os.path.basename(path))]
+
+
+class GroupBatch:
+    """The groups of a SpacerPlacer batch run, one result folder per CRISPR group.
+
+    The files of all groups are indexed up front. A model is built when its group is selected,
+    the group expected next is prefetched in the background and the most recently used models are kept,
+    so switching between them does not read or build anything."""
+
+    def __init__(self, folder_paths: List[str], use_cache: bool = True, max_loaded_models: int = 4):
+        self.groups = []
+        for folder_path in folder_paths:
+            file_paths = find_file_paths(folder_path, FOLDER_FILE_TYPES, report_missing=False)
+            self.groups.append(GroupInfo(os.path.basename(os.path.normpath(folder_path)), folder_path, file_paths))
+        self.use_cache = use_cache
+        self.max_loaded_models = max(max_loaded_models, 1)
+        # group index : model, in order of last use
+        self.loaded_models: OrderedDict[int, ModelContainer] = OrderedDict()
+        # group index : background load, the models are taken over into loaded_models on the main thread
+        self.prefetches: Dict[int, Future] = {}
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="group_prefetch")
+
+    def get_model(self, group_ix: int) -> ModelContainer:
+        """Return the model of the group, built now unless it is loaded or being prefetched."""
+        self.take_finished_prefetches()
+        model = self.loaded_models.get(group_ix)
+        if model is not None:
+            self.loaded_models.move_to_end(group_ix)
+            return model
+        prefetch = self.prefetches.pop(group_ix, None)
+        if prefetch is not None:
+            model = prefetch.result()
+        else:
+            model = self.load_group_model(group_ix)
+        self.keep_model(group_ix, model)
+        return model
+
+    def prefetch(self, group_ix: int):
+        """Build the model of the group in the background, queued prefetches of other groups are dropped."""
+        self.take_finished_prefetches()
+        for other_ix in list(self.prefetches):
+            if other_ix != group_ix and self.prefetches[other_ix].cancel():
+                del self.prefetches[other_ix]
+        if (0 <= group_ix < len(self.groups) and group_ix not in self.loaded_models
+                and group_ix not in self.prefetches):
+            self.prefetches[group_ix] = self.executor.submit(self.load_group_model, group_ix)
+
+    def take_finished_prefetches(self):
+        for group_ix, prefetch in list(self.prefetches.items()):
+            if not prefetch.done():
+                continue
+            del self.prefetches[group_ix]
+            if prefetch.exception() is not None:
+                # the error is raised again if the group is selected
+                print(f"Prefetching group {self.groups[group_ix].name} failed: {prefetch.exception()}")
+                continue
+            self.keep_model(group_ix, prefetch.result())
+
+    def keep_model(self, group_ix: int, model: ModelContainer):
+        self.loaded_models[group_ix] = model
+        self.loaded_models.move_to_end(group_ix)
+        while len(self.loaded_models) > self.max_loaded_models:
+            self.loaded_models.popitem(last=False)
+
+    def load_group_model(self, group_ix: int) -> ModelContainer:
+        group = self.groups[group_ix]
+        return load_model(group.folder_path, self.use_cache, file_paths=group.file_paths)
+
+    def close(self):
+        """Drop the queued prefetches, a running one finishes in the background."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.prefetches.clear()
+        self.loaded_models.clear()
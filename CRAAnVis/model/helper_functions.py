@@ -1,5 +1,12 @@
+import functools
+from collections import OrderedDict
+
 from PyQt6.QtGui import QFontMetrics, QFont
 
+FONT_FIT_CACHE_SIZE = 4096
+# (fit function, font, text, width) -> fitted font, in order of last use
+_font_fit_cache = OrderedDict()
+
 
 def is_flat(lst):
     return all(not isinstance(i, list) for i in lst)
@@ -22,6 +29,30 @@ def num_to_display_str(num):
     return num_str
 
 
+def cached_font_fit(fit_font):
+    """Memoize a font fitting function by font, text and width. The least recently used fits are evicted.
+    Fitted fonts are shared, they must not be changed."""
+    @functools.wraps(fit_font)
+    def cached(font, text, width):
+        key = (fit_font, font, text, width)
+        fitted_font = _font_fit_cache.get(key)
+        if fitted_font is None:
+            fitted_font = fit_font(font, text, width)
+            # the key keeps a copy of the font, the font of the caller may change later
+            _font_fit_cache[(fit_font, QFont(font), text, width)] = fitted_font
+            if len(_font_fit_cache) > FONT_FIT_CACHE_SIZE:
+                _font_fit_cache.popitem(last=False)
+        else:
+            _font_fit_cache.move_to_end(key)
+        return fitted_font
+    return cached
+
+
+def clear_font_fit_cache():
+    _font_fit_cache.clear()
+
+
+@cached_font_fit
 def adapt_font_to_width(font, text, width):
     font_metrics = QFontMetrics(font)
     text_width = font_metrics.horizontalAdvance(text)
@@ -35,6 +66,7 @@ def adapt_font_to_width(font, text, width):
     return font
 
 
+@cached_font_fit
 def adapt_font_to_width2(font, text, width):
     font_metrics = QFontMetrics(font)
     text_width = font_metrics.horizontalAdvance(text)
@@ -0,0 +1,219 @@
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QStandardPaths
+
+from model.arrays import add_array_model, ArrayData, SpacerData, PresenceMatrix
+from model.file_reader import read_all_folder_data, find_file_paths, FOLDER_FILE_TYPES
+from model.model_container import ModelContainer
+from model.tree import produce_tree_model, TreeNode
+
+# bump when the model or the cache layout changes, older cache files are rebuilt
+MODEL_CACHE_VERSION = 1
+MODEL_CACHE_MAX_BYTES = 512 * 1024 * 1024
+MODEL_CACHE_SUFFIX = ".craamodel"
+
+# magic, cache version, marshal version, number of sections; then offset and length of each section
+_MAGIC = b"CRAAMC"
+_HEADER = struct.Struct("<6sHHH")
+_SECTION = struct.Struct("<QQ")
+# sections: marshalled tree, template and row names; raw cell codes of the presence matrix
+_N_SECTIONS = 2
+
+
+def load_model(folder_path: str, use_cache: bool = True, cache_dir: str = None,
+               file_paths: Dict[str, str] = None) -> ModelContainer:
+    """Build the model of a SpacerPlacer result folder, or load it from the model cache if the input files
+    did not change since it was built. file_paths as returned by find_file_paths, searched in folder_path if None."""
+    if file_paths is None:
+        file_paths = find_file_paths(folder_path, FOLDER_FILE_TYPES)
+    if not use_cache:
+        return build_model(folder_path, file_paths)
+
+    if cache_dir is None:
+        cache_dir = default_cache_dir()
+    cache_path = os.path.join(cache_dir, model_cache_key(file_paths) + MODEL_CACHE_SUFFIX)
+    model = read_model_cache(cache_path)
+    if model is not None:
+        # mark as recently used for the eviction, the file may have been evicted by another process meanwhile
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+        return model
+
+    model = build_model(folder_path, file_paths)
+    try:
+        write_model_cache(cache_path, model)
+        evict_model_cache(cache_dir, MODEL_CACHE_MAX_BYTES)
+    except OSError as e:
+        print(f"Model cache not written: {e}")
+    return model
+
+
+def build_model(folder_path: str, file_paths: Dict[str, str] = None) -> ModelContainer:
+    data = read_all_folder_data(folder_path, file_paths)
+    model = ModelContainer()
+    model.tree = produce_tree_model(data)
+    return add_array_model(data, model)
+
+
+def default_cache_dir() -> str:
+    cache_location = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.CacheLocation)
+    return os.path.join(cache_location, "models")
+
+
+def model_cache_key(file_paths: Dict[str, str]) -> str:
+    """Hash of the names, sizes and modification times of the input files and of the cache version."""
+    key = hashlib.sha256()
+    key.update(f"{MODEL_CACHE_VERSION} {marshal.version} {sys.version_info[:2]}".encode())
+    for file_type in FOLDER_FILE_TYPES:
+        file_path = file_paths.get(file_type)
+        if file_path is None:
+            key.update(f"\0{file_type} missing".encode())
+            continue
+        stat = os.stat(file_path)
+        key.update(f"\0{file_type} {os.path.basename(file_path)} {stat.st_size} {stat.st_mtime_ns}".encode())
+    return key.hexdigest()
+
+
+def write_model_cache(cache_path: str, model: ModelContainer):
+    """Write the model to cache_path, the file is replaced as a whole so readers never see a partial file."""
+    nodes = list(model.tree.traverse())
+    node_ix = {node: ix for ix, node in enumerate(nodes)}
+    tree = {"names": [node.name for node in nodes],
+            "parents": [node_ix[node.parent] if node.parent is not None else -1 for node in nodes],
+            "distances": [node.distance for node in nodes],
+            # only the nodes with events, node index : event type : event list
+            "events": {ix: dict(node._events) for ix, node in enumerate(nodes) if node._events is not None}}
+    template = [(spacer.name, spacer.original_name, spacer.duplicates, spacer.metadata)
+                for spacer in model.template.spacers]
+    presence_matrix = model.presence_matrix
+    sections = [marshal.dumps({"tree": tree,
+                               "template": template,
+                               "row_names": presence_matrix.row_names,
+                               "inner_array_names": model.inner_array_names}),
+                bytes(presence_matrix.data)]
+
+    cache_dir = os.path.dirname(cache_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # a temporary file of its own, other threads and processes may write the same model at the same time
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", prefix=os.path.basename(cache_path) + ".", dir=cache_dir)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(_HEADER.pack(_MAGIC, MODEL_CACHE_VERSION, marshal.version, len(sections)))
+            offset = _HEADER.size + _SECTION.size * len(sections)
+            for section in sections:
+                file.write(_SECTION.pack(offset, len(section)))
+                offset += len(section)
+            for section in sections:
+                file.write(section)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def read_model_cache(cache_path: str) -> Optional[ModelContainer]:
+    """Load a model written by write_model_cache, None if there is no valid cache file.
+    Outdated or broken cache files are removed."""
+    try:
+        with open(cache_path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return restore_model(mapped)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, EOFError, TypeError, KeyError, IndexError, struct.error) as e:
+        print(f"Model cache {cache_path} ignored: {e}")
+        try:
+            os.remove(cache_path)
+        except OSError:
+            pass
+        return None
+
+
+def restore_model(mapped) -> ModelContainer:
+    magic, version, marshal_version, n_sections = _HEADER.unpack_from(mapped, 0)
+    if (magic != _MAGIC or version != MODEL_CACHE_VERSION or marshal_version != marshal.version
+            or n_sections != _N_SECTIONS):
+        raise ValueError("outdated model cache file")
+    sections = []
+    for section_ix in range(n_sections):
+        offset, length = _SECTION.unpack_from(mapped, _HEADER.size + section_ix * _SECTION.size)
+        if offset + length > len(mapped):
+            raise ValueError("truncated model cache file")
+        sections.append((offset, length))
+    # read the sections in place, the cell codes are copied once into the matrix
+    # the views are released before the mapping is closed
+    with memoryview(mapped) as view:
+        (content_offset, content_length), (data_offset, data_length) = sections
+        with view[content_offset:content_offset + content_length] as section:
+            content = marshal.loads(section)
+        with view[data_offset:data_offset + data_length] as section:
+            matrix_data = bytearray(section)
+
+    model = ModelContainer()
+    model.tree = restore_tree(content["tree"])
+    model.add_template_array(ArrayData("template", [SpacerData(name, original_name, ix, duplicates, metadata)
+                                                    for ix, (name, original_name, duplicates, metadata)
+                                                    in enumerate(content["template"])]))
+    presence_matrix = PresenceMatrix(len(model.template.spacers))
+    presence_matrix.data = matrix_data
+    presence_matrix.row_names = content["row_names"]
+    presence_matrix.row_index = {name: row for row, name in enumerate(presence_matrix.row_names)}
+    if len(presence_matrix.data) != presence_matrix.n_rows * presence_matrix.n_columns:
+        raise ValueError("presence matrix does not match its rows")
+    model.presence_matrix = presence_matrix
+    model.inner_array_names = content["inner_array_names"]
+    return model
+
+
+def restore_tree(tree) -> TreeNode:
+    """Rebuild the TreeNodes from the level order node lists of write_model_cache."""
+    nodes = []
+    for name, parent_ix, distance in zip(tree["names"], tree["parents"], tree["distances"]):
+        node = TreeNode(name)
+        node.distance = distance
+        if parent_ix >= 0:
+            parent = nodes[parent_ix]
+            node.parent = parent
+            if parent.children:
+                parent.children.append(node)
+            else:
+                parent.children = [node]
+        nodes.append(node)
+    for ix, events in tree["events"].items():
+        nodes[ix].events = events
+    root = nodes[0]
+    root.build_name_index()
+    return root
+
+
+def evict_model_cache(cache_dir: str, max_bytes: int):
+    """Remove the least recently used cache files until the cache directory holds at most max_bytes."""
+    entries = []
+    with os.scandir(cache_dir) as dir_entries:
+        for entry in dir_entries:
+            if entry.name.endswith(MODEL_CACHE_SUFFIX) and entry.is_file():
+                try:
+                    stat = entry.stat()
+                except OSError:  # removed by another process
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total_bytes -= size
+        except OSError:
+            pass
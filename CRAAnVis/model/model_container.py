@@ -1,8 +1,7 @@
-from collections import Counter
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
-from model.arrays import ArrayData
-from model.helper_functions import flatten
+from model.arrays import ArrayData, PresenceMatrix, PRESENT, DELETED, SpacerBitsets, encode_node_events, \
+    propagate_upstream_events, UPSTREAM_GAIN_TYPES, UPSTREAM_LOSS_TYPES
 
 
 class ModelContainer:
@@ -10,12 +9,20 @@ class ModelContainer:
 
     def __init__(self, template: ArrayData = None, arrays: [] = None):
         self.template = template
-        self.arrays_dict = {}
+        # spacer name <-> bit index, bit index == template index
+        self.spacer_bitsets = SpacerBitsets(self.get_spacer_names() if template else None)
+        # rows: array names, columns: template indices
+        self.presence_matrix = PresenceMatrix(len(template.spacers) if template else 0)
         if arrays is None:
             arrays = []
         for array in arrays:
-            self.arrays_dict[array.name] = array
+            codes = bytearray(self.presence_matrix.n_columns)
+            for spacer in array.spacers:
+                codes[spacer.index] = PRESENT
+            self.presence_matrix.add_row(array.name, codes)
         self.tree = None
+        # rows of the presence matrix reconstructed at inner nodes, they follow the leaf rows
+        self.inner_array_names: List[str] = []
 
         # variables for collapsing leaf insertions
         self.array_singular_leaf_inserts = None
@@ -31,6 +38,12 @@ class ModelContainer:
         # variables for tree_legend
         self.item_types_in_tree = None
 
+        # node name : event type : bitset of spacers
+        self.node_event_bits = None
+        # node name : bitset of spacers gained/lost on the path from the root to the node
+        self.upstream_gains = None
+        self.upstream_losses = None
+
     def get_item_types_in_tree(self):
         if self.item_types_in_tree:
             return self.item_types_in_tree
@@ -55,12 +68,69 @@ class ModelContainer:
                         self.item_types_in_tree.add(translation[k])
             return self.item_types_in_tree
 
+    def get_node_event_bits(self, node_name=None):
+        """Return the spacer bitset of each event type of a node (or the dict for all nodes)."""
+        if self.node_event_bits is None:
+            if not self.tree:
+                return {} if node_name is None else None
+            self.node_event_bits = encode_node_events(self.tree, self.spacer_bitsets)
+        if node_name is None:
+            return self.node_event_bits
+        return self.node_event_bits[node_name]
+
+    def get_upstream_gains(self, node_name=None):
+        """Return the bitset of spacers gained on the way from the root to a node (or the dict for all nodes)."""
+        if self.upstream_gains is None:
+            if not self.tree:
+                return {} if node_name is None else 0
+            self.upstream_gains = {node.name: gains for node, gains in
+                                   propagate_upstream_events(self.tree, UPSTREAM_GAIN_TYPES,
+                                                             self.get_node_event_bits()).items()}
+        if node_name is None:
+            return self.upstream_gains
+        return self.upstream_gains[node_name]
+
+    def get_upstream_losses(self, node_name=None):
+        """Return the bitset of spacers lost on the way from the root to a node (or the dict for all nodes)."""
+        if self.upstream_losses is None:
+            if not self.tree:
+                return {} if node_name is None else 0
+            self.upstream_losses = {node.name: losses for node, losses in
+                                    propagate_upstream_events(self.tree, UPSTREAM_LOSS_TYPES,
+                                                              self.get_node_event_bits()).items()}
+        if node_name is None:
+            return self.upstream_losses
+        return self.upstream_losses[node_name]
+
     def add_template_array(self, template):
         self.template = template
+        self.spacer_bitsets = SpacerBitsets(self.get_spacer_names())
 
     def get_array_names(self) -> List[str]:
-        """Return a list of all array names."""
-        return list(self.arrays_dict.keys())
+        """Return a list of all leaf array names."""
+        return self.presence_matrix.row_names[:self.presence_matrix.n_rows - len(self.inner_array_names)]
+
+    def get_inner_array_names(self) -> List[str]:
+        """Return a list of the array names of the inner nodes."""
+        return list(self.inner_array_names)
+
+    def get_array(self, array_name):
+        """Return the cell codes (ABSENT, PRESENT, DELETED) of an array by template index."""
+        return self.presence_matrix.row(array_name)
+
+    def get_spacer_counts(self, with_deleted=False) -> List[int]:
+        """Return the number of arrays containing each template spacer."""
+        rows = self.get_array_names() if self.inner_array_names else None
+        if with_deleted:
+            return self.presence_matrix.column_counts(PRESENT, DELETED, rows=rows)
+        return self.presence_matrix.column_counts(PRESENT, rows=rows)
+
+    def get_array_spacer_counts(self, with_deleted=False) -> Dict[str, int]:
+        """Return the number of spacers in each array."""
+        rows = self.get_array_names()
+        if with_deleted:
+            return self.presence_matrix.row_counts(PRESENT, DELETED, rows=rows)
+        return self.presence_matrix.row_counts(PRESENT, rows=rows)
 
     def get_spacer_names(self) -> List[str]:
         """Return a list of all spacer names."""
@@ -73,25 +143,27 @@ class ModelContainer:
             return self.array_singular_leaf_inserts
         if not self.tree:
             return {}
-        visited = set()
-        arrayname_sgl_leaf_inserts = {}
+        node_event_bits = self.get_node_event_bits()
+        visited = 0
+        leaf_gains = {}
         for node in self.tree.traverse():
             if node.is_leaf():
-                sg_events = {str(gain) for gain in node.events["gains"]}
-                arrayname_sgl_leaf_inserts[node.name] = sg_events
+                leaf_gains[node.name] = node_event_bits[node.name]["gains"]
             else:
-                visited.update(str(event) for events in node.events.values() for event in flatten(events))
-
-        # remove all events that are not singular
-        for array_name, sg_events in arrayname_sgl_leaf_inserts.items():
-            sg_events.difference_update(visited)
+                for event_bits in node_event_bits[node.name].values():
+                    visited |= event_bits
 
-        all_inserts = [gain for gains in arrayname_sgl_leaf_inserts.values() for gain in gains]
-        all_inserts_counts = Counter(all_inserts)
+        # remove all events that are not singular: seen at an inner node or in more than one leaf
+        seen_once = 0
+        seen_more = 0
+        for gains in leaf_gains.values():
+            gains &= ~visited
+            seen_more |= seen_once & gains
+            seen_once |= gains
+        singular = seen_once & ~seen_more
 
-        for array_name in arrayname_sgl_leaf_inserts.keys():
-            arrayname_sgl_leaf_inserts[array_name] = [event for event in arrayname_sgl_leaf_inserts[array_name] if
-                                                      all_inserts_counts[event] == 1]
+        arrayname_sgl_leaf_inserts = {array_name: self.spacer_bitsets.decode(gains & singular)
+                                      for array_name, gains in leaf_gains.items()}
 
         self.array_singular_leaf_inserts = arrayname_sgl_leaf_inserts
         self.sg_leaf_inserts_arrayname = {spacer_name: array_name for
@@ -108,11 +180,11 @@ class ModelContainer:
             return []
         if not self.array_singular_leaf_inserts:
             return []
-        sg_l_ins_set = set()
-        sg_l_ins_set.update(str(event) for events in self.array_singular_leaf_inserts.values() for event in events)
+        sg_l_ins_bits = self.spacer_bitsets.encode(event for events in self.array_singular_leaf_inserts.values()
+                                                   for event in events)
 
-        indices = [spacer.index for spacer in self.template.spacers if spacer.name in sg_l_ins_set]
-        names = [spacer.name for spacer in self.template.spacers if spacer.name in sg_l_ins_set]
+        indices = [ix for ix in SpacerBitsets.indices(sg_l_ins_bits) if ix < len(self.template.spacers)]
+        names = [self.template.spacers[ix].name for ix in indices]
         self.singular_stretches = []
         if len(indices) > 0:
             current_stretch = [(indices[0], names[0])]
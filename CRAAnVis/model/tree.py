@@ -1,4 +1,5 @@
 from collections import deque
+from types import MappingProxyType
 from typing import Dict, List, Optional
 from model.helper_functions import is_flat
 
@@ -11,28 +12,59 @@ def produce_tree_model(data):
     return root
 
 
+EVENT_TYPES = ('gains', 'losses', 'contradictions', 'duplications', 'rearrangements', 'double_gains',
+               'independent_gains', 'reacquisitions', 'dups')
+
+# shared by all nodes without events, a node gets its own dictionary on the first set_events()
+EMPTY_EVENTS = MappingProxyType({event_type: () for event_type in EVENT_TYPES})
+
+
 class TreeNode:
     """Tree class"""
 
+    __slots__ = ('root', 'name_index', '_name', 'children', 'parent', 'distance', '_events')
+
     def __init__(self, name: Optional[str] = None):
 
+        # root of the tree and name : node index, both only set after build_name_index()
         self.root = None
-        self.name = name
-        self.children = []
+        self.name_index: Optional[Dict[str, List['TreeNode']]] = None
+        self._name = name
+        # leaves share the empty tuple, add_child() replaces it by a list
+        self.children = ()
         self.parent = None
         self.distance = None
-
-        self.events: Dict[str, List[str]] = {
-            'gains': [],
-            'losses': [],
-            'contradictions': [],
-            'duplications': [],
-            'rearrangements': [],
-            'double_gains': [],
-            'independent_gains': [],
-            'reacquisitions': [],
-            'dups': []
-        }
+        self._events: Optional[Dict[str, List[str]]] = None
+
+    @property
+    def events(self):
+        """Event type : event list, a read-only view on every node. Only set_events and assigning a whole
+        dictionary write events, nodes without events share EMPTY_EVENTS."""
+        if self._events is None:
+            return EMPTY_EVENTS
+        return MappingProxyType(self._events)
+
+    @events.setter
+    def events(self, events):
+        self._events = None
+        for event_type, event_list in events.items():
+            self.set_events(event_type, event_list)
+
+    def set_events(self, event_type: str, events):
+        if self._events is None:
+            self._events = dict(EMPTY_EVENTS)
+        self._events[event_type] = events
+
+    @property
+    def name(self):
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        # renaming invalidates the index, it is rebuilt on the next lookup
+        tree_root = self.root if self.root is not None else self
+        tree_root.name_index = None
 
     def parse_newick(self, newick: str):
         """
@@ -41,7 +73,30 @@ class TreeNode:
         :return: Tree object
         """
         from model.newick_parser import _read_newick  # local import to avoid circular dependency
-        return _read_newick(newick, self)
+        tree = _read_newick(newick, self)
+        tree.build_name_index()
+        return tree
+
+    def build_name_index(self):
+        """Build the name : [nodes] index on this (root) node, nodes sharing a name are listed in level order."""
+        name_index = {}
+        for node in self.traverse():
+            node.root = self
+            name_index.setdefault(node._name, []).append(node)
+        self.root = None
+        self.name_index = name_index
+
+    def get_nodes_by_name(self, name) -> List['TreeNode']:
+        """Return all nodes with the given name in O(1), an empty list if there is no such node."""
+        tree_root = self.root if self.root is not None else self
+        if tree_root.name_index is None:
+            tree_root.build_name_index()
+        return tree_root.name_index.get(name, [])
+
+    def get_node_by_name(self, name):
+        """Return the first node in level order with the given name, None if there is no such node."""
+        nodes = self.get_nodes_by_name(name)
+        return nodes[0] if nodes else None
 
     def add_distance(self, distance):
         """Add distance to node"""
@@ -57,7 +112,18 @@ class TreeNode:
         if distance is not None:
             child.distance = distance
         child.parent = self
-        self.children.append(child)
+        if self.children:
+            self.children.append(child)
+        else:
+            self.children = [child]
+
+        # keep the name index of the tree up to date
+        tree_root = self.root if self.root is not None else self
+        if tree_root.name_index is not None:
+            for node in child.traverse():
+                node.root = tree_root
+                node.name_index = None
+                tree_root.name_index.setdefault(node._name, []).append(node)
 
     def get_last_child(self):
         """Get last child"""
@@ -73,42 +139,34 @@ class TreeNode:
 
     def parse_evolutionary_events(self, data):
         """get evolutionary events information and assign to nodes from data"""
-
-
-
-
-        for node in self.traverse():
-            if node.name in data['rec_gains_losses']['rec_gains'].keys():
-                node.events['gains'] = data['rec_gains_losses']['rec_gains'][node.name]
-            if node.name in data['rec_gains_losses']['rec_losses'].keys():
-                node.events['losses'] = data['rec_gains_losses']['rec_losses'][node.name]
-
-            if node.name in data['other_events']['rec_contra_dict'].keys():
-                node.events['contradictions'] = data['other_events']['rec_contra_dict'][node.name]
-            if node.name in data['other_events']['rec_duplications_dict'].keys():
-                node.events['duplications'] = data['other_events']['rec_duplications_dict'][node.name]
-            if node.name in data['other_events']['rec_rearrangements_dict'].keys():
-                node.events['rearrangements'] = data['other_events']['rec_rearrangements_dict'][node.name]
-
-            # decide which SpacerPlacer output data version is available
-            old_categories = ["rec_double_gains_dict", "rec_default_or_indep_gains_dict"]
-            new_categories = ["rec_reacquisition_dict", "rec_indep_gain_dict", "rec_other_dup_events_dict"]
-
-            if all(category in data['other_events'].keys() for category in old_categories):
-                if node.name in data['other_events']['rec_double_gains_dict'].keys():
-                    node.events['double_gains'] = data['other_events']['rec_double_gains_dict'][node.name]
-                if node.name in data['other_events']['rec_default_or_indep_gains_dict'].keys():
-                    node.events['independent_gains'] = data['other_events']['rec_default_or_indep_gains_dict'][node.name]
-
-            if all(category in data['other_events'].keys() for category in new_categories):
-                if node.name in data['other_events']['rec_reacquisition_dict'].keys():
-                    node.events[('reacquisitions')] = data['other_events']['rec_reacquisition_dict'][node.name]
-                if node.name in data['other_events']['rec_indep_gain_dict'].keys():
-                    node.events['independent_gains'] = data['other_events']['rec_indep_gain_dict'][node.name]
-                if node.name in data['other_events']['rec_other_dup_events_dict'].keys():
-                    node.events['dups'] = data['other_events']['rec_other_dup_events_dict'][node.name]
-
-
+        # event type, data category, data key; later entries overwrite earlier ones
+        event_sources = [
+            ('gains', 'rec_gains_losses', 'rec_gains'),
+            ('losses', 'rec_gains_losses', 'rec_losses'),
+            ('contradictions', 'other_events', 'rec_contra_dict'),
+            ('duplications', 'other_events', 'rec_duplications_dict'),
+            ('rearrangements', 'other_events', 'rec_rearrangements_dict'),
+        ]
+
+        # decide which SpacerPlacer output data version is available
+        old_categories = ["rec_double_gains_dict", "rec_default_or_indep_gains_dict"]
+        new_categories = ["rec_reacquisition_dict", "rec_indep_gain_dict", "rec_other_dup_events_dict"]
+
+        if all(category in data['other_events'].keys() for category in old_categories):
+            event_sources.append(('double_gains', 'other_events', 'rec_double_gains_dict'))
+            event_sources.append(('independent_gains', 'other_events', 'rec_default_or_indep_gains_dict'))
+
+        if all(category in data['other_events'].keys() for category in new_categories):
+            event_sources.append(('reacquisitions', 'other_events', 'rec_reacquisition_dict'))
+            event_sources.append(('independent_gains', 'other_events', 'rec_indep_gain_dict'))
+            event_sources.append(('dups', 'other_events', 'rec_other_dup_events_dict'))
+
+        # look up the nodes of each event entry instead of every node in every dictionary,
+        # the events of a name belong to all nodes with that name
+        for event_type, category, key in event_sources:
+            for node_name, events in data[category][key].items():
+                for node in self.get_nodes_by_name(node_name):
+                    node.set_events(event_type, events)
 
     def is_leaf(self):
         """Check if node is leaf"""
@@ -0,0 +1,128 @@
+import contextlib
+import io
+import unittest
+
+from model.arrays import add_array_model, propagate_upstream_events, PresenceMatrix, SpacerBitsets, ABSENT, \
+    PRESENT, DELETED, UPSTREAM_GAIN_TYPES
+from model.model_container import ModelContainer
+from model.tree import produce_tree_model
+
+
+def produce_group_data(rec_spacers=None):
+    """Data of a small SpacerPlacer result as returned by read_all_folder_data.
+
+    Inner2 gains 1-3, Inner1 gains 4-5, leaf b loses 2 and 4."""
+    if rec_spacers is None:
+        rec_spacers = {"Inner2": [0, 0, 1, 1, 1],
+                       "Inner1": [1, 1, 1, 1, 1],
+                       "a": [0, 0, 1, 1, 1],
+                       "b": [1, 0, 1, 0, 1],
+                       "c": [1, 1, 1, 1, 1]}
+    return {
+        "newick": "(a:1.0,(b:0.5,c:0.5)Inner1:0.5)Inner2:0.0;",
+        "top_order": ["s5", "s4", "s3", "s2", "s1"],
+        "spacer_names_to_numbers": {"s5": 5, "s4": 4, "s3": 3, "s2": 2, "s1": 1},
+        "rec_spacers": {"rec_spacers": rec_spacers},
+        "rec_gains_losses": {"rec_gains": {"Inner2": [1, 2, 3], "Inner1": [4, 5], "a": [], "b": [], "c": []},
+                             "rec_losses": {"Inner2": [], "Inner1": [], "a": [], "b": [[2], [4]], "c": []}},
+        "other_events": {"rec_contra_dict": {}, "rec_duplications_dict": {}, "rec_rearrangements_dict": {}},
+    }
+
+
+def produce_group_model(data=None) -> ModelContainer:
+    if data is None:
+        data = produce_group_data()
+    model = ModelContainer()
+    model.tree = produce_tree_model(data)
+    return add_array_model(data, model)
+
+
+class TestPresenceMatrix(unittest.TestCase):
+    def setUp(self):
+        self.matrix = PresenceMatrix(3)
+        self.matrix.add_row("a", [PRESENT, ABSENT, DELETED])
+        self.matrix.add_row("b", [PRESENT, PRESENT, ABSENT])
+
+    def test_rows(self):
+        self.assertEqual(self.matrix.n_rows, 2)
+        self.assertIn("b", self.matrix)
+        self.assertEqual(bytes(self.matrix.row("b")), bytes([PRESENT, PRESENT, ABSENT]))
+        self.assertEqual(self.matrix.value("a", 2), DELETED)
+        with self.assertRaises(TypeError):
+            self.matrix.row("a")[0] = ABSENT
+
+    def test_counts(self):
+        self.assertEqual(self.matrix.column_counts(PRESENT), [2, 1, 0])
+        self.assertEqual(self.matrix.column_counts(PRESENT, DELETED), [2, 1, 1])
+        self.assertEqual(self.matrix.column_counts(PRESENT, rows=["a"]), [1, 0, 0])
+        self.assertEqual(self.matrix.row_counts(PRESENT), {"a": 1, "b": 2})
+        self.assertEqual(self.matrix.column_frequencies(PRESENT), [1.0, 0.5, 0.0])
+
+    def test_invalid_rows(self):
+        with self.assertRaisesRegex(ValueError, "Array c"):
+            self.matrix.add_row("c", [PRESENT])
+        with self.assertRaisesRegex(ValueError, "Array a"):
+            self.matrix.add_row("a", [PRESENT, PRESENT, PRESENT])
+
+
+class TestAddArrayModel(unittest.TestCase):
+    def test_leaf_arrays(self):
+        model = produce_group_model()
+        self.assertEqual(model.get_spacer_names(), ["5", "4", "3", "2", "1"])
+        self.assertEqual(model.get_array_names(), ["a", "b", "c"])
+        # b lost 2 and 4, they are marked as deleted where the array has no spacer
+        self.assertEqual(bytes(model.get_array("b")), bytes([PRESENT, DELETED, PRESENT, DELETED, PRESENT]))
+        self.assertEqual(model.get_spacer_counts(), [2, 1, 3, 2, 3])
+        self.assertAlmostEqual(model.template.spacers[1].metadata["sp_d_frequency"], 2 / 3)
+
+    def test_short_rec_vector_is_padded(self):
+        data = produce_group_data()
+        data["rec_spacers"]["rec_spacers"]["a"] = [0, 0, 1]
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            model = produce_group_model(data)
+        self.assertIn("Array a", output.getvalue())
+        self.assertEqual(bytes(model.get_array("a")), bytes([ABSENT, ABSENT, PRESENT, ABSENT, ABSENT]))
+
+
+class TestUpstreamEvents(unittest.TestCase):
+    def test_propagation_from_root(self):
+        model = produce_group_model()
+        bitsets = model.spacer_bitsets
+        gains = {name: set(bitsets.decode(bits)) for name, bits in model.get_upstream_gains().items()}
+        losses = {name: set(bitsets.decode(bits)) for name, bits in model.get_upstream_losses().items()}
+        self.assertEqual(gains, {"Inner2": {"1", "2", "3"}, "Inner1": {"1", "2", "3", "4", "5"},
+                                 "a": {"1", "2", "3"}, "b": {"1", "2", "3", "4", "5"},
+                                 "c": {"1", "2", "3", "4", "5"}})
+        self.assertEqual(losses, {"Inner2": set(), "Inner1": set(), "a": set(), "b": {"2", "4"}, "c": set()})
+
+    def test_nodes_without_new_events_share_the_parent_bits(self):
+        model = produce_group_model()
+        upstream = propagate_upstream_events(model.tree, UPSTREAM_GAIN_TYPES, model.get_node_event_bits())
+        inner1 = model.tree.get_node_by_name("Inner1")
+        for leaf in inner1.children:
+            self.assertIs(upstream[leaf], upstream[inner1])
+
+
+class TestSpacerBitsets(unittest.TestCase):
+    def test_template_indices(self):
+        bitsets = SpacerBitsets(["5", "4", "3"])
+        bits = bitsets.encode([3, "5"])
+        self.assertEqual(bits, 0b101)
+        self.assertEqual(SpacerBitsets.indices(bits), [0, 2])
+        self.assertEqual(bitsets.decode(bits), ["5", "3"])
+        self.assertTrue(bitsets.contains(bits, 3))
+        self.assertFalse(bitsets.contains(bits, "4"))
+        self.assertFalse(bitsets.contains(bits, "unknown"))
+        self.assertEqual(SpacerBitsets.count(bits), 2)
+
+    def test_names_missing_in_template(self):
+        bitsets = SpacerBitsets(["5", "4"])
+        bits = bitsets.encode(["x", "4"])
+        self.assertEqual(bitsets.bit_index("x"), 2)
+        self.assertEqual(bitsets.decode(bits), ["4", "x"])
+        self.assertEqual(bitsets.decode(bits & ~bitsets.bit("x")), ["4"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+import contextlib
+import io
+import json
+import logging
+import os
+import tempfile
+import unittest
+
+from model.file_reader import find_file_paths, read_all_folder_data, FOLDER_FILE_TYPES, REQUIRED_FILE_TYPES, \
+    JsonObjectStream, read_node_events
+from model.model_cache import build_model
+from tests.test_arrays import produce_group_data, produce_group_model
+
+
+def write_group_folder(folder_path, data, group_name="g", metadata=None):
+    """Write data as returned by read_all_folder_data as the files of a SpacerPlacer result folder."""
+    with open(os.path.join(folder_path, group_name + ".nwk"), "w") as file:
+        file.write(data["newick"])
+    for key in ("rec_spacers", "top_order", "spacer_names_to_numbers", "rec_gains_losses", "other_events"):
+        with open(os.path.join(folder_path, f"{group_name}_{key}.json"), "w") as file:
+            json.dump(data[key], file)
+    if metadata is not None:
+        with open(os.path.join(folder_path, group_name + "_metadata.json"), "w") as file:
+            json.dump(metadata, file)
+
+
+class TestFindFilePaths(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        write_group_folder(self.folder.name, produce_group_data())
+        for name in (".hidden.nwk", "notes.txt"):
+            open(os.path.join(self.folder.name, name), "w").close()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_one_file_per_type(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            file_paths = find_file_paths(self.folder.name, FOLDER_FILE_TYPES)
+        self.assertEqual(sorted(file_paths), sorted(REQUIRED_FILE_TYPES))
+        self.assertEqual(file_paths[".nwk"], os.path.join(self.folder.name, "g.nwk"))
+        self.assertEqual(file_paths["_rec_spacers.json"], os.path.join(self.folder.name, "g_rec_spacers.json"))
+        self.assertEqual(output.getvalue(), "No _metadata.json files found.\n")
+
+    def test_report_missing(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            find_file_paths(self.folder.name, FOLDER_FILE_TYPES, report_missing=False)
+        self.assertEqual(output.getvalue(), "")
+
+
+class TestReadAllFolderData(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.data = produce_group_data()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def read(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return read_all_folder_data(self.folder.name)
+
+    def test_all_files_are_read(self):
+        write_group_folder(self.folder.name, self.data,
+                           metadata={"s5": {"length": {"type": "int", "value": "31"}}})
+        data = self.read()
+        self.assertEqual(data["newick"], self.data["newick"])
+        self.assertEqual(data["top_order"], self.data["top_order"])
+        self.assertEqual(data["rec_gains_losses"], self.data["rec_gains_losses"])
+        self.assertEqual(data["other_events"], self.data["other_events"])
+        self.assertEqual({name: list(vector) for name, vector in data["rec_spacers"]["rec_spacers"].items()},
+                         self.data["rec_spacers"]["rec_spacers"])
+        self.assertEqual(data["metadata"], {"s5": {"length": 31}})
+
+    def test_model_from_folder(self):
+        write_group_folder(self.folder.name, self.data)
+        with contextlib.redirect_stdout(io.StringIO()):
+            model = build_model(self.folder.name)
+        expected = produce_group_model()
+        self.assertEqual(bytes(model.presence_matrix.data), bytes(expected.presence_matrix.data))
+        self.assertEqual(dict(model.tree.get_node_by_name("b").events),
+                         dict(expected.tree.get_node_by_name("b").events))
+
+    def test_missing_file(self):
+        write_group_folder(self.folder.name, self.data)
+        os.remove(os.path.join(self.folder.name, "g_top_order.json"))
+        with self.assertRaises(KeyError):
+            self.read()
+
+    def test_read_times_are_logged(self):
+        write_group_folder(self.folder.name, self.data)
+        with self.assertLogs("model.file_reader", logging.DEBUG) as logs:
+            self.read()
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("g_rec_spacers.json", logs.output[0])
+
+
+class CountingFile(io.StringIO):
+    """Text file that counts its reads."""
+    def __init__(self, text):
+        super().__init__(text)
+        self.reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+class TestJsonObjectStream(unittest.TestCase):
+    document = {"rec_spacers": {"a": [0, 1, 1], "b b": [1, 0, 12345678], "\u00e9\"": [], "d": [-1.5e3, True, None]},
+                "version": 10, "empty": {}, "name": "g \\ 11"}
+
+    def test_members_across_chunk_boundaries(self):
+        text = json.dumps(self.document, indent=1)
+        for chunk_size in (1, 2, 3, 7, 64, len(text)):
+            stream = JsonObjectStream(io.StringIO(text), chunk_size=chunk_size)
+            decoded = {}
+            for key in stream.iter_object():
+                if key == "rec_spacers" or key == "empty":
+                    decoded[key] = dict(stream.iter_items())
+                else:
+                    decoded[key] = stream.decode_value()
+            self.assertEqual(decoded, self.document, chunk_size)
+            self.assertEqual(stream.peek(), "")
+
+    def test_large_member_is_read_in_growing_chunks(self):
+        vector = [1] * 100000
+        file = CountingFile(json.dumps({"a": vector, "b": [0]}))
+        self.assertEqual(list(JsonObjectStream(file, chunk_size=16).iter_items()), [("a", vector), ("b", [0])])
+        self.assertLess(file.reads, 40)
+        file = CountingFile(json.dumps(vector))
+        self.assertEqual(JsonObjectStream(file, chunk_size=16).decode_value(), vector)
+        self.assertLess(file.reads, 40)
+
+    def test_malformed(self):
+        for text in ('{"a": [1, 2]', '{"a" [1]}', '{"a": [1] "b": [2]}', '{1: [1]}'):
+            stream = JsonObjectStream(io.StringIO(text), chunk_size=3)
+            with self.assertRaises(json.JSONDecodeError, msg=text):
+                list(stream.iter_items())
+
+    def test_node_events(self):
+        events = produce_group_data()["rec_gains_losses"]
+        events["version"] = 2
+        stream = io.StringIO(json.dumps(events))
+        self.assertEqual(read_node_events(stream), events)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import random
+import unittest
+
+from view.tree_rendering.flat_tree import FlatTree, LeafPaths
+
+
+class Node:
+    """Minimal stand-in for TreeViewNode with the attributes FlatTree reads."""
+    def __init__(self, name, distance=0.0, extension=0.0, parent=None):
+        self.name = name
+        self.distance = distance
+        self.extension_length = extension
+        self.parent = parent
+        self.c = []
+        if parent is not None:
+            parent.c.append(self)
+
+
+def produce_random_tree(rng, n_leaves):
+    root = Node("root")
+    leaves = [root]
+    while len(leaves) < n_leaves:
+        parent = leaves.pop(rng.randrange(len(leaves)))
+        for _ in range(2):
+            leaves.append(Node(f"n{rng.random()}", rng.choice([0.0, rng.uniform(0, 3)]),
+                               rng.choice([0.0, rng.uniform(0, 60)]), parent))
+    return root
+
+
+def brute_force_sizes(leaf_paths, x_max, n_steps=500):
+    return [(x, leaf_paths.evaluate(x)[0]) for x in (x_max * step / n_steps for step in range(n_steps + 1))]
+
+
+class TestLeafPathsScaleSearch(unittest.TestCase):
+    def check_scales(self, leaf_paths, size):
+        eps = 1e-6 * max(size, 1)
+        x_first = leaf_paths.first_scale_at_least(size)
+        x_last = leaf_paths.last_scale_at_most(size)
+        if x_first is None:
+            self.assertLess(leaf_paths.evaluate(1e9)[0], size)
+        else:
+            self.assertGreaterEqual(leaf_paths.evaluate(x_first)[0], size - eps)
+        if x_last is None:
+            self.assertGreater(leaf_paths.evaluate(0)[0], size)
+        elif x_last != float('inf'):
+            self.assertLessEqual(leaf_paths.evaluate(x_last)[0], size + eps)
+
+        x_max = 2 * max(x for x in (x_first, x_last, 1.0) if x is not None and x != float('inf'))
+        for x, x_size in brute_force_sizes(leaf_paths, x_max):
+            tolerance = 1e-9 * x_max
+            if x_size >= size + eps:
+                # no smaller scale reaches the size, no larger one stays below it
+                self.assertIsNotNone(x_first)
+                self.assertLessEqual(x_first, x + tolerance)
+                if x_last is not None:
+                    self.assertLessEqual(x_last, x + tolerance)
+            if x_size <= size - eps:
+                self.assertIsNotNone(x_last)
+                self.assertGreaterEqual(x_last, x - tolerance)
+                if x_first is not None:
+                    self.assertGreaterEqual(x_first, x - tolerance)
+
+    def test_crossing_leaf_paths(self):
+        # a: max(x, 50), b: 2x; the size bends at 25 where the paths cross, not only at the breakpoint 50
+        root = Node("root")
+        Node("a", 1.0, 50.0, root)
+        Node("b", 2.0, 0.0, root)
+        leaf_paths = LeafPaths(FlatTree(root))
+        self.assertEqual(leaf_paths.first_scale_at_least(60), 30)
+        self.assertEqual(leaf_paths.last_scale_at_most(60), 30)
+        self.assertEqual(leaf_paths.last_scale_at_most(50), 25)
+        self.assertEqual(leaf_paths.last_scale_at_most(51), 25.5)
+        self.assertEqual(leaf_paths.first_scale_at_least(40), 0.0)
+        self.assertIsNone(leaf_paths.last_scale_at_most(40))
+
+    def test_without_distances(self):
+        root = Node("root")
+        Node("a", 0.0, 5.0, root)
+        Node("b", 0.0, 0.0, root)
+        leaf_paths = LeafPaths(FlatTree(root))
+        self.assertIsNone(leaf_paths.first_scale_at_least(10))
+        self.assertEqual(leaf_paths.last_scale_at_most(10), float('inf'))
+
+    def test_random_trees_against_brute_force(self):
+        rng = random.Random(0)
+        for _ in range(300):
+            leaf_paths = LeafPaths(FlatTree(produce_random_tree(rng, rng.randrange(2, 12))))
+            for size in (rng.uniform(0, 150) for _ in range(3)):
+                self.check_scales(leaf_paths, size)
+
+    def test_solution_has_the_target_size(self):
+        rng = random.Random(2)
+        for _ in range(100):
+            leaf_paths = LeafPaths(FlatTree(produce_random_tree(rng, rng.randrange(20, 200))))
+            size = leaf_paths.evaluate(0.0)[0] + rng.uniform(1, 500)
+            x = leaf_paths.first_scale_at_least(size)
+            self.assertAlmostEqual(leaf_paths.evaluate(x)[0], size, delta=1e-9 * size)
+            self.assertEqual(leaf_paths.last_scale_at_most(size), x)
+
+
+class TestReverseChildren(unittest.TestCase):
+    def test_preorder_after_swaps(self):
+        rng = random.Random(1)
+        flat_tree = FlatTree(produce_random_tree(rng, 40))
+        inner = [ix for ix in range(flat_tree.n_nodes) if not flat_tree.is_leaf(ix)]
+        for _ in range(50):
+            flat_tree.reverse_children(rng.choice(inner))
+            self.assertEqual(list(flat_tree.preorder), list(flat_tree.subtree_preorder(0)))
+            for pos, ix in enumerate(flat_tree.preorder):
+                self.assertEqual(flat_tree.preorder_pos[ix], pos)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from model.group_batch import GroupBatch, find_group_folders, natural_sort_key
+from tests.test_arrays import produce_group_data
+from tests.test_file_reader import write_group_folder
+
+
+class CountingGroupBatch(GroupBatch):
+    """Group batch that records which groups it built."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.built = []
+
+    def load_group_model(self, group_ix):
+        self.built.append(group_ix)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return super().load_group_model(group_ix)
+
+
+class TestFindGroupFolders(unittest.TestCase):
+    def setUp(self):
+        self.parent = tempfile.TemporaryDirectory()
+        for name in ("g_11", "g_5", "g_100", ".g_1"):
+            os.mkdir(os.path.join(self.parent.name, name))
+            write_group_folder(os.path.join(self.parent.name, name), produce_group_data(), group_name=name)
+        os.mkdir(os.path.join(self.parent.name, "g_2"))
+        open(os.path.join(self.parent.name, "g_2", "g_2.nwk"), "w").close()
+        open(os.path.join(self.parent.name, "g_3"), "w").close()
+
+    def tearDown(self):
+        self.parent.cleanup()
+
+    def test_group_folders_in_natural_order(self):
+        self.assertEqual([os.path.basename(path) for path in find_group_folders(self.parent.name)],
+                         ["g_5", "g_11", "g_100"])
+
+    def test_natural_sort_key(self):
+        self.assertEqual(sorted(["b_2", "a_10", "a_9", "a"], key=natural_sort_key), ["a", "a_9", "a_10", "b_2"])
+        self.assertLess(natural_sort_key("/x/g_99"), natural_sort_key("/a/g_100"))
+
+
+class TestGroupBatch(unittest.TestCase):
+    def setUp(self):
+        self.parent = tempfile.TemporaryDirectory()
+        self.folder_paths = []
+        for name in ("g_1", "g_2", "g_3"):
+            folder_path = os.path.join(self.parent.name, name)
+            os.mkdir(folder_path)
+            write_group_folder(folder_path, produce_group_data(), group_name=name)
+            self.folder_paths.append(folder_path)
+
+    def tearDown(self):
+        self.parent.cleanup()
+
+    def make_batch(self, max_loaded_models=4):
+        batch = CountingGroupBatch(self.folder_paths, use_cache=False, max_loaded_models=max_loaded_models)
+        self.addCleanup(batch.close)
+        return batch
+
+    def test_groups_are_indexed_without_loading(self):
+        batch = self.make_batch()
+        self.assertEqual([group.name for group in batch.groups], ["g_1", "g_2", "g_3"])
+        self.assertEqual(batch.groups[1].file_paths[".nwk"], os.path.join(self.folder_paths[1], "g_2.nwk"))
+        self.assertEqual(batch.built, [])
+
+    def test_models_are_kept(self):
+        batch = self.make_batch()
+        model = batch.get_model(0)
+        self.assertEqual(model.get_array_names(), ["a", "b", "c"])
+        self.assertIs(batch.get_model(0), model)
+        self.assertEqual(batch.built, [0])
+
+    def test_least_recently_used_model_is_dropped(self):
+        batch = self.make_batch(max_loaded_models=2)
+        batch.get_model(0)
+        batch.get_model(1)
+        batch.get_model(0)
+        batch.get_model(2)
+        self.assertEqual(list(batch.loaded_models), [0, 2])
+        batch.get_model(1)
+        self.assertEqual(batch.built, [0, 1, 2, 1])
+
+    def test_prefetched_model_is_used(self):
+        batch = self.make_batch()
+        batch.prefetch(1)
+        model = batch.get_model(1)
+        self.assertIs(batch.get_model(1), model)
+        self.assertEqual(batch.built, [1])
+        self.assertEqual(batch.prefetches, {})
+
+    def test_prefetch_out_of_range_or_loaded(self):
+        batch = self.make_batch()
+        batch.get_model(0)
+        for group_ix in (-1, 0, 3):
+            batch.prefetch(group_ix)
+        self.assertEqual(batch.prefetches, {})
+
+    def test_failed_prefetch_is_raised_on_selection(self):
+        batch = self.make_batch()
+        os.remove(os.path.join(self.folder_paths[2], "g_3_rec_spacers.json"))
+        batch.prefetch(2)
+        batch.prefetches[2].exception()
+        with contextlib.redirect_stdout(io.StringIO()) as output:
+            batch.take_finished_prefetches()
+        self.assertIn("Prefetching group g_3 failed", output.getvalue())
+        with self.assertRaises(KeyError):
+            batch.get_model(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from model.model_cache import write_model_cache, read_model_cache, evict_model_cache, MODEL_CACHE_SUFFIX
+from tests.test_arrays import produce_group_model
+
+
+class TestModelCacheFile(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.cache_dir.name, "model" + MODEL_CACHE_SUFFIX)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_round_trip(self):
+        model = produce_group_model()
+        write_model_cache(self.cache_path, model)
+        self.assertEqual(os.listdir(self.cache_dir.name), ["model" + MODEL_CACHE_SUFFIX])
+
+        restored = read_model_cache(self.cache_path)
+        nodes, restored_nodes = list(model.tree.traverse()), list(restored.tree.traverse())
+        self.assertEqual([(node.name, node.distance) for node in restored_nodes],
+                         [(node.name, node.distance) for node in nodes])
+        self.assertEqual([node.parent.name for node in restored_nodes[1:]],
+                         [node.parent.name for node in nodes[1:]])
+        for node, restored_node in zip(nodes, restored_nodes):
+            self.assertEqual(dict(restored_node.events), dict(node.events))
+        self.assertIs(restored.tree.get_node_by_name("b"), restored_nodes[3])
+
+        self.assertEqual(restored.get_spacer_names(), model.get_spacer_names())
+        self.assertEqual([spacer.metadata for spacer in restored.template.spacers],
+                         [spacer.metadata for spacer in model.template.spacers])
+        self.assertEqual(restored.get_array_names(), model.get_array_names())
+        self.assertEqual(bytes(restored.presence_matrix.data), bytes(model.presence_matrix.data))
+        self.assertEqual(restored.get_spacer_counts(), model.get_spacer_counts())
+
+    def test_missing_file(self):
+        self.assertIsNone(read_model_cache(self.cache_path))
+
+    def test_broken_file_is_removed(self):
+        with open(self.cache_path, "wb") as file:
+            file.write(b"not a model")
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertIsNone(read_model_cache(self.cache_path))
+        self.assertFalse(os.path.exists(self.cache_path))
+
+
+class TestEvictModelCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def add_file(self, name, size, used):
+        path = os.path.join(self.cache_dir.name, name)
+        with open(path, "wb") as file:
+            file.write(b"x" * size)
+        os.utime(path, (used, used))
+        return path
+
+    def test_least_recently_used_are_removed(self):
+        old = self.add_file("old" + MODEL_CACHE_SUFFIX, 100, 1000)
+        middle = self.add_file("middle" + MODEL_CACHE_SUFFIX, 100, 2000)
+        new = self.add_file("new" + MODEL_CACHE_SUFFIX, 100, 3000)
+        other = self.add_file("other.txt", 1000, 0)
+        evict_model_cache(self.cache_dir.name, 250)
+        self.assertEqual([os.path.exists(path) for path in (old, middle, new, other)], [False, True, True, True])
+        evict_model_cache(self.cache_dir.name, 100)
+        self.assertEqual([os.path.exists(path) for path in (middle, new)], [False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from model.newick_parser import _read_newick, NewickError
+
+
+def produce_caterpillar_newick(n_leaves):
+    newick = "l0:1"
+    for ix in range(1, n_leaves):
+        newick = f"({newick},l{ix}:1)n{ix}:1"
+    return newick + ";"
+
+
+class TestReadNewick(unittest.TestCase):
+    def test_names_and_distances(self):
+        root = _read_newick("((a:1,b:2.5)c:0.5,'d e':3)r;", quoted_names=True)
+        self.assertEqual(root.name, "r")
+        self.assertEqual([child.name for child in root.children], ["c", "d e"])
+        self.assertEqual([(leaf.name, leaf.distance) for leaf in root.children[0].children],
+                         [("a", 1.0), ("b", 2.5)])
+
+    def test_malformed(self):
+        with self.assertRaises(NewickError):
+            _read_newick("((a,b),c")
+
+    def test_deep_tree(self):
+        root = _read_newick(produce_caterpillar_newick(5000))
+        depth = 0
+        node = root
+        while node.children:
+            self.assertEqual([child.name for child in node.children][1:], [f"l{5000 - 1 - depth}"])
+            node = node.children[0]
+            depth += 1
+        self.assertEqual((depth, node.name, node.distance), (4999, "l0", 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
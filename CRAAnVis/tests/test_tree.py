@@ -0,0 +1,56 @@
+import unittest
+
+from model.tree import produce_tree_model, TreeNode
+
+
+def produce_tree_data(newick, gains):
+    return {
+        "newick": newick,
+        "rec_gains_losses": {"rec_gains": gains, "rec_losses": {}},
+        "other_events": {"rec_contra_dict": {}, "rec_duplications_dict": {}, "rec_rearrangements_dict": {}},
+    }
+
+
+class TestNameIndex(unittest.TestCase):
+    def test_events_of_duplicate_names(self):
+        root = produce_tree_model(produce_tree_data("((x:1,y:1)i:1,(x:1,z:1)j:1)r;", {"x": [1, 2], "z": [3]}))
+        nodes = root.get_nodes_by_name("x")
+        self.assertEqual(len(nodes), 2)
+        self.assertIs(root.get_node_by_name("x"), nodes[0])
+        for node in nodes:
+            self.assertEqual(node.events["gains"], [1, 2])
+        self.assertEqual(root.get_node_by_name("z").events["gains"], [3])
+        self.assertEqual(root.get_nodes_by_name("missing"), [])
+        self.assertIsNone(root.get_node_by_name("missing"))
+
+    def test_index_follows_new_children(self):
+        root = produce_tree_model(produce_tree_data("(a:1,b:1)r;", {}))
+        new_node = TreeNode("a")
+        root.get_node_by_name("b").add_child(new_node)
+        self.assertEqual(root.get_nodes_by_name("a")[1], new_node)
+        new_node.name = "c"
+        self.assertIs(root.get_node_by_name("c"), new_node)
+        self.assertEqual(len(root.get_nodes_by_name("a")), 1)
+
+
+class TestEvents(unittest.TestCase):
+    def test_events_are_written_through_set_events(self):
+        root = produce_tree_model(produce_tree_data("(a:1,b:1)r;", {"a": [1]}))
+        with_events, without_events = root.get_node_by_name("a"), root.get_node_by_name("b")
+        for node in (with_events, without_events):
+            with self.assertRaises(TypeError):
+                node.events["gains"] = [2]
+        self.assertEqual(without_events.events["gains"], ())
+        without_events.set_events("gains", [2])
+        self.assertEqual(without_events.events["gains"], [2])
+        self.assertEqual(root.get_node_by_name("r").events["gains"], ())
+
+    def test_assign_all_events(self):
+        node = TreeNode("a")
+        node.events = {"losses": [[3], [4]]}
+        self.assertEqual(node.events["losses"], [[3], [4]])
+        self.assertEqual(node.events["gains"], ())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,14 +1,84 @@
-from PyQt6.QtCore import QRectF, Qt, QSettings, QTimer
+import bisect
+
+from PyQt6.QtCore import QRectF, Qt, QSettings
 from PyQt6.QtGui import QColor, QPen, QPainter, QAction, QBrush
 from PyQt6.QtWidgets import QGraphicsRectItem, QMenu, QGraphicsItem, QGraphicsSimpleTextItem
 
-from model.arrays import get_node_by_name, gather_upstream_gains, gather_upstream_losses
+from model.arrays import ABSENT, PRESENT, DELETED
 from model.helper_functions import adapt_font_to_width
 from model.model_container import ModelContainer
 from view.colors.highlighting import HighlightManagingMixin
+from view.level_of_detail import detail_level, DetailTextItem, FULL, NO_TEXT, NO_OUTLINES, FLAT
+from view.tooltips import LazyToolTipMixin, cached_tooltip
+
+
+def spacer_tooltip(spacer, original_names=False) -> str:
+    if original_names:
+        tt_string = (f"Original Name {spacer.original_name}"
+                     f"\nSpacer {spacer.name}")
+    else:
+        tt_string = (f"Spacer {spacer.name}"
+                     f"\nOriginal Name {spacer.original_name}")
+    if spacer.duplicates:
+        if len(spacer.duplicates) == 1:
+            tt_string += f"\nDuplicate {next(iter(spacer.duplicates))}"
+        else:
+            tt_string += f"\nDuplicates {', '.join(spacer.duplicates)}"
+    if spacer.metadata:
+        for key, value in spacer.metadata.items():
+            tt_string += f"\n{key}: {value}"
+    return tt_string
+
+
+def deleted_spacer_tooltip(spacer) -> str:
+    tt_string = (f"Deleted Spacer {spacer.name}"
+                 f"\nOriginal Name {spacer.original_name}")
+    for key, value in spacer.metadata.items():
+        tt_string += f"\n{key}: {value}"
+    return tt_string
+
+
+def exec_spacer_context_menu(app_config, spacer, color_group, screen_pos):
+    """Show the context menu of a spacer in an array."""
+    color_manager = app_config.color_manager
+    contextMenu = QMenu()
+
+    newHighlightEventsAction = QAction("Highlight Spacer in Tree")
+    contextMenu.addAction(newHighlightEventsAction)
+    newHighlightEventsAction.triggered.connect(lambda: color_manager.highlight_event(spacer.name))
+
+    if color_group:
+        newCatColorPicAction = QAction("Pick New Group Color")
+        contextMenu.addAction(newCatColorPicAction)
+        newCatColorPicAction.triggered.connect(lambda: color_manager.pic_new_color(spacer.name, color_group))
+
+        newCatColorAction = QAction("Set New Group Color Randomly")
+        contextMenu.addAction(newCatColorAction)
+        newCatColorAction.triggered.connect(lambda: color_manager.set_new_rand_color(spacer.name, color_group))
+    else:
+        newColorAction = QAction("Pick New Spacer Color")
+        contextMenu.addAction(newColorAction)
+        newColorAction.triggered.connect(lambda: color_manager.pic_new_color(spacer.name, "spacer"))
+
+        newRandomColorAction = QAction("Set New Spacer Color Randomly")
+        contextMenu.addAction(newRandomColorAction)
+        newRandomColorAction.triggered.connect(lambda: color_manager.set_new_rand_color(spacer.name, "spacer"))
+
+    if spacer.duplicates:
+        newHighlightDuplicatesAction = QAction("Highlight Duplicates")
+        contextMenu.addAction(newHighlightDuplicatesAction)
+        newHighlightDuplicatesAction.triggered.connect(lambda: highlight_duplicates(color_manager, spacer))
 
+    contextMenu.exec(screen_pos)
 
-class SpacerItem(HighlightManagingMixin, QGraphicsRectItem):
+
+def highlight_duplicates(color_manager, spacer):
+    for sp_name in spacer.duplicates:
+        color_manager.highlight_event(sp_name)
+    color_manager.highlight_event(spacer.name)
+
+
+class SpacerItem(HighlightManagingMixin, LazyToolTipMixin, QGraphicsRectItem):
     """Class for visualizing a single spacer."""
     def __init__(self, app_config, model,
                  x, y, width, height,
@@ -33,7 +103,6 @@ class SpacerItem(HighlightManagingMixin, QGraphicsRectItem):
         if self.template:
             self.highlighted = False
             self.blink_state = False
-            self.blink_timer = None
             self.blink_pen = None
             self.blink_brush = None
 
@@ -44,7 +113,7 @@ class SpacerItem(HighlightManagingMixin, QGraphicsRectItem):
 
         self.font = font
         self.font = adapt_font_to_width(self.font, str(self.name), width)
-        self.text = QGraphicsSimpleTextItem(str(self.name), self)
+        self.text = DetailTextItem(app_config, str(self.name), self)
         self.text.setFont(self.font)
         self.text.setPos(self.rect().center() - self.text.boundingRect().center())
 
@@ -57,26 +126,13 @@ class SpacerItem(HighlightManagingMixin, QGraphicsRectItem):
         # register with color manager
         self.app_config.color_manager.register_item(self)
 
-        # tooltip
-        if self.original_names:
-            tt_string = (f"Original Name {self.model.original_name}"
-                         f"\nSpacer {self.model.name}")
-        else:
-            tt_string = (f"Spacer {self.model.name}"
-                         f"\nOriginal Name {self.model.original_name}")
-        if self.model.duplicates:
-            if len(self.model.duplicates) == 1:
-                tt_string += f"\nDuplicate {next(iter(self.model.duplicates))}"
-            else:
-                tt_string += f"\nDuplicates {', '.join(self.model.duplicates)}"
-        if self.model.metadata:
-            for key, value in self.model.metadata.items():
-                tt_string += f"\n{key}: {value}"
-        self.setToolTip(tt_string)
-
         # restorable position
         self.restorable_pos = None
 
+    def produce_tooltip(self, pos) -> str:
+        return cached_tooltip(("spacer", self.model, self.original_names),
+                              spacer_tooltip, self.model, self.original_names)
+
     def store_pos(self):
         self.restorable_pos = self.pos()
 
@@ -89,64 +145,20 @@ class SpacerItem(HighlightManagingMixin, QGraphicsRectItem):
     def contextMenuEvent(self, event):
         if self.original_names:
             return
-        contextMenu = QMenu()
-
-        newHighlightEventsAction = QAction("Highlight Spacer in Tree")
-        contextMenu.addAction(newHighlightEventsAction)
-        newHighlightEventsAction.triggered.connect(self.highlight_spacer_in_tree)
-
-        # delete color printing in production:
-        # printMyColorsAction = QAction("Print my Color")
-        # printMyColorsAction.triggered.connect(self.print_my_colors)
-        # contextMenu.addAction(printMyColorsAction)
-
-        if self.color_group:
-            newCatColorPicAction = QAction("Pick New Group Color")
-            contextMenu.addAction(newCatColorPicAction)
-            newCatColorPicAction.triggered.connect(self.change_cat_color)
+        exec_spacer_context_menu(self.app_config, self.model, self.color_group, event.screenPos())
 
-            newCatColorAction = QAction("Set New Group Color Randomly")
-            contextMenu.addAction(newCatColorAction)
-            newCatColorAction.triggered.connect(self.change_cat_color_randomly)
-        else:
-            newColorAction = QAction("Pick New Spacer Color")
-            contextMenu.addAction(newColorAction)
-            newColorAction.triggered.connect(self.change_color)
-
-            newRandomColorAction = QAction("Set New Spacer Color Randomly")
-            contextMenu.addAction(newRandomColorAction)
-            newRandomColorAction.triggered.connect(self.change_color_randomly)
-
-        if self.model.duplicates:
-            newHighlightDuplicatesAction = QAction("Highlight Duplicates")
-            contextMenu.addAction(newHighlightDuplicatesAction)
-            newHighlightDuplicatesAction.triggered.connect(self.highlight_duplicates)
-
-        contextMenu.exec(event.screenPos())
+    def paint(self, painter: QPainter, option, widget=None):
+        if detail_level(self.app_config, painter) >= NO_TEXT:
+            super().paint(painter, option, widget)
+            return
+        # fill only
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.brush())
+        painter.drawRect(self.rect())
 
     def print_my_colors(self):
         print(self.pen_color.name(), self.brush_color.name())
 
-    def highlight_duplicates(self):
-        for sp_name in self.model.duplicates:
-            self.app_config.color_manager.highlight_event(sp_name)
-        self.app_config.color_manager.highlight_event(self.name)
-
-    def change_color_randomly(self):
-        self.app_config.color_manager.set_new_rand_color(self.name, "spacer")
-
-    def change_cat_color_randomly(self):
-        self.app_config.color_manager.set_new_rand_color(self.name, self.color_group)
-
-    def change_color(self):
-        self.app_config.color_manager.pic_new_color(self.name, "spacer")
-
-    def change_cat_color(self):
-        self.app_config.color_manager.pic_new_color(self.name, self.color_group)
-
-    def highlight_spacer_in_tree(self):
-        self.app_config.color_manager.highlight_event(self.name)
-
     def c_update_by_manager(self, name):
         """Slot to handle color update from the manager."""
         if self.original_names:
@@ -186,107 +198,445 @@ class SpacerItem(HighlightManagingMixin, QGraphicsRectItem):
         self.blink_brush = QBrush(QColor(self.brush_color.red(), self.brush_color.green(), self.brush_color.blue(), 50))
         self.blink_pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
         self.highlighted = True
-        self.blink_state = True
-        self.blink_timer = QTimer(self.parentObject())
-        self.blink_timer.timeout.connect(self.toggle_opacity)
-        self.blink_timer.start(350)
+        self.blink_state = self.app_config.color_manager.start_blinking(self)
+        self.show_blink_state()
 
     def toggle_opacity(self):
+        self.blink_state = not self.blink_state
+        self.show_blink_state()
+
+    def show_blink_state(self):
         if self.blink_state and self.highlighted:
             self.setPen(self.blink_pen)
             self.setBrush(self.blink_brush)
-            self.update()
         else:
             self.setPen(self.reg_pen)
             self.setBrush(self.reg_brush)
-            self.update()
-        self.blink_state = not self.blink_state
+        self.update()
 
     def stop_blinking(self):
+        self.app_config.color_manager.stop_blinking(self)
         self.highlighted = False
         self.blink_state = False
         self.setPen(self.reg_pen)
         self.setBrush(self.reg_brush)
         self.update()
-        if hasattr(self, 'blink_timer'):
-            if self.blink_timer is not None:
-                self.blink_timer.stop()
 
 
-class BrightDeletedSpacerItem(QGraphicsRectItem):
-    """Class for visualizing a deleted single spacer."""
-    def __init__(self, model, x, y, width, height, pen_width=1):
-        super().__init__(QRectF(x, y, width, height))
+TEXT_ALIGNMENT = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop
 
-        self.model = model
-        self.setOpacity(0.9)
 
-        self.brush().setStyle(Qt.BrushStyle.NoBrush)
-        pen = QPen(Qt.GlobalColor.red, pen_width)
-        pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
-        pen.setStyle(Qt.PenStyle.DashLine)
-        self.setPen(pen)
-        self.cross_pen = QPen(pen)
-
-        # tooltip
-        tt_string = (f"Deleted Spacer {self.model.name}"
-                     f"\nOriginal Name {self.model.original_name}")
-        for key, value in self.model.metadata.items():
-            tt_string += f"\n{key}: {value}"
-        self.setToolTip(tt_string)
+class ArrayHeaderItem(QGraphicsItem):
+    """Empty parent item of the template and original names rows.
+    The rows are moved as one when inner arrays are shown between them and the leaf arrays."""
+    def __init__(self):
+        super().__init__()
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemHasNoContents, True)
 
-        # restorable position
-        self.restorable_pos = None
+    def boundingRect(self) -> QRectF:
+        return QRectF()
 
-    def store_pos(self):
-        self.restorable_pos = self.pos()
+    def paint(self, painter: QPainter, option, widget=None):
+        pass
 
-    def restore_pos(self):
-        if self.restorable_pos:
-            self.setPos(self.restorable_pos)
-            self.update()
 
-    def paint(self, painter: QPainter, option, widget):
-        painter.setPen(self.pen())
-        painter.drawRect(self.rect())
+class SpacerMatrixItem(LazyToolTipMixin, QGraphicsItem):
+    """Class for visualizing all leaf arrays in one item.
 
-        # Draw the cross using the red pen
-        painter.setPen(self.cross_pen)
-        painter.drawLine(self.rect().topLeft(), self.rect().bottomRight())
-        painter.drawLine(self.rect().topRight(), self.rect().bottomLeft())
+    The cells are painted straight from the presence matrix of the model. A column is one template spacer,
+    so colors, font, highlight state and collapse offsets are stored per column instead of per spacer item.
+    Rows are placed by set_row_y, rows that are never placed are not drawn. Tooltips and the context menu
+    map the mouse position back to (array, spacer).
+    """
+    def __init__(self, app_config, model: ModelContainer,
+                 x_sp_margin, width, height,
+                 font, pen_width=6):
+        super().__init__()
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True)
 
+        self.app_config = app_config
+        self.matrix = model.presence_matrix
+        self.spacers = model.template.spacers
+        self.x_sp_margin = x_sp_margin
+        self.width = width
+        self.height = height
+        self.pen_width = pen_width
 
-def produce_inner_array(name, model, app_config, settings: QSettings):
-    model: ModelContainer
+        n_columns = self.matrix.n_columns
+        # cell codes of each column, row by row
+        self.column_codes = [bytes(self.matrix.data[column::n_columns]) for column in range(n_columns)]
+        self.column_by_name = {}
+        for spacer in self.spacers:
+            self.column_by_name.setdefault(spacer.name, []).append(spacer.index)
+
+        # y position of each row, None while the row is not placed
+        self.row_y = [None] * self.matrix.n_rows
+        self._rows_by_y = []
+        # (x, column) of the columns sorted by x and the range of the single cell offsets, to find exposed columns
+        self._columns_by_x = []
+        self._cell_offset_range = (0.0, 0.0)
+
+        # collapse offsets, per column and for single cells (row : {column : offset})
+        self.column_offsets = [0.0] * n_columns
+        self.cell_offsets = {}
+
+        # text of each column, the text rects are relative to the cell
+        self.column_fonts = []
+        self.column_text_rects = []
+        cell_rect = QRectF(0, 0, width, height)
+        for spacer in self.spacers:
+            column_font = adapt_font_to_width(font, spacer.name, width)
+            text = QGraphicsSimpleTextItem(spacer.name)
+            text.setFont(column_font)
+            text_rect = text.boundingRect()
+            text_rect.translate(cell_rect.center() - text_rect.center())
+            self.column_fonts.append(column_font)
+            self.column_text_rects.append(text_rect)
+        self.text_pen = QPen(QColor(0, 0, 0))
+
+        self.deleted_pen = QPen(Qt.GlobalColor.red, 1)
+        self.deleted_pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
+        self.deleted_pen.setStyle(Qt.PenStyle.DashLine)
+        self.deleted_brush = QBrush(QColor(255, 0, 0, 60))
+
+        # flat color runs of each row, built on first use at the lowest detail level
+        self._flat_runs = None
+        self._flat_brushes = {}
+
+        # colors of each column
+        self.column_pens = [None] * n_columns
+        self.column_brushes = [None] * n_columns
+        self.column_blink_pens = [None] * n_columns
+        self.column_blink_brushes = [None] * n_columns
+        self.column_color_groups = [None] * n_columns
+        for column in range(n_columns):
+            self.set_column_colors(column)
+
+        # highlighting, all highlighted columns blink with the blink clock of the color manager
+        self.highlighted_columns = set()
+        self.highlight_mode_blinking = True
+        self.blink_state = False
+        self.blinking = False
+        self.highlight_pen = QPen(QColor(0, 0, 0))
+        self.highlight_pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
+        self.highlight_brush = QBrush(QColor(255, 255, 255))
 
-    x_sp_margin = settings.value("margins/x_between_crispr_elements", type=float)
-    width = settings.value("array/spacer_width", type=float)
-    height = settings.value("array/spacer_height", type=float)
-    font = app_config.spacer_font
-    spc_pen_width = settings.value("array/spacer_pen_width", type=float)
+        self._bounding_rect = QRectF()
+        self._geometry_changed = False
 
-    new_array = []
+        # register with color manager
+        self.app_config.color_manager.register_spacer_matrix(self)
 
-    # collect these values first
-    node = get_node_by_name(model.tree, name)
-    inserted_spacers = gather_upstream_gains(node, set())
-    deleted_spacers = gather_upstream_losses(node, set())
+    def set_column_colors(self, column):
+        pen_color, brush_color, self.column_color_groups[column] = \
+            self.app_config.color_manager.get_new_col_info(self.spacers[column].name)
+        pen = QPen(QColor(pen_color), int(self.pen_width))
+        pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
+        self.column_pens[column] = pen
+        self.column_brushes[column] = QBrush(QColor(brush_color))
+        blink_pen = QPen(QColor(pen_color.red(), pen_color.green(), pen_color.blue(), 50), int(self.pen_width))
+        blink_pen.setJoinStyle(Qt.PenJoinStyle.MiterJoin)
+        self.column_blink_pens[column] = blink_pen
+        self.column_blink_brushes[column] = QBrush(QColor(brush_color.red(), brush_color.green(),
+                                                          brush_color.blue(), 50))
+        self._flat_runs = None
+
+    def set_row_y(self, name, y):
+        self.change_geometry()
+        self.row_y[self.matrix.row_index[name]] = y
+
+    def cell_x(self, row, column):
+        x = column * self.x_sp_margin + self.column_offsets[column]
+        if row in self.cell_offsets:
+            x += self.cell_offsets[row].get(column, 0.0)
+        return x
+
+    def shift_columns(self, columns, dx):
+        self.change_geometry()
+        for column in columns:
+            self.column_offsets[column] += dx
+
+    def shift_cell(self, name, column, dx):
+        self.change_geometry()
+        row_offsets = self.cell_offsets.setdefault(self.matrix.row_index[name], {})
+        row_offsets[column] = row_offsets.get(column, 0.0) + dx
+
+    def reset_offsets(self):
+        self.change_geometry()
+        self.column_offsets = [0.0] * self.matrix.n_columns
+        self.cell_offsets = {}
+
+    def change_geometry(self):
+        """Announce a change of rows or offsets, the row order and the bounding rect are updated on next use."""
+        if not self._geometry_changed:
+            self.prepareGeometryChange()
+            self._geometry_changed = True
+            self._flat_runs = None
+
+    def update_geometry(self):
+        if not self._geometry_changed:
+            return
+        self._geometry_changed = False
+        self._rows_by_y = sorted((y, row) for row, y in enumerate(self.row_y) if y is not None)
+        if not self._rows_by_y or not self.spacers:
+            self._bounding_rect = QRectF()
+            return
+        column_xs = [column * self.x_sp_margin + offset for column, offset in enumerate(self.column_offsets)]
+        self._columns_by_x = sorted((x, column) for column, x in enumerate(column_xs))
+        offsets = [offset for row_offsets in self.cell_offsets.values() for offset in row_offsets.values()]
+        self._cell_offset_range = (min(offsets, default=0.0), max(offsets, default=0.0))
+        for row, row_offsets in self.cell_offsets.items():
+            column_xs.extend(self.cell_x(row, column) for column in row_offsets)
+        margin = self.pen_width / 2
+        left, right = min(column_xs) - margin, max(column_xs) + self.width + margin
+        top, bottom = self._rows_by_y[0][0] - margin, self._rows_by_y[-1][0] + self.height + margin
+        self._bounding_rect = QRectF(left, top, right - left, bottom - top)
+
+    @property
+    def rows_by_y(self):
+        """(y, row) of the placed rows, sorted by y."""
+        self.update_geometry()
+        return self._rows_by_y
+
+    @property
+    def columns_by_x(self):
+        """(x, column) of the columns without single cell offsets, sorted by x."""
+        self.update_geometry()
+        return self._columns_by_x
+
+    def boundingRect(self) -> QRectF:
+        self.update_geometry()
+        return self._bounding_rect
+
+    def exposed_rows(self, exposed: QRectF):
+        """Placed rows that intersect the exposed rect, sorted by y."""
+        margin = self.pen_width / 2
+        rows_by_y = self.rows_by_y
+        start = bisect.bisect_left(rows_by_y, (exposed.top() - self.height - margin, -1))
+        end = bisect.bisect_right(rows_by_y, (exposed.bottom() + margin, len(self.row_y)))
+        return [row for y, row in rows_by_y[start:end]]
+
+    def exposed_columns(self, exposed: QRectF):
+        """Columns with cells that may intersect the exposed rect. Collapsed columns can overlap, so they are
+        returned in template order to keep the painting order."""
+        margin = self.pen_width / 2
+        columns_by_x = self.columns_by_x
+        min_offset, max_offset = self._cell_offset_range
+        start = bisect.bisect_left(columns_by_x, (exposed.left() - self.width - margin - max_offset, -1))
+        end = bisect.bisect_right(columns_by_x, (exposed.right() + margin - min_offset, len(columns_by_x)))
+        return sorted(column for x, column in columns_by_x[start:end])
+
+    def paint(self, painter: QPainter, option, widget=None):
+        level = detail_level(self.app_config, painter)
+        exposed = option.exposedRect
+        margin = self.pen_width / 2
+        row_y = self.row_y
+        exposed_rows = self.exposed_rows(exposed)
+        if level < FULL:
+            # axis aligned cells look the same without antialiasing once the text is gone
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        if level == FLAT:
+            self.paint_flat(painter, exposed_rows)
+            return
+        width, height = self.width, self.height
+
+        for column in self.exposed_columns(exposed):
+            codes = self.column_codes[column]
+            present = []
+            deleted = []
+            column_x = column * self.x_sp_margin + self.column_offsets[column]
+            for row in exposed_rows:
+                code = codes[row]
+                if code == ABSENT:
+                    continue
+                x = column_x
+                if row in self.cell_offsets:
+                    x += self.cell_offsets[row].get(column, 0.0)
+                if x - margin > exposed.right() or x + width + margin < exposed.left():
+                    continue
+                if code == PRESENT:
+                    present.append(QRectF(x, row_y[row], width, height))
+                elif code == DELETED:
+                    deleted.append(QRectF(x, row_y[row], width, height))
+
+            if present:
+                self.select_column_colors(painter, column)
+                if level == NO_OUTLINES:
+                    painter.setPen(Qt.PenStyle.NoPen)
+                painter.drawRects(present)
+                if level == FULL:
+                    painter.setPen(self.text_pen)
+                    painter.setFont(self.column_fonts[column])
+                    text_rect = self.column_text_rects[column]
+                    name = self.spacers[column].name
+                    for rect in present:
+                        painter.drawText(text_rect.translated(rect.x(), rect.y()), TEXT_ALIGNMENT, name)
+            if deleted and level == NO_OUTLINES:
+                painter.setPen(Qt.PenStyle.NoPen)
+                painter.setBrush(self.deleted_brush)
+                painter.drawRects(deleted)
+            elif deleted:
+                painter.save()
+                painter.setOpacity(painter.opacity() * 0.9)
+                painter.setPen(self.deleted_pen)
+                painter.setBrush(Qt.BrushStyle.NoBrush)
+                painter.drawRects(deleted)
+                for rect in deleted:
+                    painter.drawLine(rect.topLeft(), rect.bottomRight())
+                    painter.drawLine(rect.topRight(), rect.bottomLeft())
+                painter.restore()
+
+    def paint_flat(self, painter, exposed_rows):
+        """Paint the exposed rows as flat color runs, one drawRects call per fill."""
+        if self._flat_runs is None:
+            self.update_flat_runs()
+        runs_by_fill = {}
+        for row in exposed_rows:
+            for rect, fill in self._flat_runs[row]:
+                runs_by_fill.setdefault(fill, []).append(rect)
+        painter.setPen(Qt.PenStyle.NoPen)
+        for fill, rects in runs_by_fill.items():
+            if fill in self._flat_brushes:
+                painter.setBrush(self._flat_brushes[fill])
+            else:
+                # highlighted columns are runs of their own, their brush changes while blinking
+                self.select_column_colors(painter, fill[1])
+                painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawRects(rects)
+
+    def update_flat_runs(self):
+        """Merge the cells of each row into runs of the same fill, without the gaps between cells."""
+        self._flat_brushes = {("deleted",): self.deleted_brush}
+        n_columns = self.matrix.n_columns
+        data = self.matrix.data
+        self._flat_runs = [[] for _ in self.row_y]
+        for y, row in self.rows_by_y:
+            cells = []
+            for column, code in enumerate(data[row * n_columns:(row + 1) * n_columns]):
+                if code == ABSENT:
+                    continue
+                if code == DELETED:
+                    fill = ("deleted",)
+                elif column in self.highlighted_columns:
+                    fill = ("column", column)
+                else:
+                    brush = self.column_brushes[column]
+                    fill = ("color", brush.color().rgba())
+                    self._flat_brushes.setdefault(fill, brush)
+                cells.append((self.cell_x(row, column), fill))
+            cells.sort(key=lambda cell: cell[0])
+            row_runs = self._flat_runs[row]
+            run_x = run_end = run_fill = None
+            for x, fill in cells:
+                if fill == run_fill and x <= run_end + 0.5:
+                    run_end = max(run_end, x + self.x_sp_margin)
+                    continue
+                if run_fill is not None:
+                    row_runs.append((QRectF(run_x, y, run_end - run_x, self.height), run_fill))
+                run_x, run_end, run_fill = x, x + self.x_sp_margin, fill
+            if run_fill is not None:
+                row_runs.append((QRectF(run_x, y, run_end - run_x, self.height), run_fill))
+
+    def select_column_colors(self, painter, column):
+        if column in self.highlighted_columns:
+            if not self.highlight_mode_blinking:
+                painter.setPen(self.highlight_pen)
+                painter.setBrush(self.highlight_brush)
+                return
+            if self.blink_state:
+                painter.setPen(self.column_blink_pens[column])
+                painter.setBrush(self.column_blink_brushes[column])
+                return
+        painter.setPen(self.column_pens[column])
+        painter.setBrush(self.column_brushes[column])
+
+    def cell_at(self, pos):
+        """Return (row, column) of the topmost cell at pos, None if there is no cell."""
+        margin = self.pen_width / 2
+        y_ix = bisect.bisect_right(self.rows_by_y, (pos.y() + margin, len(self.row_y)))
+        for y, row in reversed(self.rows_by_y[max(0, y_ix - 2):y_ix]):
+            if not y - margin <= pos.y() <= y + self.height + margin:
+                continue
+            for column in range(len(self.column_codes) - 1, -1, -1):
+                if self.column_codes[column][row] == ABSENT:
+                    continue
+                x = self.cell_x(row, column)
+                if x - margin <= pos.x() <= x + self.width + margin:
+                    return row, column
+        return None
+
+    def produce_tooltip(self, pos) -> str:
+        cell = self.cell_at(pos)
+        if cell is None:
+            return ""
+        row, column = cell
+        spacer = self.spacers[column]
+        if self.column_codes[column][row] == PRESENT:
+            return cached_tooltip(("spacer", spacer, False), spacer_tooltip, spacer)
+        return cached_tooltip(("deleted", spacer), deleted_spacer_tooltip, spacer)
 
-    for spacer in model.template.spacers:
-        x = spacer.index * x_sp_margin
-        pen_color, brush_color, cat_color_group = app_config.color_manager.get_new_col_info(spacer.name)
+    def contextMenuEvent(self, event):
+        cell = self.cell_at(event.pos())
+        if cell is None or self.column_codes[cell[1]][cell[0]] != PRESENT:
+            event.ignore()
+            return
+        column = cell[1]
+        exec_spacer_context_menu(self.app_config, self.spacers[column], self.column_color_groups[column],
+                                 event.screenPos())
+
+    def update_column(self, column):
+        margin = self.pen_width / 2
+        rect = self.boundingRect()
+        x = column * self.x_sp_margin + self.column_offsets[column]
+        if self.cell_offsets:
+            self.update()
+        else:
+            self.update(QRectF(x - margin, rect.top(), self.width + 2 * margin, rect.height()))
 
-        if spacer.name in inserted_spacers and spacer.name not in deleted_spacers:
-            curr_sp_item = SpacerItem(app_config, spacer,
-                                      x, 0, width, height,
-                                      font, brush_color, pen_color, spc_pen_width,
-                                      False, cat_color_group)
-            new_array.append(curr_sp_item)
-        elif spacer.name in deleted_spacers:
-            del_item = BrightDeletedSpacerItem(spacer, x, 0, width, height)
-            new_array.append(del_item)
+    def c_update_by_manager(self, name):
+        """Slot to handle color update from the manager."""
+        if name == "all":
+            for column in range(len(self.spacers)):
+                self.set_column_colors(column)
+            self.update()
+        elif name in self.column_by_name:
+            for column in self.column_by_name[name]:
+                self.set_column_colors(column)
+                self.update_column(column)
+
+    def highlight_by_manager(self, name, y_n_bool=None):
+        for column in self.column_by_name.get(name, []):
+            if y_n_bool is None:
+                highlight = column not in self.highlighted_columns
+            else:
+                highlight = y_n_bool
+            if highlight:
+                self.highlighted_columns.add(column)
+            else:
+                self.highlighted_columns.discard(column)
+            self._flat_runs = None
+            self.update_column(column)
+        self.update_blinking()
+
+    def change_highlight_mode(self, blinking: bool):
+        self.highlight_mode_blinking = blinking
+        self.update_blinking()
+        for column in self.highlighted_columns:
+            self.update_column(column)
+
+    def update_blinking(self):
+        blinking = self.highlight_mode_blinking and len(self.highlighted_columns) > 0
+        if blinking and not self.blinking:
+            self.blink_state = self.app_config.color_manager.start_blinking(self)
+        elif not blinking and self.blinking:
+            self.app_config.color_manager.stop_blinking(self)
+            self.blink_state = False
+        self.blinking = blinking
 
-    return new_array
+    def toggle_opacity(self):
+        self.blink_state = not self.blink_state
+        for column in self.highlighted_columns:
+            self.update_column(column)
 
 
 def add_arrays_to_dict(model, app_config, settings: QSettings):
@@ -303,17 +653,15 @@ def add_arrays_to_dict(model, app_config, settings: QSettings):
     org_spc_pen_width = spc_pen_width - spc_pen_width / 5
 
     # add QGraphicGroups
-    for array_name in model.arrays_dict.keys():
-        all_groups_dict[array_name] = []
-
     all_groups_dict["template"] = []
     all_groups_dict["original_names"] = []
 
+    grey = Qt.GlobalColor.gray
+
     # add items to groups
     for spacer in model.template.spacers:
         x = spacer.index * x_sp_margin
         pen_color, brush_color, cat_color_group = app_config.color_manager.get_new_col_info(spacer.name)
-        grey = Qt.GlobalColor.gray
         # template
         template_sp_item = SpacerItem(app_config, spacer,
                                       x, 0, width, height,
@@ -328,18 +676,9 @@ def add_arrays_to_dict(model, app_config, settings: QSettings):
                                  True, cat_color_group)
         all_groups_dict["original_names"].append(org_sp_item)
 
-        # all others
-        for array_name, array in model.arrays_dict.items():
-            if array[spacer.index] == 1:
-                sp_item = SpacerItem(app_config, spacer,
-                                     x, 0, width, height,
-                                     font, brush_color, pen_color, spc_pen_width,
-                                     False, cat_color_group)
-                all_groups_dict[array_name].append(sp_item)
-            elif array[spacer.index] == "d":
-                del_item = BrightDeletedSpacerItem(spacer, x, 0, width, height)
-                all_groups_dict[array_name].append(del_item)
-            else:
-                continue
+    # all others in one item, painted from the presence matrix
+    all_groups_dict["array_matrix"] = SpacerMatrixItem(app_config, model,
+                                                       x_sp_margin, width, height,
+                                                       font, spc_pen_width)
 
     return all_groups_dict
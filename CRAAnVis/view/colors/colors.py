@@ -3,12 +3,13 @@ import itertools
 import math
 import random
 
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, pyqtSignal, QTimer
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import QColorDialog
 
 from model.model_container import ModelContainer
 from view.array_rendering.render_arrays import SpacerItem
+from view.tree_rendering.tree_events import EventPoolItem
 from view.colors.color_schemes import (C_2, C_3, C_4, C_5, C_6, C_7, C_8, C_10, C_13, C_15, C_21, C_23, C_26, C_35,
                                        C_41, C_62, C_97, C_139, C_230, C_470, C_1232)
 from view.legend.render_legend import prod_arr_legend_items
@@ -176,7 +177,7 @@ def produce_random_color():
 
 class TreeSignalManager(QObject):
     switchNodeChildren = pyqtSignal(str, bool)
-    redrawTree = pyqtSignal()
+    redrawTree = pyqtSignal(int)
     show_inner_array = pyqtSignal(str)
 
     def __init__(self):
@@ -191,14 +192,37 @@ class ColorManager(QObject):
     highlightMode = pyqtSignal(bool)
     updateArrayLegend = pyqtSignal()
 
-    def __init__(self, app_config, model: ModelContainer, two_color_mode):  # , legend_update_func):
+    def __init__(self, app_config, model: ModelContainer, two_color_mode, scene=None):  # , legend_update_func):
         super().__init__()
 
         self.app_config = app_config
         self.model = model
         self.spacer_names = model.get_spacer_names()
+        self.scene = scene
 
+        # registered items, indexed by the spacer names they show, so an update of one spacer only reaches its items
+        # sp_name -> [items], pooled events are listed under each pooled spacer
         self.sp_names_items = {}
+        self.sp_names_highlight_items = {}
+        self.color_items = []
+        self.highlight_items = []
+        self.csplit_items = []
+        self.spacer_matrices = []
+        # current highlight and color split state, items registered later (lazy tree events) start in it
+        self.highlighted_names = set()
+        self.highlight_blinking = True
+        self.event_color_split = None
+        self.updateItemColor.connect(self.dispatch_item_color)
+        self.highlightEvent.connect(self.dispatch_highlight)
+        self.highlightMode.connect(self.dispatch_highlight_mode)
+        self.updateEventColorSplit.connect(self.dispatch_color_split)
+
+        # one blink clock for all highlighted items, they blink in the same phase
+        self.blink_state = True
+        self.blinking_items = set()
+        self.blink_timer = QTimer(self)
+        self.blink_timer.setInterval(350)
+        self.blink_timer.timeout.connect(self.toggle_blink_state)
 
         # map_name:color_map (dict) -> sp_name: (pen_color, brush_color)
         self.color_maps = {}
@@ -215,8 +239,6 @@ class ColorManager(QObject):
         # map_name:unused_colors (dict) -> map_name: [unused_colors]
         self.cmap_unused_colors = {}
 
-        self.cmap_previous_to_zoom = None
-
         # after that go back to initializing different color maps
         self.current_map_name = None
         if two_color_mode:
@@ -364,24 +386,93 @@ class ColorManager(QObject):
         self.cmap_unused_colors[map_name] = color_map_generator.get_15_unused_colors()
 
     def register_item(self, item):
-        """Register an item with a specific name."""
-        name = item.name
-        if name not in self.sp_names_items:
-            self.sp_names_items[name] = []
-        self.sp_names_items[name].append(item)
-        self.updateItemColor.connect(item.c_update_by_manager)
-        if type(item) is SpacerItem:
-            if item.template:
-                self.highlightEvent.connect(item.highlight_by_manager)
-                self.highlightMode.connect(item.change_highlight_mode)
-        # if item not spacer item type connect to updateEventColorSplit
+        """Register an item under the spacer names it shows."""
+        # pooled events show several spacers
+        names = item.names if isinstance(item, EventPoolItem) else [item.name]
+        for name in names:
+            self.sp_names_items.setdefault(name, []).append(item)
+        self.color_items.append(item)
+        if type(item) is SpacerItem and not item.template:
+            return
+        for name in names:
+            self.sp_names_highlight_items.setdefault(name, []).append(item)
+        self.highlight_items.append(item)
+        # if item not spacer item type it follows the event color split
         if type(item) is not SpacerItem:
-            self.updateEventColorSplit.connect(item.csplit_update_by_manager)
-            self.highlightEvent.connect(item.highlight_by_manager)
-            self.highlightMode.connect(item.change_highlight_mode)
+            self.csplit_items.append(item)
             # set to current color mode
-            if self.cmap_single_c[self.current_map_name]:
-                item.csplit_update_by_manager("single_color")
+            if self.event_color_split is not None:
+                item.csplit_update_by_manager(self.event_color_split)
+        if not self.highlight_blinking:
+            item.change_highlight_mode(False)
+        for name in names:
+            if name in self.highlighted_names:
+                item.highlight_by_manager(name, True)
+
+    def register_spacer_matrix(self, matrix_item):
+        """Register the item of all leaf arrays, it looks up the colors of its columns by spacer name."""
+        self.spacer_matrices.append(matrix_item)
+
+    def dispatch_item_color(self, name):
+        """Pass a color update to the items of one spacer, or to all items for "all"."""
+        if name == "all":
+            self.batch_scene_update()
+            items = self.color_items
+        else:
+            items = self.sp_names_items.get(name, [])
+        for item in items:
+            item.c_update_by_manager(name)
+        for matrix_item in self.spacer_matrices:
+            matrix_item.c_update_by_manager(name)
+
+    def dispatch_highlight(self, name, y_n_bool=None):
+        if y_n_bool or (y_n_bool is None and name not in self.highlighted_names):
+            self.highlighted_names.add(name)
+        else:
+            self.highlighted_names.discard(name)
+        for item in self.sp_names_highlight_items.get(name, []):
+            item.highlight_by_manager(name, y_n_bool)
+        for matrix_item in self.spacer_matrices:
+            matrix_item.highlight_by_manager(name, y_n_bool)
+
+    def dispatch_highlight_mode(self, blinking):
+        self.highlight_blinking = blinking
+        self.batch_scene_update()
+        for item in self.highlight_items:
+            item.change_highlight_mode(blinking)
+        for matrix_item in self.spacer_matrices:
+            matrix_item.change_highlight_mode(blinking)
+
+    def dispatch_color_split(self, csplit):
+        self.event_color_split = csplit
+        self.batch_scene_update()
+        for item in self.csplit_items:
+            item.csplit_update_by_manager(csplit)
+
+    def start_blinking(self, item) -> bool:
+        """Let the item blink with the shared clock. Returns the current blink state to start in."""
+        if not self.blinking_items:
+            self.blink_state = True
+            self.blink_timer.start()
+        self.blinking_items.add(item)
+        return self.blink_state
+
+    def stop_blinking(self, item):
+        self.blinking_items.discard(item)
+        if not self.blinking_items:
+            self.blink_timer.stop()
+
+    def toggle_blink_state(self):
+        """Flip the blink state of all blinking items, only these are repainted."""
+        self.blink_state = not self.blink_state
+        for item in self.blinking_items:
+            item.toggle_opacity()
+
+    def batch_scene_update(self):
+        """Schedule one repaint of the whole scene before a global update. The items still call update()
+        themselves, this only makes the views redraw everything once in the next paint event."""
+        if self.scene is not None:
+            self.scene.update()
 
     def create_color_map(self, map_name):
         """Create a new color map."""
@@ -393,8 +484,6 @@ class ColorManager(QObject):
 
     def set_color_map(self, map_name, c_map_type=None):
         """Switch to a different color map and update all items' colors."""
-        if map_name == "sp_frequency":
-            self.cmap_previous_to_zoom = self.current_map_name
         self.current_map_name = map_name
         if map_name not in self.color_maps:
             self.initialize_color_map(map_name, c_map_type)
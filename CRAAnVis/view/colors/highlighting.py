@@ -1,9 +1,9 @@
-from PyQt6.QtCore import QTimer, Qt
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPen, QColor, QBrush
 
 
 class HighlightManagingMixin:
-    """Mixin to add highlighting functionality """
+    """Mixin to add highlighting functionality, blinking items follow the blink clock of the color manager."""
     def __init__(self):
         self.highlighted = False
         self.blink_state = False
@@ -80,17 +80,12 @@ class HighlightManagingMixin:
                     self.start_highlight()
 
     def start_blinking(self):
-        self.blink_state = True
-        self.blink_timer = QTimer(self.parentObject())
-        self.blink_timer.timeout.connect(self.toggle_opacity)
-        self.blink_timer.start(350)
+        self.blink_state = self.app_config.color_manager.start_blinking(self)
         self.highlighted = True
+        self.update()
 
     def stop_blinking(self):
-        if hasattr(self, 'blink_timer'):
-            if self.blink_timer is not None:
-                self.blink_timer.stop()
-            self.blink_timer.stop()
+        self.app_config.color_manager.stop_blinking(self)
         self.highlighted = False
         self.blink_state = False
         self.update()
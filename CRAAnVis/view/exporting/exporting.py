@@ -33,7 +33,8 @@ def print_to_png(view, file_path=None, clipboard=False):
         if file_path == "_cv.png":
             return
 
-    # setup view
+    # setup view, all events are drawn
+    view.show_all_events()
     view.app_config.color_manager.set_highlight_blinking(False)
 
     # setup pixmap
@@ -45,10 +46,15 @@ def print_to_png(view, file_path=None, clipboard=False):
     painter = QPainter(pixmap)
     painter.setRenderHint(QPainter.RenderHint.Antialiasing)
 
-    # Render the scene with scene and target rectangles
+    # Render the scene with scene and target rectangles, always at full detail
     scene_rect = view.scene.sceneRect()
     target_rect = QRectF(0, 0, out_size.width(), out_size.height())
-    view.scene.render(painter, target_rect, scene_rect)
+    level_of_detail = view.app_config.level_of_detail
+    view.app_config.level_of_detail = False
+    try:
+        view.scene.render(painter, target_rect, scene_rect)
+    finally:
+        view.app_config.level_of_detail = level_of_detail
 
     painter.end()
     if clipboard:
@@ -109,7 +115,8 @@ def print_to_pdf(view, file_path=None):
     elif file_path is None:
         file_path = get_save_pdf_path(view)
 
-    # setup view
+    # setup view, all events are drawn
+    view.show_all_events()
     view.app_config.color_manager.set_highlight_blinking(False)
 
     printer = QPrinter()
@@ -134,12 +141,16 @@ def print_to_pdf(view, file_path=None):
     printer.setPageMargins(page_margins)
 
     painter = QPainter(printer)
+    level_of_detail = view.app_config.level_of_detail
+    view.app_config.level_of_detail = False
     try:
         view.scene.render(painter)
         painter.end()
         print(f"PDF file saved to {file_path}")
     except FileNotFoundError:
         print(f"FileNotFoundError: {file_path}")
+    finally:
+        view.app_config.level_of_detail = level_of_detail
     view.app_config.color_manager.set_highlight_blinking(view.ui.actionBlinking_Highlights.isChecked())
 
 
@@ -0,0 +1,33 @@
+from PyQt6.QtWidgets import QGraphicsSimpleTextItem, QStyleOptionGraphicsItem
+
+# detail levels, each level drops the details of the level above
+FULL = 3
+NO_TEXT = 2  # no text labels
+NO_OUTLINES = 1  # no outlines, no color splits
+FLAT = 0  # flat color runs
+
+
+def detail_level(app_config, painter) -> int:
+    """Return the detail level for the current scale of the painter."""
+    if not app_config.level_of_detail:
+        return FULL
+    lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+    if lod >= app_config.lod_text_scale:
+        return FULL
+    if lod >= app_config.lod_outline_scale:
+        return NO_TEXT
+    if lod >= app_config.lod_flat_scale:
+        return NO_OUTLINES
+    return FLAT
+
+
+class DetailTextItem(QGraphicsSimpleTextItem):
+    """Text label that is only painted at full detail."""
+    def __init__(self, app_config, text, parent=None):
+        super().__init__(text, parent)
+        self.app_config = app_config
+
+    def paint(self, painter, option, widget=None):
+        if detail_level(self.app_config, painter) < FULL:
+            return
+        super().paint(painter, option, widget)
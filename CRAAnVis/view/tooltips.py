@@ -0,0 +1,48 @@
+from collections import OrderedDict
+
+from PyQt6.QtWidgets import QGraphicsScene, QToolTip
+
+TOOLTIP_CACHE_SIZE = 256
+# key -> tooltip string, in order of last use
+_tooltip_cache = OrderedDict()
+
+
+def cached_tooltip(key, produce_tooltip, *args) -> str:
+    """Return the tooltip for key, produce_tooltip(*args) is only called if it was not shown recently."""
+    tooltip = _tooltip_cache.get(key)
+    if tooltip is None:
+        tooltip = produce_tooltip(*args)
+        _tooltip_cache[key] = tooltip
+        if len(_tooltip_cache) > TOOLTIP_CACHE_SIZE:
+            _tooltip_cache.popitem(last=False)
+    else:
+        _tooltip_cache.move_to_end(key)
+    return tooltip
+
+
+class LazyToolTipMixin:
+    """Mixin for graphics items that produce their tooltip only when it is shown, see LazyToolTipScene."""
+    def produce_tooltip(self, pos) -> str:
+        """Return the tooltip at pos in item coordinates, an empty string for none."""
+        error_message = "produce_tooltip() not implemented for class: " + str(self.__class__)
+        raise NotImplementedError(error_message)
+
+
+class LazyToolTipScene(QGraphicsScene):
+    """Scene that asks LazyToolTipMixin items for their tooltip on a tooltip event.
+    Other items show their tooltip as usual."""
+    def helpEvent(self, event):
+        tooltip = ""
+        for item in self.items(event.scenePos()):
+            if isinstance(item, LazyToolTipMixin):
+                tooltip = item.produce_tooltip(item.mapFromScene(event.scenePos()))
+            else:
+                tooltip = item.toolTip()
+            if tooltip:
+                break
+        if tooltip:
+            QToolTip.showText(event.screenPos(), tooltip, event.widget())
+            event.accept()
+        else:
+            QToolTip.hideText()
+            event.ignore()
@@ -1,44 +1,22 @@
 
 def set_x_positions(tree, app_config):
-    """Adapted from Biopython: Create a mapping of each clade to its vertical position.
+    """Adapted from Biopython: Set the row position of each clade of a FlatTree.
 
-    Dict of {clade: y-coord}.
-    Coordinates are negative, and integers for tips.
+    Rows are defined by the tips, numbered from 1 in preorder.
+    Internal nodes are placed at the midpoint of their first and last child.
     """
-    maxwidth = count_terminals(tree)
+    child_offsets, child_ids = tree.child_offsets, tree.child_ids
+    widths = [0.0] * tree.n_nodes
 
     # Rows are defined by the tips
-    widths = {
-        tip: maxwidth - i for i, tip in enumerate(reversed(get_terminals(tree)))
-    }
+    for row, tip in enumerate(tree.leaves(), 1):
+        widths[tip] = row
 
-    # Internal nodes: place at midpoint of children
-    def calc_row(clade):
-        for subclade in clade.c:
-            if subclade not in widths:
-                calc_row(subclade)
-        widths[clade] = (
-                                    widths[clade.c[0]] + widths[clade.c[-1]]
-                            ) / 2.0
+    # Internal nodes: place at midpoint of children, children are visited first in reversed preorder
+    for clade in reversed(tree.preorder):
+        first, last = child_offsets[clade], child_offsets[clade + 1] - 1
+        if first <= last:
+            widths[clade] = (widths[child_ids[first]] + widths[child_ids[last]]) / 2.0
 
-    if tree.c:
-        calc_row(tree)
-
-    for node, width in widths.items():
-        node.x = width * app_config.t_dummy_node_width
-
-
-def count_terminals(tree):
-    counter = 0
-    for node in tree.traverse_preorder():
-        if node.cs == 0:
-            counter += 1
-    return counter
-
-
-def get_terminals(tree):
-    terminals = []
-    for node in tree.traverse_preorder():
-        if node.cs == 0:
-            terminals.append(node)
-    return terminals
+    for clade, width in enumerate(widths):
+        tree.row_pos[clade] = width * app_config.t_dummy_node_width
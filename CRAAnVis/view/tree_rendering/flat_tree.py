@@ -0,0 +1,310 @@
+from array import array
+from typing import List
+
+
+class FlatTree:
+    """Array-backed copy of a TreeViewNode tree used for layouting and scaling.
+
+    Nodes are numbered in the preorder of the tree at construction time, so a parent always has a smaller
+    index than its children. The topology is stored as parent indices and child offsets into one child index
+    array (children of node i are child_ids[child_offsets[i]:child_offsets[i + 1]]). Layout passes are linear
+    sweeps over these arrays instead of recursive walks over the nodes.
+    """
+    def __init__(self, root):
+        # number the nodes in preorder
+        self.nodes = []
+        to_visit = [root]
+        while to_visit:
+            node = to_visit.pop()
+            node.ix = len(self.nodes)
+            node.flat_tree = self
+            self.nodes.append(node)
+            to_visit.extend(reversed(node.c))
+
+        n_nodes = len(self.nodes)
+        self.parent = array('i', [-1] * n_nodes)
+        self.child_offsets = array('i', [0] * (n_nodes + 1))
+        self.child_ids = array('i')
+        self.distance = array('d', [0.0] * n_nodes)
+        self.extension = array('d', [0.0] * n_nodes)
+        for node in self.nodes:
+            ix = node.ix
+            if node.parent is not None:
+                self.parent[ix] = node.parent.ix
+            self.child_ids.extend(child.ix for child in node.c)
+            self.child_offsets[ix + 1] = len(self.child_ids)
+            if node.distance is not None:
+                self.distance[ix] = node.distance
+            self.extension[ix] = node.extension_length
+        self.preorder = array('i', range(n_nodes))
+        # position of every node in the preorder
+        self.preorder_pos = array('i', range(n_nodes))
+        self.ix_by_name = {node.name: node.ix for node in self.nodes}
+
+        # layout results, x (depth) and y (row) position in the horizontal tree
+        self.non_extension_len = array('d', [0.0] * n_nodes)
+        self.height = array('d', [0.0] * n_nodes)
+        self.depth_pos = array('d', [0.0] * n_nodes)
+        self.row_pos = array('d', [0.0] * n_nodes)
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    def is_leaf(self, ix: int) -> bool:
+        return self.child_offsets[ix] == self.child_offsets[ix + 1]
+
+    def children(self, ix: int):
+        return self.child_ids[self.child_offsets[ix]:self.child_offsets[ix + 1]]
+
+    def leaves(self) -> List[int]:
+        """Leaf indices in the current preorder."""
+        return [ix for ix in self.preorder if self.child_offsets[ix] == self.child_offsets[ix + 1]]
+
+    def reverse_children(self, ix: int):
+        """Reverse the child order of a node and update the preorder.
+
+        The subtree of the node keeps its place in the preorder, only its part of the preorder is replaced.
+        """
+        start, end = self.child_offsets[ix], self.child_offsets[ix + 1]
+        self.child_ids[start:end] = self.child_ids[start:end][::-1]
+        subtree = self.subtree_preorder(ix)
+        pos = self.preorder_pos[ix]
+        self.preorder[pos:pos + len(subtree)] = subtree
+        preorder_pos = self.preorder_pos
+        for node_pos, node_ix in enumerate(subtree, pos):
+            preorder_pos[node_ix] = node_pos
+
+    def subtree_preorder(self, ix: int):
+        """Node indices of the subtree of a node in preorder."""
+        preorder = array('i')
+        child_offsets, child_ids = self.child_offsets, self.child_ids
+        to_visit = [ix]
+        while to_visit:
+            ix = to_visit.pop()
+            preorder.append(ix)
+            to_visit.extend(reversed(child_ids[child_offsets[ix]:child_offsets[ix + 1]]))
+        return preorder
+
+    def reorder_subtree_rows(self, ix: int) -> list:
+        """Set the rows after the children in the subtree of a node were reordered, return the moved node indices.
+
+        The leaves of a subtree are consecutive rows, they take the same rows in the new preorder. Internal nodes
+        are placed at the midpoint of their first and last child as in set_x_positions, so the ancestors of the
+        node move up to the first one keeping its row. Leaves outside of the subtree keep their rows.
+        """
+        child_offsets, child_ids, row_pos = self.child_offsets, self.child_ids, self.row_pos
+        subtree = self.subtree_preorder(ix)
+        leaves = [node_ix for node_ix in subtree if child_offsets[node_ix] == child_offsets[node_ix + 1]]
+        for leaf, row in zip(leaves, sorted(row_pos[leaf] for leaf in leaves)):
+            row_pos[leaf] = row
+        for node_ix in reversed(subtree):
+            first, last = child_offsets[node_ix], child_offsets[node_ix + 1] - 1
+            if first <= last:
+                row_pos[node_ix] = (row_pos[child_ids[first]] + row_pos[child_ids[last]]) / 2.0
+        moved = list(subtree)
+        ancestor = self.parent[ix]
+        while ancestor >= 0:
+            first, last = child_offsets[ancestor], child_offsets[ancestor + 1] - 1
+            row = (row_pos[child_ids[first]] + row_pos[child_ids[last]]) / 2.0
+            if row == row_pos[ancestor]:
+                break
+            row_pos[ancestor] = row
+            moved.append(ancestor)
+            ancestor = self.parent[ancestor]
+        return moved
+
+    def set_branch_lengths(self, scale_factor) -> float:
+        """Scale all branches and set the cumulative depth of every node, return the maximal depth.
+
+        A branch is as long as its scaled distance, but at least as long as the events drawn on it need.
+        """
+        non_extension_len = [distance * scale_factor for distance in self.distance]
+        height = list(map(max, non_extension_len, self.extension))
+        depth_pos = height[:]
+        for ix, parent_ix in enumerate(self.parent):  # parents have smaller indices than their children
+            if parent_ix >= 0:
+                depth_pos[ix] += depth_pos[parent_ix]
+        # the arrays are updated in place, the view reads the positions from them
+        self.non_extension_len[:] = array('d', non_extension_len)
+        self.height[:] = array('d', height)
+        self.depth_pos[:] = array('d', depth_pos)
+        return max(0, max(depth_pos, default=0))
+
+    def min_distance(self) -> float:
+        """Minimal branch length below the root."""
+        return min(self.distance[1:], default=float('inf'))
+
+    def min_above_zero_distance(self) -> float:
+        """Minimal branch length above zero, subtrees below branches of length zero are not considered."""
+        parent, distance = self.parent, self.distance
+        considered = bytearray(self.n_nodes)
+        considered[0] = 1
+        min_dist = float('inf')
+        for ix in range(1, self.n_nodes):
+            if considered[parent[ix]] and distance[ix] > 0:
+                considered[ix] = 1
+                min_dist = min(min_dist, distance[ix])
+        return min_dist
+
+
+class LeafPaths:
+    """Root paths of the leaves of a FlatTree for evaluating x scale factors.
+
+    Instead of one distance and one extension list per leaf, every branch is stored once together with the
+    number of leaves below it. The root paths share their prefixes, so the lengths of all paths and the number
+    of extended branches summed over all paths are computed in one sweep over the branches per scale factor.
+    """
+    def __init__(self, flat_tree: FlatTree):
+        parent = flat_tree.parent
+        n_nodes = flat_tree.n_nodes
+
+        # the leaves are keyed by name, for duplicate names the last leaf in preorder counts
+        leaf_by_name = {}
+        for leaf_ix in flat_tree.leaves():
+            leaf_by_name[flat_tree.nodes[leaf_ix].name] = leaf_ix
+        self.leaf_ixs = list(leaf_by_name.values())
+
+        leaf_count = [0] * n_nodes
+        for leaf_ix in self.leaf_ixs:
+            leaf_count[leaf_ix] = 1
+        for ix in range(n_nodes - 1, 0, -1):
+            leaf_count[parent[ix]] += leaf_count[ix]
+
+        self.parent = list(parent)
+        self.distance = list(flat_tree.distance)
+        self.extension = list(flat_tree.extension)
+        self.leaf_count = leaf_count
+
+        # path sums are stored shifted by one, position 0 holds the start value of the root path
+        self._leaf_pos = [leaf_ix + 1 for leaf_ix in self.leaf_ixs]
+        self._parent_pos = [parent_ix + 1 for parent_ix in self.parent]
+        self._branches = list(zip(self._parent_pos, self.distance, self.extension, leaf_count))
+
+    def path(self, leaf_ix: int) -> List[int]:
+        """Node indices from the root to the leaf."""
+        path = []
+        ix = leaf_ix
+        while ix >= 0:
+            path.append(ix)
+            ix = self.parent[ix]
+        path.reverse()
+        return path
+
+    def path_sums(self, values) -> list:
+        """Sum of the node values on the root path of every node, shifted by one position."""
+        sums = [0]
+        for parent_pos, value in zip(self._parent_pos, values):
+            sums.append(sums[parent_pos] + value)
+        return sums
+
+    def leaf_sums(self, sums) -> list:
+        """Path sums of the leaves, in the order of leaf_ixs."""
+        return [sums[leaf_pos] for leaf_pos in self._leaf_pos]
+
+    def max_leaf_sum(self, sums) -> float:
+        return max(0, max(map(sums.__getitem__, self._leaf_pos), default=0))
+
+    def scaled_path_lengths(self, x):
+        """Lengths of all root paths at scale factor x, shifted by one position, and the number of extensions.
+
+        A branch is extended if its extension is longer than its scaled distance. The extension count is the
+        number of extended branches summed over the root paths of all leaves.
+        """
+        lengths = [0]
+        append = lengths.append
+        extension_count = 0
+        for parent_pos, distance, extension, leaf_count in self._branches:
+            x_scaled_dist = x * distance
+            if extension > x_scaled_dist:
+                extension_count += leaf_count
+                append(lengths[parent_pos] + extension)
+            else:
+                append(lengths[parent_pos] + x_scaled_dist)
+        return lengths, extension_count
+
+    def evaluate(self, x):
+        """Tree size (longest root path) and extension count at scale factor x."""
+        lengths, extension_count = self.scaled_path_lengths(x)
+        return self.max_leaf_sum(lengths), extension_count
+
+    def breakpoints(self) -> List[float]:
+        """Sorted scale factors at which a branch on a leaf path stops being extended (extension / distance)."""
+        breakpoints = {extension / distance for distance, extension, leaf_count
+                       in zip(self.distance, self.extension, self.leaf_count)
+                       if distance > 0 and extension > 0 and leaf_count > 0}
+        return sorted(breakpoints)
+
+    def size_and_slope(self, x, left=False):
+        """Tree size at scale factor x and its slope to the right of x (to the left of x if left).
+
+        Between two breakpoints every root path length is linear in x, its slope is the sum of the distances of
+        its non extended branches. The tree size is the longest of these paths, so it is convex: its slope to
+        the right is the largest slope among the longest paths, its slope to the left the smallest one.
+        """
+        lengths = [0]
+        slopes = [0]
+        for parent_pos, distance, extension, leaf_count in self._branches:
+            x_scaled_dist = x * distance
+            if extension > x_scaled_dist:
+                lengths.append(lengths[parent_pos] + extension)
+                slopes.append(slopes[parent_pos])
+            else:
+                lengths.append(lengths[parent_pos] + x_scaled_dist)
+                # at its breakpoint a branch is extended to the left of x
+                if left and extension == x_scaled_dist:
+                    slopes.append(slopes[parent_pos])
+                else:
+                    slopes.append(slopes[parent_pos] + distance)
+        size, slope = 0, 0
+        for leaf_pos in self._leaf_pos:
+            if lengths[leaf_pos] > size or (lengths[leaf_pos] == size and (slopes[leaf_pos] < slope if left
+                                                                             else slopes[leaf_pos] > slope)):
+                size, slope = lengths[leaf_pos], slopes[leaf_pos]
+        return size, slope
+
+    def _solve_scale(self, size):
+        """Largest scale factor with a tree size of at most size, for a tree size of at most size at 0.
+        Returns inf if the tree size never exceeds size.
+
+        The tree size is convex and never decreases with x, so a tangent taken to the left of a scale factor
+        exceeding size meets size at a scale factor that does not fall below the solution. Starting right of
+        the solution, every step moves onto the next linear piece of the tree size, including the pieces
+        starting where two root paths cross, until the tangent is the piece holding the solution.
+        """
+        max_distance_sum = self.max_leaf_sum(self.path_sums(self.distance))
+        if max_distance_sum == 0:
+            return float('inf')
+        # the longest root path is at least x times the largest distance sum
+        high = size / max_distance_sum or 1.0
+        while self.evaluate(high)[0] <= size:
+            high *= 2
+        while True:
+            high_size, slope = self.size_and_slope(high, left=True)
+            if high_size == size or slope == 0:
+                return high
+            x = high - (high_size - size) / slope
+            if x >= high:
+                return high
+            if x <= 0:
+                return 0.0
+            # on the piece of high the tangent is exact, otherwise continue on the piece left of x
+            if self.size_and_slope(x, left=True)[1] == slope:
+                return x
+            high = x
+
+    def first_scale_at_least(self, size):
+        """Smallest scale factor with a tree size of at least size, None if the tree never gets that large."""
+        if self.evaluate(0.0)[0] >= size:
+            return 0.0
+        x = self._solve_scale(size)
+        return None if x == float('inf') else x
+
+    def last_scale_at_most(self, size):
+        """Largest scale factor with a tree size of at most size, None if the tree is always larger.
+
+        Returns inf if the tree size never exceeds size.
+        """
+        if self.evaluate(0.0)[0] > size:
+            return None
+        return self._solve_scale(size)
@@ -1,15 +1,17 @@
 from typing import Optional
 
-from PyQt6.QtCore import Qt, QRectF, QPointF, QTimer
+from PyQt6.QtCore import Qt, QRectF, QPointF
 from PyQt6.QtGui import QPainterPath, QBrush, QPen, QColor, QFont, QPainter, QPolygonF
 from PyQt6.QtWidgets import (QGraphicsEllipseItem, QGraphicsRectItem, QGraphicsSimpleTextItem,
                              QStyleOptionGraphicsItem, QGraphicsPolygonItem, QWidget, QGraphicsItem)
 
-from model.helper_functions import is_flat, find_incremental_series, adapt_font_to_width2
+from model.helper_functions import is_flat, flatten, find_incremental_series, adapt_font_to_width2
 from view.colors.highlighting import HighlightManagingMixin
+from view.level_of_detail import detail_level, DetailTextItem, NO_OUTLINES, FLAT
+from view.tooltips import LazyToolTipMixin
 
 
-class EventEllipseItem(HighlightManagingMixin, QGraphicsEllipseItem):
+class EventEllipseItem(HighlightManagingMixin, LazyToolTipMixin, QGraphicsEllipseItem):
     def __init__(self, app_config,
                  name: str, event_type: str,
                  x: float, y: float, width: float, height: float,
@@ -28,7 +30,6 @@ class EventEllipseItem(HighlightManagingMixin, QGraphicsEllipseItem):
         self.app_config = app_config
         self.highlighted = False
         self.blink_state = False
-        self.blink_timer = None
         self.blink_brush1 = QBrush(QColor(self.color1.red(), self.color1.green(), self.color1.blue(), 50))
         self.blink_brush2 = QBrush(QColor(self.color2.red(), self.color2.green(), self.color2.blue(), 50))
 
@@ -40,7 +41,7 @@ class EventEllipseItem(HighlightManagingMixin, QGraphicsEllipseItem):
         self.event_type = event_type
         self.font = font
         self.font = adapt_font_to_width2(self.font, self.name, width - self.line_width)
-        self.text = QGraphicsSimpleTextItem(str(self.name), self)
+        self.text = DetailTextItem(app_config, str(self.name), self)
         self.text.setFont(self.font)
         self.text.setPos(self.rect().center() - self.text.boundingRect().center())
 
@@ -48,9 +49,8 @@ class EventEllipseItem(HighlightManagingMixin, QGraphicsEllipseItem):
         self.color_group = None
         self.app_config.color_manager.register_item(self)
 
-        # Tooltip
-        tt_string = f"{self.event_type} of spacer {self.name}"
-        self.setToolTip(tt_string)
+    def produce_tooltip(self, pos) -> str:
+        return f"{self.event_type} of spacer {self.name}"
 
     def change_color(self):
         self.app_config.color_manager.set_new_rand_color(self.name, "spacer")
@@ -95,6 +95,17 @@ class EventEllipseItem(HighlightManagingMixin, QGraphicsEllipseItem):
         self.update()
 
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        level = detail_level(self.app_config, painter)
+        if level <= NO_OUTLINES:
+            # single color without outline
+            painter.setPen(Qt.PenStyle.NoPen)
+            self.select_brush(painter, 2)
+            if level == FLAT:
+                painter.drawRect(self.rect())
+            else:
+                painter.drawEllipse(self.rect())
+            return
+
         painter.setPen(Qt.PenStyle.NoPen)
 
         if self.color_mode == 'horizontal':
@@ -139,7 +150,7 @@ class EventEllipseItem(HighlightManagingMixin, QGraphicsEllipseItem):
         painter.drawEllipse(self.rect())
 
 
-class EventRectItem(HighlightManagingMixin, QGraphicsRectItem):
+class EventRectItem(HighlightManagingMixin, LazyToolTipMixin, QGraphicsRectItem):
     def __init__(self, app_config,
                  name: str, event_type: str,
                  x: float, y: float, width: float, height: float,
@@ -157,7 +168,6 @@ class EventRectItem(HighlightManagingMixin, QGraphicsRectItem):
 
         self.app_config = app_config
         self.blink_state = False
-        self.blink_timer = None
         self.blink_brush1 = QBrush(QColor(self.color1.red(), self.color1.green(), self.color1.blue(), 50))
         self.blink_brush2 = QBrush(QColor(self.color2.red(), self.color2.green(), self.color2.blue(), 50))
 
@@ -170,20 +180,19 @@ class EventRectItem(HighlightManagingMixin, QGraphicsRectItem):
         self.color_mode = color_mode
 
         self.font = font
-        self.text = QGraphicsSimpleTextItem(str(name), self)
+        self.text = DetailTextItem(app_config, str(name), self)
         self.font = adapt_font_to_width2(self.font, self.name, width - self.line_width)
         self.text.setFont(self.font)
         self.text.setPos(self.rect().center() - self.text.boundingRect().center())
 
-        # Tooltip
-        tt_string = f"{self.event_type} of spacer {self.name}"
-        self.setToolTip(tt_string)
-
         # register for color sync
         self.color_group = None
         self.app_config.color_manager.register_item(self)
         self.highlighted = False
 
+    def produce_tooltip(self, pos) -> str:
+        return f"{self.event_type} of spacer {self.name}"
+
     def change_color(self):
         self.app_config.color_manager.set_new_rand_color(self.name, "spacer")
 
@@ -228,6 +237,14 @@ class EventRectItem(HighlightManagingMixin, QGraphicsRectItem):
         self.update()
 
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        level = detail_level(self.app_config, painter)
+        if level <= NO_OUTLINES:
+            # single color without outline
+            painter.setPen(Qt.PenStyle.NoPen)
+            self.select_brush(painter, 2)
+            painter.drawRect(self.rect())
+            return
+
         painter.setPen(Qt.PenStyle.NoPen)
 
         if self.color_mode == 'horizontal':
@@ -273,7 +290,7 @@ class EventRectItem(HighlightManagingMixin, QGraphicsRectItem):
         painter.drawRect(self.rect())
 
 
-class EventHexagonItem(HighlightManagingMixin,
+class EventHexagonItem(HighlightManagingMixin, LazyToolTipMixin,
                        QGraphicsPolygonItem):
     def __init__(self, app_config,
                  name: str, event_type: str,
@@ -294,7 +311,6 @@ class EventHexagonItem(HighlightManagingMixin,
         self.app_config = app_config
         self.highlighted = False
         self.blink_state = False
-        self.blink_timer = None
         self.blink_brush1 = QBrush(QColor(self.color1.red(), self.color1.green(), self.color1.blue(), 50))
         self.blink_brush2 = QBrush(QColor(self.color2.red(), self.color2.green(), self.color2.blue(), 50))
 
@@ -309,7 +325,7 @@ class EventHexagonItem(HighlightManagingMixin,
         self.font = font
         self.font = adapt_font_to_width2(self.font, self.name, self.width - (self.line_width + 2))
         self.event_type = event_type
-        self.text = QGraphicsSimpleTextItem(str(self.name), self)
+        self.text = DetailTextItem(app_config, str(self.name), self)
         self.text.setFont(self.font)
         text_pos = QPointF(self.width / 2, height / 2)
         self.text.setPos(text_pos - self.text.boundingRect().center())
@@ -328,14 +344,13 @@ class EventHexagonItem(HighlightManagingMixin,
         self.setPolygon(self.hexagon)
         self.setPos(x, y)
 
-        # Tooltip
-        tt_string = f"{self.event_type} of spacer {self.name}"
-        self.setToolTip(tt_string)
-
         # register for color sync
         self.color_group = None
         self.app_config.color_manager.register_item(self)
 
+    def produce_tooltip(self, pos) -> str:
+        return f"{self.event_type} of spacer {self.name}"
+
     def change_color(self):
         self.app_config.color_manager.set_new_rand_color(self.name, "spacer")
 
@@ -379,6 +394,17 @@ class EventHexagonItem(HighlightManagingMixin,
         self.update()
 
     def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        level = detail_level(self.app_config, painter)
+        if level <= NO_OUTLINES:
+            # single color without outline
+            painter.setPen(Qt.PenStyle.NoPen)
+            self.select_brush(painter, 2)
+            if level == FLAT:
+                painter.drawRect(self.hexagon.boundingRect())
+            else:
+                painter.drawPolygon(self.hexagon)
+            return
+
         painter.setPen(Qt.PenStyle.NoPen)
 
         if self.color_mode == 'horizontal':
@@ -472,7 +498,7 @@ def draw_sigle_c_brush_patches(painter, x, y, width, height, brush):
     painter.drawRect(background_rect)
 
 
-class EventPoolItem(QGraphicsItem):
+class EventPoolItem(LazyToolTipMixin, QGraphicsItem):
     """parent class for pooling event classes.
     Holds the sigle event items and renders the middle part of the Pooled Items."""
 
@@ -490,7 +516,6 @@ class EventPoolItem(QGraphicsItem):
         self.highlighted = False
         self.blink_state = False
         self.highlight_mode_blinking = True
-        self.blink_timer = None
         self.blink_cols1 = []
         self.blink_cols2 = []
         self.blinking_caused_by_names = set()
@@ -508,7 +533,7 @@ class EventPoolItem(QGraphicsItem):
         # texttag
         self.font = app_config.event_font
         self.font = adapt_font_to_width2(self.font, self.name, width)
-        self.text = QGraphicsSimpleTextItem(str(self.name), self)
+        self.text = DetailTextItem(app_config, str(self.name), self)
         self.text.setFont(self.font)
         text_pos = QPointF(width / 2, self.height / 2)
         self.text.setPos(text_pos - self.text.boundingRect().center())
@@ -517,8 +542,6 @@ class EventPoolItem(QGraphicsItem):
         self.line_width = app_config.epool_line_width
         self.color_mode = app_config.event_color_mode
 
-        self.setToolTip(self.generate_tooltip(self.blinking_caused_by_names))
-
         # register for color sync
         self.color_group = None
         self.app_config.color_manager.register_item(self)
@@ -534,6 +557,9 @@ class EventPoolItem(QGraphicsItem):
                 tt_string += f"<br>{event.name}"
         return header + tt_string + footer
 
+    def produce_tooltip(self, pos) -> str:
+        return self.generate_tooltip(self.blinking_caused_by_names)
+
     def change_color(self):
         self.app_config.color_manager.set_new_rand_color(self.name, "spacer")
 
@@ -574,7 +600,6 @@ class EventPoolItem(QGraphicsItem):
                         self.start_highlight()
                     else:
                         self.blinking_caused_by_names.add(name)
-            self.setToolTip(self.generate_tooltip(self.blinking_caused_by_names))
 
     def start_highlight(self):
         if self.highlight_mode_blinking:
@@ -615,10 +640,7 @@ class EventPoolItem(QGraphicsItem):
 
     def start_blinking(self):
         self.highlighted = True
-        self.blink_state = True
-        self.blink_timer = QTimer(self.parentObject())
-        self.blink_timer.timeout.connect(self.toggle_opacity)
-        self.blink_timer.start(350)
+        self.blink_state = self.app_config.color_manager.start_blinking(self)
         self.blink_cols1 = [QColor(event.color1.red(), event.color1.green(), event.color1.blue(), 50) for event in
                             self.pooled_event_items]
         self.blink_cols2 = [QColor(event.color2.red(), event.color2.green(), event.color2.blue(), 50) for event in
@@ -635,8 +657,7 @@ class EventPoolItem(QGraphicsItem):
         self.highlighted = False
         self.blinking_caused_by_name = None
         self.update()
-        if hasattr(self, 'blink_timer'):
-            self.blink_timer.stop()
+        self.app_config.color_manager.stop_blinking(self)
 
     def boundingRect(self):
         width = self.inner_event_width * self.get_inner_length() + self.line_width + 2 * self.outer_event_w
@@ -652,6 +673,18 @@ class EventPoolItem(QGraphicsItem):
     def get_right_end_x(self):
         return self.x + self.outer_event_w + self.inner_event_width * self.get_inner_length()
 
+    def paint_flat(self, painter):
+        """Paint the pooled events as a run of single color patches without outline."""
+        painter.setPen(Qt.PenStyle.NoPen)
+        blinking = self.blink_state and self.highlighted
+        last_ix = len(self.pooled_event_items) - 1
+        x = self.x
+        for ix, event in enumerate(self.pooled_event_items):
+            width = self.outer_event_w if ix == 0 or ix == last_ix else self.inner_event_width
+            col = self.blink_cols2[ix] if blinking else event.color2
+            draw_sigle_c_brush_patches(painter, x, self.y, width, self.height, col)
+            x += width
+
     def paint(self, painter, option, widget):
         x = self.x + self.outer_event_w
         y = 0
@@ -706,6 +739,9 @@ class EllipsePoolItem(EventPoolItem):
             painter.drawChord(inner_rect, 16 * start_angle, 16 * end_angle)
 
     def paint(self, painter, option, widget):
+        if detail_level(self.app_config, painter) <= NO_OUTLINES:
+            self.paint_flat(painter)
+            return
         super().paint(painter, option, widget)
         x = self.x
 
@@ -816,6 +852,9 @@ class RectPoolItem(EventPoolItem):
         self.inner_event_width = self.outer_event_w
 
     def paint(self, painter, option, widget):
+        if detail_level(self.app_config, painter) <= NO_OUTLINES:
+            self.paint_flat(painter)
+            return
         super().paint(painter, option, widget)
         x = self.x
 
@@ -907,6 +946,9 @@ class HexagonPoolItem(EventPoolItem):
                               (self.hexagon[5].y() + self.hexagon[2].y()) / 2)
 
     def paint(self, painter, option, widget):
+        if detail_level(self.app_config, painter) <= NO_OUTLINES:
+            self.paint_flat(painter)
+            return
         super().paint(painter, option, widget)
 
         def brush_draw_pt_polygon(pol_points, brush):
@@ -1111,13 +1153,32 @@ class TwoColorEllipseItem(QGraphicsEllipseItem):
         painter.drawEllipse(self.rect())
 
 
-def produce_event_items(event_list, event_type, app_config, events_dict):
+# a spacer in one of these events of a node is not drawn as plain acquisition
+GAIN_EXCLUDING_EVENTS = ("duplications", "contradictions", "double_gains", "independent_gains", "reacquisitions",
+                         "dups", "rearrangements")
+# a spacer in one of these events of a node is not pooled as acquisition
+GAIN_POOL_EXCLUDING_EVENTS = ("duplications", "contradictions", "double_gains")
+
+
+def spacer_in_events_check(events_dict, event_types, event_bits=None, spacer_bitsets=None):
+    """Return a function testing if a spacer occurs in one of the event_types of a node.
+    Uses the node's event bitsets of the model if given."""
+    if event_bits is not None and spacer_bitsets is not None:
+        bits = 0
+        for event_type in event_types:
+            bits |= event_bits[event_type]
+        return lambda sp_name: spacer_bitsets.contains(bits, sp_name)
+    names = {sp_name for event_type in event_types for sp_name in flatten(events_dict[event_type])}
+    return lambda sp_name: sp_name in names
+
+
+def produce_event_items(event_list, event_type, app_config, events_dict, event_bits=None, spacer_bitsets=None):
 
     color_dict = app_config.event_color_dict
     name_dict = app_config.event_name_dict
 
     if event_type == "gains":
-        event_items = produce_gain_items(event_list, app_config, events_dict)
+        event_items = produce_gain_items(event_list, app_config, events_dict, event_bits, spacer_bitsets)
     elif event_type == "losses":
         event_items = produce_loss_items(event_list, app_config)
     else:
@@ -1163,22 +1224,11 @@ def produce_pooled_items(event_list, event_items, event_type, app_config, ix=Non
     return pool_items
 
 
-def produce_gain_items(event_list, app_config, events_dict):
+def produce_gain_items(event_list, app_config, events_dict, event_bits=None, spacer_bitsets=None):
     gain_items = []
+    is_other_event = spacer_in_events_check(events_dict, GAIN_EXCLUDING_EVENTS, event_bits, spacer_bitsets)
     for sp_name in event_list:
-        if sp_name in events_dict["duplications"]:
-            continue
-        if sp_name in events_dict["contradictions"]:
-            continue
-        if sp_name in events_dict["double_gains"]:
-            continue
-        if sp_name in events_dict["independent_gains"]:
-            continue
-        if sp_name in events_dict["reacquisitions"]:
-            continue
-        if sp_name in events_dict["dups"]:
-            continue
-        if sp_name in events_dict["rearrangements"]:
+        if is_other_event(sp_name):
             continue
         col1, col2, color_group = app_config.color_manager.get_new_col_info(
             str(sp_name))
@@ -1284,7 +1334,7 @@ def produce_other_pools(event_items, pools, ixs, app_config, color, event_type_n
     return pool_items
 
 
-def produce_events(events_dict, app_config):
+def produce_events(events_dict, app_config, event_bits=None, spacer_bitsets=None):
     items_dict = {}
 
     for event_type in events_dict.keys():
@@ -1293,15 +1343,18 @@ def produce_events(events_dict, app_config):
 
     for event_type, event_list in events_dict.items():
         if is_flat(event_list):
-            items = produce_event_items(event_list, event_type, app_config, events_dict)
+            items = produce_event_items(event_list, event_type, app_config, events_dict, event_bits, spacer_bitsets)
             items_dict[event_type].append(items)
 
         else:
             for sub_list in event_list:
-                items = produce_event_items(sub_list, event_type, app_config, events_dict)
+                items = produce_event_items(sub_list, event_type, app_config, events_dict, event_bits,
+                                            spacer_bitsets)
                 items_dict[event_type].append(items)
 
     if app_config.event_pooling:
+        is_not_poolable = spacer_in_events_check(events_dict, GAIN_POOL_EXCLUDING_EVENTS, event_bits,
+                                                 spacer_bitsets)
         for event_type in events_dict.keys():
             pool_event_type = event_type + "_pools"
             if pool_event_type not in items_dict:
@@ -1312,17 +1365,13 @@ def produce_events(events_dict, app_config):
             pool_event_type = event_type + "_pools"
             if is_flat(event_list):
                 if event_type == "gains":
-                    event_list = [event for event in event_list if event not in events_dict["duplications"] and
-                                  event not in events_dict["contradictions"] and
-                                  event not in events_dict["double_gains"]]
+                    event_list = [event for event in event_list if not is_not_poolable(event)]
                 pools = produce_pooled_items(event_list, e_items, event_type, app_config)
                 items_dict[pool_event_type].append(pools)
             else:
                 for ix in range(len(event_list)):
                     if event_type == "gains":
-                        event_list = [event for event in event_list[ix] if event not in events_dict["duplications"] and
-                                      event not in events_dict["contradictions"] and
-                                      event not in events_dict["double_gains"]]
+                        event_list = [event for event in event_list[ix] if not is_not_poolable(event)]
                     pools = produce_pooled_items(event_list, e_items, event_type, app_config, ix)
                     items_dict[pool_event_type].append(pools)
 
@@ -1,19 +1,29 @@
+import bisect
 import math
 from collections import deque
+from typing import Optional
 
-from PyQt6.QtCore import QPointF, QObject, QLineF
-from PyQt6.QtGui import QColor, QAction
+from PyQt6.QtCore import QPointF, QObject, QRectF, Qt
+from PyQt6.QtGui import QColor, QAction, QPainter, QPainterPath
 from PyQt6.QtWidgets import QGraphicsItemGroup, QGraphicsEllipseItem, QGraphicsSimpleTextItem, QGraphicsRectItem, QMenu, \
-    QGraphicsLineItem
+    QGraphicsItem, QStyleOptionGraphicsItem, QWidget
 
 from model.app_config import AppConfig
 from model.helper_functions import is_flat, find_incremental_series, flatten
+from model.model_container import ModelContainer
 from model.tree import TreeNode
 from view.colors.colors import produce_random_color
 from view.tree_rendering.adapted_biopython_tree_layouting import set_x_positions
+from view.tree_rendering.flat_tree import FlatTree, LeafPaths
 from view.tree_rendering.tree_events import produce_events, FrameItem, EventRectItem
 
 
+# nodes per block of painter paths in TreeEdgesItem and TreeEventsGroup
+NODE_BLOCK_SIZE = 64
+# node items are placed this far right of and below their layout position
+NODE_ITEM_OFFSET = 0.5
+
+
 class NodeItem(QGraphicsEllipseItem):
     """Class for the visual representation of a node in the tree view"""
     def __init__(self, view_model_node, model_node: TreeNode, app_config: AppConfig):
@@ -26,21 +36,13 @@ class NodeItem(QGraphicsEllipseItem):
         self.setRect(0, 0, app_config.t_node_width, app_config.t_node_height)
         self.setZValue(1)
 
+        # set by the view when it shows or hides the inner array of this node
         self.inner_array_is_shown = False
 
         # tooltip
         tt_string = f"Node {self.model_node.name}"
         self.setToolTip(tt_string)
 
-        # connect to tree signal manager for checking action states
-        self.app_config.tree_signal_manager.show_inner_array.connect(self.notice_if_inner_array_is_shown)
-
-    def notice_if_inner_array_is_shown(self, showing_node):
-        if showing_node == self.model_node.name:
-            self.inner_array_is_shown = not self.inner_array_is_shown
-        else:
-            self.inner_array_is_shown = False
-
     def contextMenuEvent(self, event):
         contextMenu = QMenu()
         swapChildNodesAction = QAction("Swap Child Nodes")
@@ -81,36 +83,48 @@ class NodeItem(QGraphicsEllipseItem):
             self.view_model_node.c_switched = False
         else:
             self.view_model_node.c_switched = True
-        self.view_model_node.needs_switching = True
-        self.app_config.tree_signal_manager.redrawTree.emit()
+        self.app_config.tree_signal_manager.redrawTree.emit(self.view_model_node.ix)
 
 
 class TreeViewNode:
     """Class organising the visual representation of a tree node."""
 
-    def __init__(self, root: TreeNode, tree_nodes: list, app_config: AppConfig):
+    def __init__(self, root: TreeNode, tree_nodes: list, app_config: AppConfig, model: ModelContainer = None,
+                 build_subtree=True):
 
         self.c_switched = False
-        self.needs_switching = False
         self.can_be_switched = True
 
         self.c = []
         self.cs = 0
 
-        self.events = []
         self.events = root.events
-        self.event_items_dict = produce_events(root.events, app_config)
+        # event items are produced when the branch is shown, see show_events_in_rect
+        self.event_items_dict = None
+        self.event_bits = None
+        self.spacer_bitsets = None
+        if model is not None:
+            self.event_bits = model.get_node_event_bits(root.name)
+            self.spacer_bitsets = model.spacer_bitsets
 
         self.distance = root.distance
         # node envelope size
         self.width = app_config.t_dummy_node_width
-        self.extension_length = calc_event_extension_h(self, app_config)
-        self.non_extension_len = 0
-        self.height = 0
-
-        # node positions/coordinates
-        self.x = 0
-        self.y = 0
+        # the layout only needs the extent of the events, it is computed from their counts
+        self.event_extents = calc_event_extension_sides(self, app_config)
+        self.extension_length = max(self.event_extents)
+        self.has_events = any(count_items(e_list) for e_list in self.events.values())
+
+        # index in and array representation of the tree, positions and branch lengths are stored there
+        self.ix = 0
+        self.flat_tree = None
+
+        # event groups on the branch to this node, kept to update them in place
+        self.event_group = None
+        self.top_branch_events = None
+        self.bottom_branch_events = None
+        self.top_branch_offset = 0
+        self.bottom_branch_offset = 0
 
         self.parent = None
         self.name = root.name
@@ -118,23 +132,90 @@ class TreeViewNode:
         self.qnode = NodeItem(self, root, app_config)
         tree_nodes.append(self.qnode)
 
-        for c in root.children:
-            new_child = TreeViewNode(c, tree_nodes, app_config)
-            new_child.parent = self
-            self.c.append(new_child)
-
-            self.cs += 1
+        if build_subtree:
+            # build the subtree in preorder without recursion
+            to_visit = [(c, self) for c in reversed(root.children)]
+            while to_visit:
+                model_node, parent = to_visit.pop()
+                new_child = TreeViewNode(model_node, tree_nodes, app_config, model, build_subtree=False)
+                new_child.parent = parent
+                parent.c.append(new_child)
+                parent.cs += 1
+                to_visit.extend((c, new_child) for c in reversed(model_node.children))
+            FlatTree(self)
+
+    @property
+    def x(self):
+        return self.flat_tree.depth_pos[self.ix]
+
+    @property
+    def y(self):
+        return self.flat_tree.row_pos[self.ix]
+
+    @property
+    def height(self):
+        return self.flat_tree.height[self.ix]
+
+    @property
+    def non_extension_len(self):
+        return self.flat_tree.non_extension_len[self.ix]
+
+    def produce_event_items(self, app_config: AppConfig):
+        if self.event_items_dict is None:
+            self.event_items_dict = produce_events(self.events, app_config, self.event_bits, self.spacer_bitsets)
 
     def group_and_position_events(self, app_config: AppConfig):
-        events_group = QGraphicsItemGroup()
+        """Group the events of all nodes whose event items were produced. Events of the other nodes are produced
+        later by show_events_in_rect."""
+        events_group = TreeEventsGroup(app_config)
         for node in self.traverse():
-            curr_e_group = group_node_events_and_set_pos(node, app_config)
-            events_group.addToGroup(curr_e_group)
+            if node.event_items_dict is not None:
+                curr_e_group = group_node_events_and_set_pos(node, app_config)
+                events_group.addToGroup(curr_e_group)
+        events_group.set_pending_nodes(self.flat_tree.nodes)
         return events_group
 
-    def set_node_positions(self):
-        for node in self.traverse():
-            node.qnode.setPos(node.x, node.y)
+    def show_events_in_rect(self, events_group: 'TreeEventsGroup', rect: QRectF, app_config: AppConfig) -> int:
+        """Produce and group the event items of the branches intersecting rect, all branches for a null rect.
+        Returns the number of branches shown."""
+        if rect.isNull():
+            pending = events_group.pending_nodes()
+        else:
+            # the events of a branch reach this far above and below its row
+            margin = (self.qnode.boundingRect().height() + NODE_ITEM_OFFSET + app_config.t_edge_linewidth
+                      + app_config.event_line_width + app_config.event_height)
+            pending = events_group.pending_nodes(rect.top() - margin, rect.bottom() + margin)
+        shown = []
+        for node in pending:
+            branch_rect = node.qnode.sceneBoundingRect()
+            for events_rect in node_events_rects(node, app_config):
+                branch_rect = branch_rect.united(events_rect)
+            if rect.isNull() or rect.intersects(branch_rect):
+                node.produce_event_items(app_config)
+                events_group.addToGroup(group_node_events_and_set_pos(node, app_config))
+                shown.append(node)
+        if shown:
+            events_group.update_pending_nodes(shown)
+        return len(shown)
+
+    def update_event_positions(self, events_group: 'TreeEventsGroup', app_config: AppConfig, nodes=None):
+        """Move the event groups of all nodes, or of the given nodes, to the current node positions."""
+        if nodes is None:
+            nodes = events_group.event_nodes
+        for node in nodes:
+            if node.event_group is None:
+                continue
+            set_event_group_pos(node, app_config)
+            if node.top_branch_offset or node.bottom_branch_offset:  # groups without events have empty bounds
+                refresh_group_bounds(node.event_group)
+        events_group.update_pending_nodes(nodes)
+        refresh_group_bounds(events_group)
+
+    def set_node_positions(self, nodes=None):
+        flat_tree = self.flat_tree
+        depth_pos, row_pos = flat_tree.depth_pos, flat_tree.row_pos
+        for node in flat_tree.nodes if nodes is None else nodes:
+            node.qnode.setPos(depth_pos[node.ix] + NODE_ITEM_OFFSET, row_pos[node.ix] + NODE_ITEM_OFFSET)
 
     def produce_leaf_tags(self, app_config: AppConfig):
         name_leaf_tag = {}
@@ -160,16 +241,12 @@ class TreeViewNode:
                 text.setRotation(90)
         return name_leaf_tag
 
-    def update_leaf_tag_pos(self, leaf_tags, app_config: AppConfig):
-        for node in self.traverse():
-            if not app_config.show_inner_l_tags:
-                if node.name.startswith("Inner"):
-                    continue
-            tag_name = node.name
-            tag_center_y = leaf_tags[tag_name].boundingRect().center().y()
-            new_text_pos = QPointF(node.qnode.sceneBoundingRect().right() + 10,
-                                   node.qnode.sceneBoundingRect().center().y() - tag_center_y)
-            leaf_tags[tag_name].setPos(new_text_pos)
+    def leaf_tag_x(self, leaf_tags) -> dict:
+        """Scene x of the leaf tags next to their nodes, before they are aligned at the arrays, by name."""
+        flat_tree = self.flat_tree
+        # all node items have the same size
+        node_right = self.qnode.boundingRect().right() + NODE_ITEM_OFFSET
+        return {name: flat_tree.depth_pos[flat_tree.ix_by_name[name]] + node_right + 10 for name in leaf_tags}
 
     def add_node_size_illustration(self):
         """Debug function to visualize the size of the nodes"""
@@ -224,14 +301,6 @@ class TreeViewNode:
                     node = to_visit[-1].c[node.parent.c.index(node) + 1] if to_visit else None
 
 
-def switch_x_y(root: TreeViewNode):
-    for node in root.traverse_preorder():
-        old_x = node.x
-        old_y = node.y
-        node.y = old_x
-        node.x = old_y
-
-
 def add_items(app_config, bottom_branch_events, bottom_branch_offset, node, top_branch_events, top_branch_offset):
     for event_type, e_list in node.event_items_dict.items():
         if event_type.endswith("_pools"):
@@ -419,28 +488,146 @@ def group_node_events_and_set_pos(node: TreeViewNode, app_config: AppConfig):
                                                             node,
                                                             top_branch_events, top_branch_offset)
 
-    top_branch_x = node.qnode.scenePos().x() - top_branch_offset - app_config.t_edge_linewidth
-    top_branch_y = (node.qnode.scenePos().y() -
+    node.top_branch_events, node.top_branch_offset = top_branch_events, top_branch_offset
+    node.bottom_branch_events, node.bottom_branch_offset = bottom_branch_events, bottom_branch_offset
+    set_event_group_pos(node, app_config)
+
+    event_group.addToGroup(top_branch_events)
+    event_group.addToGroup(bottom_branch_events)
+    node.event_group = event_group
+    return event_group
+
+
+def set_event_group_pos(node: TreeViewNode, app_config: AppConfig):
+    """Place the event groups above and below the branch of a node."""
+    node_scene_rect = node.qnode.sceneBoundingRect()
+    top_branch_x = node.x - node.top_branch_offset - app_config.t_edge_linewidth
+    top_branch_y = (node.y -
                     app_config.event_height -
                     app_config.t_edge_linewidth -
                     app_config.event_line_width)
     # adjust to center of qnode
 
-    top_branch_x += node.qnode.sceneBoundingRect().width() / 2
-    top_branch_y += node.qnode.sceneBoundingRect().height() / 2
+    top_branch_x += node_scene_rect.width() / 2
+    top_branch_y += node_scene_rect.height() / 2
 
-    top_branch_events.setPos(top_branch_x, top_branch_y)
+    node.top_branch_events.setPos(top_branch_x, top_branch_y)
 
-    bottom_branch_x = node.x - bottom_branch_offset - app_config.t_edge_linewidth
+    bottom_branch_x = node.x - node.bottom_branch_offset - app_config.t_edge_linewidth
     bottom_branch_y = node.y + app_config.t_edge_linewidth + app_config.event_line_width
     # adjust to center of qnode
-    bottom_branch_x += node.qnode.sceneBoundingRect().width() / 2
-    bottom_branch_y += node.qnode.sceneBoundingRect().height() / 2
-    bottom_branch_events.setPos(bottom_branch_x, bottom_branch_y)
+    bottom_branch_x += node_scene_rect.width() / 2
+    bottom_branch_y += node_scene_rect.height() / 2
+    node.bottom_branch_events.setPos(bottom_branch_x, bottom_branch_y)
+
+
+def node_events_rects(node: TreeViewNode, app_config: AppConfig) -> list:
+    """Scene rects of the events above and below the branch of a node, estimated from the event counts."""
+    node_rect = node.qnode.boundingRect()
+    x = node.x + node_rect.width() / 2 - app_config.t_edge_linewidth
+    y = node.y + node_rect.height() / 2
+    top_extent, bottom_extent = node.event_extents
+    offset = app_config.t_edge_linewidth + app_config.event_line_width
+    rects = []
+    if top_extent:
+        rects.append(QRectF(x - top_extent, y - offset - app_config.event_height, top_extent, app_config.event_height))
+    if bottom_extent:
+        rects.append(QRectF(x - bottom_extent, y + offset, bottom_extent, app_config.event_height))
+    return rects
+
+
+class TreeEventsGroup(QGraphicsItemGroup):
+    """Group of the event groups of all nodes.
+
+    Event items are produced once their branch is shown (TreeViewNode.show_events_in_rect). Until then, the events
+    of a branch are painted as plain bars of the size they will take, so the tree keeps its extent and look when
+    zoomed out. The bars are stored in blocks of NODE_BLOCK_SIZE nodes like the edges of TreeEdgesItem.
+    """
+    def __init__(self, app_config: AppConfig):
+        super().__init__()
+        self.pending_brush = QColor(170, 170, 170)
+        # bar rects per node and one path per block of nodes
+        self.pending_rects = []
+        # the nodes with events, only their bars and event groups move with the tree
+        self.event_nodes = []
+        self.pending_blocks = []
+        self._pending_rect = QRectF()
+        # rows and nodes of the nodes without event items, sorted by row, rebuilt on use after nodes changed
+        self._pending_rows = None
+        self._pending_row_nodes = None
+        self.app_config = app_config
 
-    event_group.addToGroup(top_branch_events)
-    event_group.addToGroup(bottom_branch_events)
-    return event_group
+    def set_pending_nodes(self, nodes):
+        """Set the bars to the nodes without event items, nodes are all nodes in the order of their index."""
+        self.event_nodes = [node for node in nodes if node.has_events]
+        self._pending_rows = None
+        self.pending_rects = [self.produce_pending_rects(node) for node in nodes]
+        self.pending_blocks = [self.produce_block_path(start)
+                               for start in range(0, len(self.pending_rects), NODE_BLOCK_SIZE)]
+        self.refresh_pending_bounds()
+
+    def update_pending_nodes(self, nodes):
+        """Update the bars of some nodes after they moved or their event items were produced."""
+        for node in nodes:
+            self.pending_rects[node.ix] = self.produce_pending_rects(node)
+        self._pending_rows = None
+        for block_ix in {node.ix // NODE_BLOCK_SIZE for node in nodes}:
+            self.pending_blocks[block_ix] = self.produce_block_path(block_ix * NODE_BLOCK_SIZE)
+        self.refresh_pending_bounds()
+
+    def pending_nodes(self, top=None, bottom=None):
+        """Nodes without event items in the order of their index, only those with a row from top to bottom if
+        given."""
+        if self._pending_rows is None:
+            pending = sorted((node.y, node.ix, node) for node in self.event_nodes if node.event_items_dict is None)
+            self._pending_rows = [y for y, ix, node in pending]
+            self._pending_row_nodes = [node for y, ix, node in pending]
+        if top is None:
+            return sorted(self._pending_row_nodes, key=lambda node: node.ix)
+        start = bisect.bisect_left(self._pending_rows, top)
+        end = bisect.bisect_right(self._pending_rows, bottom)
+        return sorted(self._pending_row_nodes[start:end], key=lambda node: node.ix)
+
+    def produce_pending_rects(self, node):
+        if node.event_items_dict is None and node.has_events:
+            return node_events_rects(node, self.app_config)
+        return []
+
+    def produce_block_path(self, start):
+        path = QPainterPath()
+        for rects in self.pending_rects[start:start + NODE_BLOCK_SIZE]:
+            for rect in rects:
+                path.addRect(rect)
+        return path
+
+    def refresh_pending_bounds(self):
+        self.prepareGeometryChange()
+        pending_rect = QRectF()
+        for path in self.pending_blocks:
+            pending_rect = pending_rect.united(path.boundingRect())
+        self._pending_rect = pending_rect
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return super().boundingRect().united(self._pending_rect)
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(self.pending_brush)
+        for path in self.pending_blocks:
+            painter.drawPath(path)
+
+
+def refresh_group_bounds(group: QGraphicsItemGroup):
+    """Recompute the bounding rect of a group after its children moved.
+
+    QGraphicsItemGroup only recomputes it when an item is removed, so the topmost child is removed and added
+    again, which keeps the stacking order.
+    """
+    children = group.childItems()
+    if children:
+        group.removeFromGroup(children[-1])
+        group.addToGroup(children[-1])
 
 
 class TreeScalingContainer(QObject):
@@ -451,97 +638,73 @@ class TreeScalingContainer(QObject):
         self.app_config = app_config
 
         self.tree_view_model = tree_view_model
+        self.flat_tree: FlatTree = tree_view_model.flat_tree
         self.array_length = array_length
-        self.min_distance = find_min_distance(self.tree_view_model)
-        self.leaf_dist_ext_dict = get_leaf_dist_ext(self.tree_view_model, [], [])
+        self.min_distance = self.flat_tree.min_distance()
+        self.leaf_paths = LeafPaths(self.flat_tree)
+
+        if app_config.scaling_mode == "exact":
+            optimize = optimize_scaling_exact
+            maximal_scaling = get_maximal_scaling_without_size_increase_exact
+        elif app_config.scaling_mode == "sampled":
+            optimize = optimize_scaling
+            maximal_scaling = get_maximal_scaling_without_size_increase
+        else:
+            raise ValueError("Invalid scaling mode")
 
-        self.best_x_scale_factor = optimize_scaling(self.leaf_dist_ext_dict,
-                                                    self.min_distance,
-                                                    app_config,
-                                                    self.array_length)
+        self.best_x_scale_factor = optimize(self.leaf_paths,
+                                            self.min_distance,
+                                            app_config,
+                                            self.array_length)
         self.x_scale_factor = self.best_x_scale_factor
 
         if self.min_distance == 0:
-            min_above_zero = find_min_above_zero_distance(self.tree_view_model)
-            self.min_scale = get_maximal_scaling_without_size_increase(self.leaf_dist_ext_dict,
-                                                                       app_config.min_leaf_dist / min_above_zero)
+            min_above_zero = self.flat_tree.min_above_zero_distance()
+            self.min_scale = maximal_scaling(self.leaf_paths, app_config.min_leaf_dist / min_above_zero)
         else:
-            self.min_scale = get_maximal_scaling_without_size_increase(self.leaf_dist_ext_dict,
-                                                                   app_config.min_leaf_dist / self.min_distance)
+            self.min_scale = maximal_scaling(self.leaf_paths, app_config.min_leaf_dist / self.min_distance)
 
         self.max_y = None
 
-    def redraw_c_swapped(self):
-        for node in self.tree_view_model.traverse():
-            node.x = 0
-            node.y = 0
-            if node.needs_switching:
-                node.c = node.c[::-1]
-                node.needs_switching = False
-        self.preset_y("dynamic")
-        set_x_positions(self.tree_view_model, self.app_config)
-        switch_x_y(self.tree_view_model)
-        self.tree_view_model.set_node_positions()
-
-    def swap_child_node(self, swap_target: TreeViewNode, current_node=None):
-        if current_node is None:
-            return
-        elif current_node == swap_target:
-            current_node.c.reverse()
-        else:
-            for child in current_node.c:
-                self.swap_child_node(swap_target, child)
+    def redraw_c_swapped(self, node_ix: int) -> list:
+        """Swap the children of a node and return the nodes that moved.
+
+        Branch lengths do not depend on the child order and the leaves of the swapped subtree only swap rows among
+        themselves, so only the rows of the subtree and its ancestors are set.
+        """
+        node = self.flat_tree.nodes[node_ix]
+        node.c = node.c[::-1]
+        self.flat_tree.reverse_children(node_ix)
+        moved_nodes = [self.flat_tree.nodes[ix] for ix in self.flat_tree.reorder_subtree_rows(node_ix)]
+        self.tree_view_model.set_node_positions(moved_nodes)
+        return moved_nodes
 
     def preset_y(self, methode):
         if methode == "dynamic":
-            self.max_y = preset_y_dynamic_vertical(self.tree_view_model, self.x_scale_factor, 0)
+            self.max_y = self.flat_tree.set_branch_lengths(self.x_scale_factor)
 
     def rescale_x(self, factor):
         self.x_scale_factor = self.x_scale_factor * factor
-        self.max_x = reset_x_horizontal(self.tree_view_model, self.x_scale_factor, 0)
+        self.max_x = self.flat_tree.set_branch_lengths(self.x_scale_factor)
 
     def reset_scaling(self):
         self.x_scale_factor = self.best_x_scale_factor
-        self.max_x = reset_x_horizontal(self.tree_view_model, self.x_scale_factor, 0)
+        self.max_x = self.flat_tree.set_branch_lengths(self.x_scale_factor)
 
     def set_scaling_min(self):
         self.x_scale_factor = self.min_scale
-        self.max_x = reset_x_horizontal(self.tree_view_model, self.x_scale_factor, 0)
-
-
-def find_min_distance(node: TreeViewNode, min_dist=float('inf')):
-    for c in node.c:
-        min_dist = min(min_dist, find_min_distance(c, c.distance))
-    return min_dist
-
-def find_min_above_zero_distance(node: TreeViewNode, min_dist=float('inf')):
-    for c in node.c:
-        if c.distance > 0:
-            min_dist = min(min_dist, find_min_above_zero_distance(c, c.distance))
-    return min_dist
+        self.max_x = self.flat_tree.set_branch_lengths(self.x_scale_factor)
 
 
-def get_max_distance_sum(leaf_dist_ext_dict):
-    max_dist_sum = 0
-    for leaf, dist_ext_tpl in leaf_dist_ext_dict.items():
-        curr_dist_sum = 0
-        for ix in range(len(dist_ext_tpl[0])):
-            curr_dist_sum += dist_ext_tpl[0][ix]
-        max_dist_sum = max(max_dist_sum, curr_dist_sum)
-    return max_dist_sum
+def get_max_distance_sum(leaf_paths: LeafPaths):
+    return leaf_paths.max_leaf_sum(leaf_paths.path_sums(leaf_paths.distance))
 
 
-def get_max_extension_sum(leaf_dist_ext_dict):
-    max_ext_sum = 0
-    for leaf, dist_ext_tpl in leaf_dist_ext_dict.items():
-        curr_ext_sum = 0
-        for ix in range(len(dist_ext_tpl[0])):
-            curr_ext_sum += dist_ext_tpl[1][ix]
-        max_ext_sum = max(max_ext_sum, curr_ext_sum)
-    return max_ext_sum
+def get_max_extension_sum(leaf_paths: LeafPaths):
+    return leaf_paths.max_leaf_sum(leaf_paths.path_sums(leaf_paths.extension))
 
 
-def optimize_scaling(leaf_dist_ext_dict, min_dist, app_config: AppConfig, array_length):
+def optimize_scaling(leaf_paths: LeafPaths, min_dist, app_config: AppConfig, array_length):
     min_tree_size = app_config.min_array_tree_ratio * array_length
     max_tree_size = app_config.max_array_tree_ratio * array_length
     optimal_tree_size = app_config.optimal_array_tree_ratio * array_length
@@ -554,24 +717,19 @@ def optimize_scaling(leaf_dist_ext_dict, min_dist, app_config: AppConfig, array_
         x_start = 0
     else:
         x_start = app_config.min_leaf_dist / min_dist
-    x_end = app_config.max_array_tree_ratio * array_length / get_max_distance_sum(leaf_dist_ext_dict)
+    x_end = app_config.max_array_tree_ratio * array_length / get_max_distance_sum(leaf_paths)
     n_points = int(app_config.scaling_optimization_rounds / 2)
     x_grid = [x_start + i * (x_end - x_start) / (n_points - 1) for i in range(n_points)]
 
-    for x in x_grid:
-        curr_size, curr_e_count = evaluate_current_x(leaf_dist_ext_dict, x)
-
-        x_values.append(x)
-        tree_sizes.append(curr_size)
-        extension_counts.append(curr_e_count)
+    evaluate_x_values(leaf_paths, x_grid, x_values, tree_sizes, extension_counts)
 
     # find first x inside app_config.min_array_tree_ratio and last x inside app_config.max_array_tree_ratio
     x_start, x_end = find_new_x_range(x_values, tree_sizes, min_tree_size, max_tree_size)
     if x_start == x_end:  # if all trees are too large to be in the range
-        best_x2 = get_minimal_scaling(leaf_dist_ext_dict)
+        best_x2 = get_minimal_scaling(leaf_paths)
         best_x = max(x_start, best_x2)
-        best_x = get_maximal_scaling_without_size_increase(leaf_dist_ext_dict, best_x)
-        # curr_size, curr_e_count = evaluate_current_x(leaf_dist_ext_dict, best_x)
+        best_x = get_maximal_scaling_without_size_increase(leaf_paths, best_x)
+        # curr_size, curr_e_count = evaluate_current_x(leaf_paths, best_x)
 
         return best_x
 
@@ -583,75 +741,128 @@ def optimize_scaling(leaf_dist_ext_dict, min_dist, app_config: AppConfig, array_
                 range(int(app_config.scaling_optimization_rounds / 2))]
     x_grid = [2 ** x for x in log_grid]
 
-    for x in x_grid:
-        curr_size, curr_e_count = evaluate_current_x(leaf_dist_ext_dict, x)
-
-        x_values.append(x)
-        tree_sizes.append(curr_size)
-        extension_counts.append(curr_e_count)
+    evaluate_x_values(leaf_paths, x_grid, x_values, tree_sizes, extension_counts)
 
     # find x with the smallest extension count and best ratio
     best_x, best_size = find_best_x(x_values, tree_sizes, extension_counts, min_tree_size, max_tree_size,
                                     optimal_tree_size)
 
     # get maximal extension sum
-    max_ext_sum = get_max_extension_sum(leaf_dist_ext_dict)
+    max_ext_sum = get_max_extension_sum(leaf_paths)
 
     if best_size == max_ext_sum:
-        best_x2 = get_minimal_scaling(leaf_dist_ext_dict)
+        best_x2 = get_minimal_scaling(leaf_paths)
         if best_x < best_x2:
             best_x = best_x2
 
-    best_x = get_maximal_scaling_without_size_increase(leaf_dist_ext_dict, best_x)
+    best_x = get_maximal_scaling_without_size_increase(leaf_paths, best_x)
 
     return best_x
 
 
-def get_maximal_scaling_without_size_increase(leaf_dist_ext_dict, prior_scale):
-    # get current longest branch
+def get_maximal_scaling_without_size_increase(leaf_paths: LeafPaths, prior_scale):
+    # get current longest branch, the last leaf of maximal length
     new_scale = prior_scale
-    longest_branch = ""
+    longest_branch = None
     max_length = 0
-    for leaf, dist_ext in leaf_dist_ext_dict.items():
-        size, ecount = evaluate_current_x({leaf: leaf_dist_ext_dict[leaf]}, prior_scale)
+    lengths, ecount = leaf_paths.scaled_path_lengths(prior_scale)
+    for leaf_ix, size in zip(leaf_paths.leaf_ixs, leaf_paths.leaf_sums(lengths)):
+        size = max(0, size)
         if size >= max_length:
             max_length = size
-            longest_branch = leaf
+            longest_branch = leaf_ix
+
+    if longest_branch is None:
+        raise ValueError("No longest branch found")
+    branch_path = leaf_paths.path(longest_branch)[1:]  # skip root distance
 
     # if distance * prior_scale > extension scale increase not possible -> return prior scale
-    for ix in range(1, len(leaf_dist_ext_dict[longest_branch][1])):
-        if leaf_dist_ext_dict[longest_branch][0][ix] * prior_scale > leaf_dist_ext_dict[longest_branch][1][ix]:
+    for ix in branch_path:
+        if leaf_paths.distance[ix] * prior_scale > leaf_paths.extension[ix]:
             return prior_scale
 
     # check for each edge in max if extension possible without size increase
-    if longest_branch == "":
-        raise ValueError("No longest branch found")
-
-    for ix in range(1, len(leaf_dist_ext_dict[longest_branch][1])):
-        distance = leaf_dist_ext_dict[longest_branch][0][ix]
-        extension = leaf_dist_ext_dict[longest_branch][1][ix]
+    for ix in branch_path:
+        distance = leaf_paths.distance[ix]
+        extension = leaf_paths.extension[ix]
         if distance == 0:
             continue
         curr_scale = extension / distance
-        size, ecount = evaluate_current_x(leaf_dist_ext_dict, curr_scale)
+        if curr_scale <= new_scale:  # could not change new_scale, skip the evaluation
+            continue
+        size, ecount = evaluate_current_x(leaf_paths, curr_scale)
         if size > max_length:
             continue
         else:
-            if curr_scale > new_scale:
-                new_scale = curr_scale
+            new_scale = curr_scale
     return new_scale
 
 
-def get_minimal_scaling(leaf_dist_ext_dict):
+def optimize_scaling_exact(leaf_paths: LeafPaths, min_dist, app_config: AppConfig, array_length):
+    """Alternative to optimize_scaling that solves on the linear pieces of the tree size instead of sampling a grid
+    of scales.
+
+    Among the scale factors giving a tree size between the minimal and maximal array tree ratio, the ones with
+    the fewest extended branches are taken and of these the one closest to the optimal ratio.
+    """
+    min_tree_size = app_config.min_array_tree_ratio * array_length
+    max_tree_size = app_config.max_array_tree_ratio * array_length
+    optimal_tree_size = app_config.optimal_array_tree_ratio * array_length
+
+    if min_dist == 0:
+        x_start = 0
+    else:
+        x_start = app_config.min_leaf_dist / min_dist
+    breakpoints = leaf_paths.breakpoints()
+
+    x_low = leaf_paths.first_scale_at_least(min_tree_size)
+    x_high = leaf_paths.last_scale_at_most(max_tree_size)
+    if x_low is None or x_high is None or x_high < max(x_low, x_start):
+        # no scale factor in range, as in optimize_scaling
+        best_x = max(x_start, get_minimal_scaling(leaf_paths))
+        return get_maximal_scaling_without_size_increase_exact(leaf_paths, best_x, breakpoints)
+    x_low = max(x_low, x_start)
+    if x_high == float('inf'):
+        x_high = max([x_low] + breakpoints)
+
+    # extension count only decreases with x, the fewest extensions are reached at the last breakpoint below x_high
+    ix = bisect.bisect_right(breakpoints, x_high) - 1
+    if ix >= 0:
+        x_low = max(x_low, breakpoints[ix])
+
+    x_optimal = leaf_paths.first_scale_at_least(optimal_tree_size)
+    if x_optimal is None:
+        x_optimal = x_high
+    best_x = min(max(x_optimal, x_low), x_high)
+    return get_maximal_scaling_without_size_increase_exact(leaf_paths, best_x, breakpoints)
+
+
+def get_maximal_scaling_without_size_increase_exact(leaf_paths: LeafPaths, prior_scale, breakpoints=None):
+    """Largest scale factor giving the same tree size as prior_scale."""
+    if breakpoints is None:
+        breakpoints = leaf_paths.breakpoints()
+    size, slope = leaf_paths.size_and_slope(prior_scale)
+    if slope > 0:
+        return prior_scale
+    new_scale = leaf_paths.last_scale_at_most(size)
+    if new_scale is None:
+        return prior_scale
+    if new_scale == float('inf'):
+        new_scale = max([prior_scale] + breakpoints)
+    return max(prior_scale, new_scale)
+
+
+def get_minimal_scaling(leaf_paths: LeafPaths):
     min_x_scale = float('inf')
-    for leaf, dist_ext_tpl in leaf_dist_ext_dict.items():
-        for ix in range(1, len(dist_ext_tpl[0])):  # skip root distance
-            distance = dist_ext_tpl[0][ix]
-            extension = dist_ext_tpl[1][ix]
-            # x * distance = extension
-            if distance == 0:
-                continue
-            min_x_scale = min(min_x_scale, extension / distance)
+    for ix in range(1, len(leaf_paths.distance)):  # skip root distance
+        if leaf_paths.leaf_count[ix] == 0:
+            continue
+        distance = leaf_paths.distance[ix]
+        extension = leaf_paths.extension[ix]
+        # x * distance = extension
+        if distance == 0:
+            continue
+        min_x_scale = min(min_x_scale, extension / distance)
     return min_x_scale
 
 
@@ -704,76 +915,30 @@ def find_new_x_range(x_values, tree_sizes, min_tree_size, max_tree_size):
     return x_start, x_end
 
 
-def evaluate_current_x(leaf_dist_ext_dict, x):
-    all_leafes_max = 0
-    extension_count = 0
-
-    for leaf, dist_ext_tpl in leaf_dist_ext_dict.items():
-        curr_leaf_max = 0
-        for ix in range(len(dist_ext_tpl[0])):
-            x_scaled_dist = x * dist_ext_tpl[0][ix]
-            if dist_ext_tpl[1][ix] > x_scaled_dist:
-                extension_count += 1
-                curr_leaf_max += dist_ext_tpl[1][ix]
-            else:
-                curr_leaf_max += x_scaled_dist
-        all_leafes_max = max(all_leafes_max, curr_leaf_max)
-
-    return all_leafes_max, extension_count
-
+def evaluate_current_x(leaf_paths: LeafPaths, x):
+    """Size of the tree and number of extended branches (summed over all leaf paths) at x scale factor x."""
+    return leaf_paths.evaluate(x)
 
-def get_leaf_dist_ext(node, distances, extensions):
-    """ Returns a dictionary of leaf names and a tuple of their distances and extensions as lists"""
 
-    distances.append(node.distance)
-    extensions.append(node.extension_length)
-
-    # If it's a leaf, return its info
-    if node.cs == 0:  # Assuming node.c is the children list
-        return {node.name: (distances.copy(), extensions.copy())}
-
-    leaf_dict = {}
-
-    # Recursively gather info from children
-    for child in node.c:
-        leaf_dict.update(get_leaf_dist_ext(child, distances.copy(), extensions.copy()))
+def evaluate_x_values(leaf_paths: LeafPaths, x_grid, x_values, tree_sizes, extension_counts):
+    """Evaluate all x scale factors of the grid and append them with their results to the given lists."""
+    for x in x_grid:
+        curr_size, curr_e_count = leaf_paths.evaluate(x)
 
-    return leaf_dict
+        x_values.append(x)
+        tree_sizes.append(curr_size)
+        extension_counts.append(curr_e_count)
 
 
-def preset_y_dynamic_vertical(node: TreeViewNode, scale_factor, max_y):
-    if node.parent is not None:
-        node.non_extension_len = node.distance * scale_factor
-        node.height = max(node.non_extension_len, node.extension_length)
-        node.y = node.parent.y + node.height
-    else:
-        node.non_extension_len = node.distance * scale_factor
-        node.height = max(node.non_extension_len, node.extension_length)
-        node.y = node.height
-    curr_max = max(max_y, node.y)
-    for node in node.c:
-        max_y = preset_y_dynamic_vertical(node, scale_factor, curr_max)
-    return max_y
-
-
-def reset_x_horizontal(node: TreeViewNode, scale_factor, max_x):
-    node.non_extension_len = node.distance * scale_factor
-    node.height = max(node.non_extension_len, node.extension_length)
-    node.x = node.height
-    if node.parent is not None:
-        node.x += node.parent.x
-    curr_max = max(max_x, node.x)
-    for node in node.c:
-        max_x = reset_x_horizontal(node, scale_factor, curr_max)
-    return max_x
+def calc_event_extension_h(node: TreeViewNode, app_config: AppConfig):
+    return max(calc_event_extension_sides(node, app_config))
 
 
-def calc_event_extension_h(node: TreeViewNode, app_config: AppConfig):
+def calc_event_extension_sides(node: TreeViewNode, app_config: AppConfig):
+    """Extent of the events above and below the branch of a node."""
     if not app_config.event_pooling:
-        height = non_pooled_ext(app_config, node)
-    else:
-        height = pooled_ext(app_config, node)
-    return height
+        return non_pooled_ext(app_config, node)
+    return pooled_ext(app_config, node)
 
 
 def count_items_pooled(nested_list):
@@ -851,8 +1016,7 @@ def pooled_ext(app_config, node):
         height_above_branch += app_config.t_edge_linewidth * 2
     if events_exist_bottom_b:
         height_below_branch += app_config.t_edge_linewidth * 2
-    height = max(height_below_branch, height_above_branch)
-    return height
+    return height_above_branch, height_below_branch
 
 
 def non_pooled_ext(app_config, node):
@@ -883,8 +1047,7 @@ def non_pooled_ext(app_config, node):
         height_above_branch += app_config.t_edge_linewidth * 2
     if events_exist_bottom_b:
         height_below_branch += app_config.t_edge_linewidth * 2
-    height = max(height_below_branch, height_above_branch)
-    return height
+    return height_above_branch, height_below_branch
 
 
 def count_items(nested_list):
@@ -911,105 +1074,135 @@ def singular_leaf_inserts(root: TreeNode):
     return leaf_sgl_inserts
 
 
-def switch_x_y(root: TreeViewNode):
-    for node in root.traverse_preorder():
-        old_x = node.x
-        old_y = node.y
-        node.y = old_x
-        node.x = old_y
+class TreeEdgesItem(QGraphicsItem):
+    """All edges of the tree in one item.
 
+    The edges are stored in blocks of NODE_BLOCK_SIZE nodes. Each block keeps the solid edge segments in one
+    QPainterPath and the dashed extension segments in a second one, so the whole tree is painted with a few
+    drawPath calls and Qt only has to index a single item. The paths are built straight from the positions in the
+    flat tree. Nodes are numbered in preorder, the nodes of a subtree are in consecutive blocks, and moving a subtree
+    only rebuilds these blocks.
+    """
+    def __init__(self, app_config: AppConfig):
+        super().__init__()
+        self.app_config = app_config
+        self.edge_pen = app_config.t_edge_pen
+        self.extension_pen = app_config.t_extension_edge_pen
+        self.flat_tree = None
+        # offset from the layout position of a node to the center of its item
+        self.center_offset = (0.0, 0.0)
+        # (edge_path, extension_path) per block of nodes
+        self.blocks = []
+        self._bounding_rect = QRectF()
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+
+    def set_tree(self, flat_tree, center_offset):
+        """Rebuild all edges of a tree."""
+        self.flat_tree = flat_tree
+        self.center_offset = center_offset
+        self.blocks = [self.produce_block_paths(start) for start in range(0, flat_tree.n_nodes, NODE_BLOCK_SIZE)]
+        self.refresh_bounds()
+
+    def move_nodes(self, node_ixs):
+        """Rebuild the edges leading to the given nodes after they moved."""
+        for block_ix in {ix // NODE_BLOCK_SIZE for ix in node_ixs}:
+            self.blocks[block_ix] = self.produce_block_paths(block_ix * NODE_BLOCK_SIZE)
+        self.refresh_bounds()
+
+    def produce_block_paths(self, start):
+        flat_tree = self.flat_tree
+        depth_pos, row_pos, parent = flat_tree.depth_pos, flat_tree.row_pos, flat_tree.parent
+        extension, non_extension_len = flat_tree.extension, flat_tree.non_extension_len
+        half_width, half_height = self.center_offset
+        show_events = self.app_config.show_events
+        extension_pos = self.app_config.t_extension_pos
+        edge_path, extension_path = QPainterPath(), QPainterPath()
+        for ix in range(start, min(start + NODE_BLOCK_SIZE, flat_tree.n_nodes)):
+            x, y = depth_pos[ix] + half_width, row_pos[ix] + half_height
+            parent_ix = parent[ix]
+            if parent_ix < 0:
+                height = flat_tree.height[ix]
+                if show_events and height > 0:
+                    extension_path.moveTo(x - height, y)
+                    extension_path.lineTo(x, y)
+                continue
 
-def create_edges(root_node: TreeViewNode, app_config: AppConfig):
-    edge_group = QGraphicsItemGroup()
-
-    for node in root_node.traverse():
-        adjusted_x = node.x + node.qnode.boundingRect().width() / 2
-        adjusted_y = node.y + node.qnode.boundingRect().height() / 2
-
-        if node.parent is None:
-            if app_config.show_events and node.height > 0:
-                line_p1 = QPointF(adjusted_x - node.height, adjusted_y)
-                line_p2 = QPointF(adjusted_x, adjusted_y)
-                line1 = QGraphicsLineItem(QLineF(line_p1, line_p2))
-                line1.setPen(app_config.t_extension_edge_pen)
-                edge_group.addToGroup(line1)
-        else:
-            adjusted_parent_x = node.parent.x + node.parent.qnode.boundingRect().width() / 2
-            adjusted_parent_y = node.parent.y + node.parent.qnode.boundingRect().height() / 2
+            parent_x = depth_pos[parent_ix] + half_width
             # Draw a vertical line from the parent's y position to the child's y position
-            line_ver = QGraphicsLineItem(QLineF(adjusted_parent_x, adjusted_parent_y, adjusted_parent_x, adjusted_y))
-            line_ver.setPen(app_config.t_edge_pen)
-            line_ver.setZValue(-2)
-            edge_group.addToGroup(line_ver)
-
-            if app_config.show_events:
-                # events caused extension should be shown in dot style
-                # ----....---- = line1, line2, line3
-                non_extended_len = node.non_extension_len
-                extension_len = node.extension_length
-
-                if extension_len == 0:
-                    line_hor = QGraphicsLineItem(QLineF(adjusted_parent_x, adjusted_y, adjusted_x, adjusted_y))
-                    line_hor.setPen(app_config.t_edge_pen)
-                    edge_group.addToGroup(line_hor)
-                else:
-                    draw_extended_h_line(app_config, edge_group, extension_len, node, non_extended_len)
+            edge_path.moveTo(parent_x, row_pos[parent_ix] + half_height)
+            edge_path.lineTo(parent_x, y)
+            # events caused extension should be shown in dot style
+            # ----....---- = line1, line2, line3
+            extension_len = extension[ix]
+            if not show_events or extension_len == 0:
+                edge_path.moveTo(parent_x, y)
+                edge_path.lineTo(x, y)
+            elif extension_pos == "center":
+                line2_x1 = parent_x + non_extension_len[ix] / 2
+                line2_x2 = line2_x1 + extension_len
+                edge_path.moveTo(parent_x, y)
+                edge_path.lineTo(line2_x1, y)
+                extension_path.moveTo(line2_x1, y)
+                extension_path.lineTo(line2_x2, y)
+                edge_path.moveTo(line2_x2, y)
+                edge_path.lineTo(x, y)
+            elif extension_pos == "node":
+                line2_x1 = parent_x + non_extension_len[ix]
+                edge_path.moveTo(parent_x, y)
+                edge_path.lineTo(line2_x1, y)
+                extension_path.moveTo(line2_x1, y)
+                extension_path.lineTo(x, y)
             else:
-                line_hor = QGraphicsLineItem(QLineF(adjusted_parent_x, adjusted_y, adjusted_x, adjusted_y))
-                line_hor.setPen(app_config.t_edge_pen)
-                line_hor.setZValue(-2)
-                edge_group.addToGroup(line_hor)
-    return edge_group
-
-
-def draw_extended_h_line(app_config, edge_group, extension_len, node, non_extended_len):
-    adjusted_x = node.x + node.qnode.boundingRect().width() / 2
-    adjusted_y = node.y + node.qnode.boundingRect().height() / 2
-    adjusted_parent_x = node.parent.x + node.parent.qnode.boundingRect().width() / 2
-
-    if app_config.t_extension_pos == "center":
-        len_l1_l3 = non_extended_len / 2
-        line1_p1 = QPointF(adjusted_parent_x, adjusted_y)
-        line1_p2 = QPointF(adjusted_parent_x + len_l1_l3, adjusted_y)
-        line2_p1 = QPointF(adjusted_parent_x + len_l1_l3, adjusted_y)
-        line2_p2 = QPointF(adjusted_parent_x + len_l1_l3 + extension_len, adjusted_y)
-        line3_p1 = QPointF(adjusted_parent_x + len_l1_l3 + extension_len, adjusted_y)
-        line3_p2 = QPointF(adjusted_x, adjusted_y)
-        line1 = QGraphicsLineItem(QLineF(line1_p1, line1_p2))
-        line2 = QGraphicsLineItem(QLineF(line2_p1, line2_p2))
-        line3 = QGraphicsLineItem(QLineF(line3_p1, line3_p2))
-        line1.setPen(app_config.t_edge_pen)
-        line2.setPen(app_config.t_extension_edge_pen)
-        line3.setPen(app_config.t_edge_pen)
-        edge_group.addToGroup(line1)
-        edge_group.addToGroup(line2)
-        edge_group.addToGroup(line3)
-    elif app_config.t_extension_pos == "node":
-
-        line1_p1 = QPointF(adjusted_parent_x, adjusted_y)
-        line1_p2 = QPointF(adjusted_parent_x + non_extended_len, adjusted_y)
-        line2_p1 = QPointF(adjusted_parent_x + non_extended_len, adjusted_y)
-        line2_p2 = QPointF(adjusted_x, adjusted_y)
-        line1 = QGraphicsLineItem(QLineF(line1_p1, line1_p2))
-        line2 = QGraphicsLineItem(QLineF(line2_p1, line2_p2))
-        line1.setPen(app_config.t_edge_pen)
-        line2.setPen(app_config.t_extension_edge_pen)
-        edge_group.addToGroup(line1)
-        edge_group.addToGroup(line2)
-    else:
-        raise ValueError("Invalid extension position")
-
-
-def draw_tree(root: TreeNode, array_length, app_config: AppConfig):
+                raise ValueError("Invalid extension position")
+        return edge_path, extension_path
+
+    def refresh_bounds(self):
+        self.prepareGeometryChange()
+        bounding_rect = QRectF()
+        for edge_path, extension_path in self.blocks:
+            bounding_rect = bounding_rect.united(edge_path.boundingRect()).united(extension_path.boundingRect())
+        margin = max(self.edge_pen.widthF(), self.extension_pen.widthF()) / 2
+        self._bounding_rect = bounding_rect.adjusted(-margin, -margin, margin, margin)
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._bounding_rect
+
+    def paint(self, painter: QPainter, option: QStyleOptionGraphicsItem, widget: Optional[QWidget] = None):
+        painter.setPen(self.edge_pen)
+        for edge_path, _ in self.blocks:
+            painter.drawPath(edge_path)
+        painter.setPen(self.extension_pen)
+        for _, extension_path in self.blocks:
+            painter.drawPath(extension_path)
+
+
+def create_edges(root_node: TreeViewNode, app_config: AppConfig) -> TreeEdgesItem:
+    edge_item = TreeEdgesItem(app_config)
+    update_edges(root_node, edge_item, app_config)
+    return edge_item
+
+
+def update_edges(root_node: TreeViewNode, edge_item: TreeEdgesItem, app_config: AppConfig, nodes=None):
+    """Set the edges to the current node positions. If only the given nodes moved, only their edges are moved."""
+    flat_tree = root_node.flat_tree
+    if nodes is not None and edge_item.flat_tree is flat_tree:
+        edge_item.move_nodes([node.ix for node in nodes])
+        return
+    # all node items have the same size
+    node_rect = root_node.qnode.boundingRect()
+    edge_item.set_tree(flat_tree, (node_rect.width() / 2, node_rect.height() / 2))
+
+
+def draw_tree(root: TreeNode, array_length, app_config: AppConfig, model: ModelContainer = None):
     tree_nodes = []
 
-    tree_view_model = TreeViewNode(root, tree_nodes, app_config)
+    tree_view_model = TreeViewNode(root, tree_nodes, app_config, model)
 
     tree_container = TreeScalingContainer(tree_view_model, array_length, app_config)
     tree_container.preset_y("dynamic")
 
-    set_x_positions(tree_container.tree_view_model, app_config)
-    switch_x_y(tree_container.tree_view_model)
+    set_x_positions(tree_container.flat_tree, app_config)
 
     tree_container.tree_view_model.set_node_positions()
 
@@ -1019,6 +1212,6 @@ def draw_tree(root: TreeNode, array_length, app_config: AppConfig):
         edge_group = create_edges(tree_container.tree_view_model, app_config)
         event_group = tree_container.tree_view_model.group_and_position_events(app_config)
     else:
-        edge_group = QGraphicsItemGroup()
+        edge_group = TreeEdgesItem(app_config)
 
     return tree_nodes, edge_group, event_group, leaf_tags, tree_container
@@ -24,6 +24,9 @@ class Ui_MainWindow(object):
         self.menuOpen_Recent = QtWidgets.QMenu(parent=self.menuFile)
         self.menuOpen_Recent.setEnabled(False)
         self.menuOpen_Recent.setObjectName("menuOpen_Recent")
+        self.menuGroups = QtWidgets.QMenu(parent=self.menubar)
+        self.menuGroups.setEnabled(False)
+        self.menuGroups.setObjectName("menuGroups")
         self.menuEdit = QtWidgets.QMenu(parent=self.menubar)
         self.menuEdit.setObjectName("menuEdit")
         self.menuView = QtWidgets.QMenu(parent=self.menubar)
@@ -200,6 +203,10 @@ class Ui_MainWindow(object):
         self.actionShow_Tags_for_Template_and_Org_Names.setChecked(True)
         self.actionShow_Tags_for_Template_and_Org_Names.setEnabled(False)
         self.actionShow_Tags_for_Template_and_Org_Names.setObjectName("actionShow_Tags_for_Template_and_Org_Names")
+        self.actionShow_All_Ancestral_Arrays = QtGui.QAction(parent=MainWindow)
+        self.actionShow_All_Ancestral_Arrays.setCheckable(True)
+        self.actionShow_All_Ancestral_Arrays.setEnabled(False)
+        self.actionShow_All_Ancestral_Arrays.setObjectName("actionShow_All_Ancestral_Arrays")
         self.actionHighlight_Singular_Leaf_Acquisions = QtGui.QAction(parent=MainWindow)
         self.actionHighlight_Singular_Leaf_Acquisions.setCheckable(True)
         self.actionHighlight_Singular_Leaf_Acquisions.setObjectName("actionHighlight_Singular_Leaf_Acquisions")
@@ -217,6 +224,10 @@ class Ui_MainWindow(object):
         self.actionSet_Tiny_Tree_Scale.setObjectName("actionSet_Tiny_Tree_Scale")
         self.actionReset_Tree_Scale = QtGui.QAction(parent=MainWindow)
         self.actionReset_Tree_Scale.setObjectName("actionReset_Tree_Scale")
+        self.actionPrevious_Group = QtGui.QAction(parent=MainWindow)
+        self.actionPrevious_Group.setObjectName("actionPrevious_Group")
+        self.actionNext_Group = QtGui.QAction(parent=MainWindow)
+        self.actionNext_Group.setObjectName("actionNext_Group")
         self.menuOpen_Recent.addAction(self.actiontest)
         self.menuFile.addAction(self.actionOpen_SpacerPlacer_Experiment)
         self.menuFile.addAction(self.menuOpen_Recent.menuAction())
@@ -228,6 +239,9 @@ class Ui_MainWindow(object):
         self.menuFile.addSeparator()
         self.menuFile.addAction(self.actionClear)
         self.menuFile.addAction(self.actionExit)
+        self.menuGroups.addAction(self.actionPrevious_Group)
+        self.menuGroups.addAction(self.actionNext_Group)
+        self.menuGroups.addSeparator()
         self.menuEdit.addAction(self.actionCopy_Image)
         self.menuEdit.addSeparator()
         self.menuView.addAction(self.actionZoom_In)
@@ -246,6 +260,7 @@ class Ui_MainWindow(object):
         self.menuArrays.addAction(self.actionShow_Template)
         self.menuArrays.addAction(self.actionShow_Original_Names)
         self.menuArrays.addAction(self.actionShow_Tags_for_Template_and_Org_Names)
+        self.menuArrays.addAction(self.actionShow_All_Ancestral_Arrays)
         self.menuArrays.addSeparator()
         self.menuArrays.addAction(self.actionCollapse_Singular_Leaf_Acquisitions)
         self.menuArrays.addAction(self.actionHighlight_Singular_Leaf_Acquisions)
@@ -270,6 +285,7 @@ class Ui_MainWindow(object):
         self.menuColors.addSeparator()
         self.menuColors.addAction(self.actionShow_Spacerfrequency_at_Distance)
         self.menubar.addAction(self.menuFile.menuAction())
+        self.menubar.addAction(self.menuGroups.menuAction())
         self.menubar.addAction(self.menuEdit.menuAction())
         self.menubar.addAction(self.menuTree.menuAction())
         self.menubar.addAction(self.menuArrays.menuAction())
@@ -286,6 +302,7 @@ class Ui_MainWindow(object):
         MainWindow.setWindowTitle(_translate("MainWindow", "MainWindow"))
         self.menuFile.setTitle(_translate("MainWindow", "File"))
         self.menuOpen_Recent.setTitle(_translate("MainWindow", "Open Recent"))
+        self.menuGroups.setTitle(_translate("MainWindow", "Groups"))
         self.menuEdit.setTitle(_translate("MainWindow", "Edit"))
         self.menuView.setTitle(_translate("MainWindow", "View"))
         self.menuWindow.setTitle(_translate("MainWindow", "Window"))
@@ -343,9 +360,12 @@ class Ui_MainWindow(object):
         self.actionNone.setText(_translate("MainWindow", "None"))
         self.actionCollapse_Singular_Leaf_Acquisitions.setText(_translate("MainWindow", "Collapse Singular Leaf Acquisitions"))
         self.actionShow_Tags_for_Template_and_Org_Names.setText(_translate("MainWindow", "Show Tags for Template and Org Names"))
+        self.actionShow_All_Ancestral_Arrays.setText(_translate("MainWindow", "Show All Ancestral Arrays"))
         self.actionHighlight_Singular_Leaf_Acquisions.setText(_translate("MainWindow", "Highlight Singular Leaf Acquisions"))
         self.actionBlinking_Highlights.setText(_translate("MainWindow", "Blinking Highlights"))
         self.actionStatic_Highlights.setText(_translate("MainWindow", "Static Black and White Highlights"))
         self.actionHighlight_Spacers_with_Duplicates.setText(_translate("MainWindow", "Highlight Spacers with Duplicates"))
         self.actionSet_Tiny_Tree_Scale.setText(_translate("MainWindow", "Set Tiny Tree Scale"))
         self.actionReset_Tree_Scale.setText(_translate("MainWindow", "Reset Tree Scale"))
+        self.actionPrevious_Group.setText(_translate("MainWindow", "Previous Group"))
+        self.actionNext_Group.setText(_translate("MainWindow", "Next Group"))
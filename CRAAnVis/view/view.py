@@ -1,27 +1,26 @@
 import os
 
 from PyQt6 import QtGui
-from PyQt6.QtWidgets import QGraphicsScene, QGraphicsView, QGraphicsSimpleTextItem, \
+from PyQt6.QtWidgets import QGraphicsView, QGraphicsSimpleTextItem, \
     QGraphicsItemGroup, QGraphicsLineItem, QMainWindow, QFileDialog, QStyle
 from PyQt6.QtGui import QNativeGestureEvent, QTransform, QBrush, QKeySequence, QActionGroup, QColor
 from PyQt6.QtCore import QPointF, QTimer, QSettings, QLineF
 
 from model.app_config import AppConfig, init_settings, store_current_settings, \
     restore_window_settings, restore_default_settings
-from model.arrays import add_array_model
-from model.model_container import ModelContainer
-from model.file_reader import read_all_folder_data
-from model.tree import produce_tree_model
+from model.group_batch import GroupBatch, find_group_folders, is_group_folder
+from model.model_cache import load_model
 from view.colors.colors import ColorManager
-from view.array_rendering.render_arrays import add_arrays_to_dict, produce_inner_array
+from view.array_rendering.render_arrays import add_arrays_to_dict, ArrayHeaderItem
 from view.exporting.exporting import print_to_pdf, print_to_png, get_sp_placer_folder_path, \
     get_save_cmap_path
 from view.legend.render_legend import prod_tr_legend_items, LegendsContainer
+from view.tooltips import LazyToolTipScene
 
 from PyQt6.QtCore import Qt, QRectF
 from PyQt6.QtGui import QPainter
 
-from view.tree_rendering.tree_view_model import draw_tree, create_edges
+from view.tree_rendering.tree_view_model import draw_tree, update_edges, refresh_group_bounds, NODE_ITEM_OFFSET
 from view.ui.main_window_ui import Ui_MainWindow
 
 
@@ -30,6 +29,9 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         super().__init__()
 
         self.model = None
+        # groups of an opened batch folder and the index of the shown group, None for a single result folder
+        self.group_batch = None
+        self.group_ix = None
         self.app_config = app_config
         init_settings()
 
@@ -37,11 +39,19 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
 
         self.ui = Ui_MainWindow()
         self.ui.setupUi(self)
-        self.scene = QGraphicsScene()
+        self.scene = LazyToolTipScene()
         self.scene.setBackgroundBrush(QBrush(QColor(255, 255, 255)))
         self.view = QGraphicsView(self.scene, self)
         self.setCentralWidget(self.view)
         self.view.setRenderHint(QPainter.RenderHint.Antialiasing)
+        # tree event items are produced for the branches that are scrolled or zoomed into view
+        self.events_timer = QTimer(self)
+        self.events_timer.setSingleShot(True)
+        self.events_timer.setInterval(0)
+        self.events_timer.timeout.connect(self.show_visible_events)
+        for scroll_bar in (self.view.horizontalScrollBar(), self.view.verticalScrollBar()):
+            scroll_bar.valueChanged.connect(lambda *args: self.events_timer.start())
+            scroll_bar.rangeChanged.connect(lambda *args: self.events_timer.start())
 
         restore_window_settings(self)
         self.restore_check_items()
@@ -52,6 +62,13 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         self.crispr_element_colors = None
         self.item_groups = None
         self.tree_view_model = None
+        # array background line of each tag name
+        self.array_bg_lines = {}
+        # names of the inner nodes whose arrays are shown, and the name tags of their rows
+        self.shown_inner_arrays = set()
+        self.inner_array_tags = {}
+        # y of the topmost leaf array in the array matrix
+        self.leaf_arrays_top_y = 0
 
     def set_tag_visibility(self, checked):
         if checked:
@@ -177,6 +194,14 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         self.ui.actionCopy_Image.triggered.connect(self.copy_image_toggled)
         self.ui.actionCopy_Image.setShortcut(QKeySequence.StandardKey.Copy)
 
+        # Groups
+        self.ui.groupActionGroup = QActionGroup(self)
+        self.ui.groupActionGroup.setExclusive(True)
+        self.ui.actionPrevious_Group.triggered.connect(lambda: self.show_group(self.group_ix - 1))
+        self.ui.actionNext_Group.triggered.connect(lambda: self.show_group(self.group_ix + 1))
+        self.ui.actionPrevious_Group.setShortcut("Ctrl+PgUp")
+        self.ui.actionNext_Group.setShortcut("Ctrl+PgDown")
+
         # Tree
         self.ui.actionPool_Evolutionary_Events.triggered.connect(self.pool_event_toggled)
         self.ui.actionExtend_Tree_Length.triggered.connect(lambda: self.adjust_tree_size(1.05))
@@ -195,6 +220,8 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             lambda checked: self.collapse_singular_leaf_acquisitions(checked))
         self.ui.actionShow_Tags_for_Template_and_Org_Names.triggered.connect(
             lambda checked: self.set_tag_visibility(checked))
+        self.ui.actionShow_All_Ancestral_Arrays.triggered.connect(
+            lambda checked: self.show_all_ancestral_arrays(checked))
         self.ui.actionHighlight_Singular_Leaf_Acquisions.triggered.connect(
             lambda checked: self.highlight_singular_leaf_acquisitions(checked))
         self.ui.actionHighlight_Spacers_with_Duplicates.triggered.connect(
@@ -205,6 +232,8 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         self.ui.actionCollapse_Singular_Leaf_Acquisitions.setEnabled(True)
         self.ui.actionShow_Tags_for_Template_and_Org_Names.setEnabled(True)
         self.ui.actionCollapse_Singular_Leaf_Acquisitions.setChecked(False)
+        self.ui.actionShow_All_Ancestral_Arrays.setEnabled(True)
+        self.ui.actionShow_All_Ancestral_Arrays.setChecked(False)
 
         # Colors
         self.ui.actionSingle_Color_Mode.setEnabled(True)
@@ -244,6 +273,7 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         self.reset_tags()
 
     def clear_toggled(self):
+        self.close_group_batch()
         self.scene.clear()
         self.setWindowTitle(self.app_config.window_title)
         self.ui.actionExport_as_Pdf.setEnabled(False)
@@ -409,84 +439,137 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         self.update_open_recent_menu_actions(self.ui.menuOpen_Recent, recent_files)
         self.setup_ui_for_showing_visualisation()
 
+        # a folder without results of its own is opened as a batch of the group folders in it
+        self.close_group_batch()
+        if not is_group_folder(folder_path):
+            group_folders = find_group_folders(folder_path)
+            if group_folders:
+                self.group_batch = GroupBatch(group_folders, self.app_config.use_model_cache,
+                                              self.app_config.max_loaded_group_models)
+                self.update_groups_menu(self.ui.menuGroups, self.group_batch.groups)
+                self.show_group(0)
+                return
+
         file_name = folder_path.split("/")[-1]
         self.app_config.file_name = file_name
         self.setWindowTitle(self.app_config.window_title + " \"" + file_name + "\"")
-        data = read_all_folder_data(folder_path)
+        self.model = load_model(folder_path, self.app_config.use_model_cache)
 
-        self.model = ModelContainer()
-        self.model.tree = produce_tree_model(data)
-        self.model = add_array_model(data, self.model)
+        self.show_redraw()
+
+    def show_group(self, group_ix):
+        """Show a group of the opened batch and prefetch the group after it."""
+        if self.group_batch is None or not 0 <= group_ix < len(self.group_batch.groups):
+            return
+        self.group_ix = group_ix
+        group = self.group_batch.groups[group_ix]
+        self.app_config.file_name = group.name
+        self.setWindowTitle(self.app_config.window_title + " \"" + group.name + "\"")
+        self.ui.groupActionGroup.actions()[group_ix].setChecked(True)
+        self.ui.actionPrevious_Group.setEnabled(group_ix > 0)
+        self.ui.actionNext_Group.setEnabled(group_ix < len(self.group_batch.groups) - 1)
+        self.setup_ui_for_showing_visualisation()
+        self.model = self.group_batch.get_model(group_ix)
 
         self.show_redraw()
+        self.group_batch.prefetch(group_ix + 1)
+
+    def update_groups_menu(self, menu, groups):
+        for action in self.ui.groupActionGroup.actions():
+            self.ui.groupActionGroup.removeAction(action)
+            menu.removeAction(action)
+            action.deleteLater()
+        for group_ix, group in enumerate(groups):
+            action = QtGui.QAction(self)
+            action.setText(group.name)
+            action.setToolTip(group.folder_path)
+            action.setCheckable(True)
+            action.triggered.connect(lambda checked=False, group_ix=group_ix: self.show_group(group_ix))
+            menu.addAction(action)
+            self.ui.groupActionGroup.addAction(action)
+        menu.setEnabled(len(groups) > 0)
+
+    def close_group_batch(self):
+        if self.group_batch is None:
+            return
+        self.group_batch.close()
+        self.group_batch = None
+        self.group_ix = None
+        self.update_groups_menu(self.ui.menuGroups, [])
 
     def closeEvent(self, event: QtGui.QCloseEvent) -> None:
         store_current_settings(self)
+        self.close_group_batch()
         super().closeEvent(event)
 
     def show_inner_array(self, name):
-        # produce array if not already done
-        if name not in self.item_groups:
-            self.item_groups[name] = produce_inner_array(name, self.model, self.app_config, self.settings)
-            # produce tag and attach to array
-            tag = QGraphicsSimpleTextItem(name)
-            tag.setFont(self.app_config.t_leaf_tag_font)
-            tag.setZValue(1)
-            tag.setParentItem(self.item_groups[name][0])
-            parent_center_y = self.item_groups[name][0].boundingRect().height() / 2
-            tag_y = parent_center_y - tag.boundingRect().height() / 2
-            tag_x = - tag.boundingRect().width() - self.app_config.array_to_tree_margin
-            tag.setPos(tag_x, tag_y)
+        """Show the array of inner node name above the leaf arrays, or hide it if it is shown.
+        Only one inner array is shown at a time, unless all ancestral arrays are shown."""
+        if name in self.shown_inner_arrays:
+            self.set_shown_inner_arrays(self.shown_inner_arrays - {name})
+        elif self.ui.actionShow_All_Ancestral_Arrays.isChecked():
+            self.set_shown_inner_arrays(self.shown_inner_arrays | {name})
+        else:
+            self.set_shown_inner_arrays({name})
 
-        # first clean up other inner arrays drawn
-        for node in self.item_groups["tree_container"].tree_view_model.traverse():
-            if node.qnode.brush().color() == Qt.GlobalColor.red:
-                node.qnode.setBrush(self.app_config.t_node_color)
-                # if item in scene remove
-                if self.item_groups[node.name][0] in self.scene.items():
-                    # move original names and template down
-                    for item in self.item_groups["original_names"]:
-                        item.moveBy(0, self.app_config.t_dummy_node_width)
-                    for item in self.item_groups["template"]:
-                        item.moveBy(0, self.app_config.t_dummy_node_width)
-                    for sp in self.item_groups[node.name]:
-                        self.scene.removeItem(sp)
-                    self.scene.update()
-
-                if name == node.name:
-                    self.reset_tags()
-                    return
-
-        # get correct position
-        # min_y = min(self.item_groups["original_names"][0].sceneBoundingRect().bottom(),
-        #             self.item_groups["template"][0].sceneBoundingRect().bottom())
-        # max_y = top of arrays
-        min_y = 0
-        array_names = self.model.get_array_names()
-        for array_name in array_names:
-            min_y = min(min_y, self.item_groups[array_name][0].sceneBoundingRect().top())
-        min_y -= self.app_config.t_dummy_node_width - self.app_config.spacer_height
-
-        x = self.item_groups["template"][0].sceneBoundingRect().left() + self.item_groups["template"][
-            0].pen().width() / 2
-
-        # then draw inner array
-        for node in self.item_groups["tree_container"].tree_view_model.traverse():
-            if node.name == name:
-                node.qnode.setBrush(QBrush(Qt.GlobalColor.red))
-                # if item not in scene add
-                if self.item_groups[name][0] not in self.scene.items():
-                    # move original names and template up
-                    for item in self.item_groups["original_names"]:
-                        item.moveBy(0, -self.app_config.t_dummy_node_width)
-                    for item in self.item_groups["template"]:
-                        item.moveBy(0, -self.app_config.t_dummy_node_width)
-                    for sp in self.item_groups[name]:
-                        sp.setPos(x, min_y)
-                        self.scene.addItem(sp)
-                    self.scene.update()
+    def show_all_ancestral_arrays(self, checked):
+        if checked:
+            self.set_shown_inner_arrays(self.model.get_inner_array_names())
+        else:
+            self.set_shown_inner_arrays(set())
+
+    def set_shown_inner_arrays(self, names):
+        """Show the arrays of the inner nodes names as rows of the array matrix, hide all others.
+        The rows are precomputed in the model, only their tags are produced here."""
+        array_matrix = self.item_groups["array_matrix"]
+        names = {name for name in names if name in array_matrix.matrix}
+        for name in self.shown_inner_arrays - names:
+            array_matrix.set_row_y(name, None)
+            self.scene.removeItem(self.inner_array_tags[name])
+            node_item = self.inner_node_item(name)
+            node_item.setBrush(self.app_config.t_node_color)
+            node_item.inner_array_is_shown = False
+        for name in names - self.shown_inner_arrays:
+            if name not in self.inner_array_tags:
+                tag = QGraphicsSimpleTextItem(name)
+                tag.setFont(self.app_config.t_leaf_tag_font)
+                tag.setZValue(1)
+                self.inner_array_tags[name] = tag
+            self.scene.addItem(self.inner_array_tags[name])
+            node_item = self.inner_node_item(name)
+            node_item.setBrush(QBrush(Qt.GlobalColor.red))
+            node_item.inner_array_is_shown = True
+        self.shown_inner_arrays = names
+        self.place_inner_arrays()
         self.reset_tags()
 
+    def inner_node_item(self, name):
+        flat_tree = self.item_groups["tree_container"].flat_tree
+        return flat_tree.nodes[flat_tree.ix_by_name[name]].qnode
+
+    def place_inner_arrays(self):
+        """Stack the shown inner arrays above the leaf arrays in the order of their nodes in the tree,
+        template and original names move up above them."""
+        array_matrix = self.item_groups["array_matrix"]
+        flat_tree = self.item_groups["tree_container"].flat_tree
+        step = self.app_config.t_dummy_node_width
+
+        def node_order(name):
+            ix = flat_tree.ix_by_name[name]
+            return flat_tree.row_pos[ix], ix
+
+        shown = sorted(self.shown_inner_arrays, key=node_order)
+        matrix_pos = array_matrix.scenePos()
+        row_y = self.leaf_arrays_top_y - len(shown) * step
+        for name in shown:
+            array_matrix.set_row_y(name, row_y)
+            tag = self.inner_array_tags[name]
+            tag_x = matrix_pos.x() - tag.boundingRect().width() - self.app_config.array_to_tree_margin
+            tag_y = matrix_pos.y() + row_y + array_matrix.height / 2 - tag.boundingRect().height() / 2
+            tag.setPos(tag_x, tag_y)
+            row_y += step
+        self.item_groups["array_header"].setY(-len(shown) * step)
+
     def highlight_spacers_with_duplicates(self, checked):
         if checked:
             for sp in self.model.template.spacers:
@@ -530,10 +613,10 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         (stretch_array_lenth, stretch_array_order,
          st_max_lenth, st_array_shift) = self.model.array_len_and_ordr_in_collapse_parts()
 
-        # names of arrays to lookout for
-        array_names = self.model.get_array_names()
-        array_names.append("template")
-        array_names.append("original_names")
+        # names of arrays to lookout for, the leaf arrays are all in the array matrix
+        array_matrix = self.item_groups["array_matrix"]
+        leaf_array_names = self.model.get_array_names()
+        array_names = ["template", "original_names"]
 
         x_sp_margin = self.settings.value("margins/x_between_crispr_elements", type=float)
 
@@ -551,8 +634,9 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
 
             for stretch_ix, stretch in enumerate(singular_stretches):
                 ixs_to_make_invisible = [ix for ix, _ in stretch]
-                stretch = [sp_name for _, sp_name in stretch]
+                stretch = {sp_name for _, sp_name in stretch}
                 last_ix = ixs_to_make_invisible[-1]
+                ixs_to_make_invisible = set(ixs_to_make_invisible)
                 # make stretch template invisable
                 for sp in self.item_groups["template"]:
                     if sp.model.index in ixs_to_make_invisible:
@@ -581,6 +665,14 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
                         if sp_name in stretch and sp_name in arrayname_sgl_ins[array_n]:
                             sp.moveBy(-shift, 0)
 
+                for array_n in leaf_array_names:
+                    if array_n not in stretch_array_order[stretch_ix].keys():
+                        continue
+                    shift = st_array_shift[stretch_ix][array_n] * x_sp_margin
+                    for sp_ix in ixs_to_make_invisible:
+                        if str(self.model.template.spacers[sp_ix].name) in arrayname_sgl_ins[array_n]:
+                            array_matrix.shift_cell(array_n, sp_ix, -shift)
+
                 for bgl in self.item_groups["array_background_lines"].childItems():
                     current_line = bgl.line()
                     new_end_x = current_line.x2() - non_stretch_shift
@@ -593,6 +685,9 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
                         sp_ix = sp.model.index
                         if sp_name not in stretch and sp_ix > last_ix:
                             sp.moveBy(-non_stretch_shift, 0)
+                array_matrix.shift_columns([sp.index for sp in self.model.template.spacers
+                                            if str(sp.name) not in stretch and sp.index > last_ix],
+                                           -non_stretch_shift)
 
         else:
             text_to_remove = " (unavailable due to collapsed arrray parts)"
@@ -607,8 +702,8 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             for name in array_names:
                 for sp in self.item_groups[name]:
                     sp.restore_pos()
-                    if name == "template" or name == "original_names":
-                        sp.setVisible(True)
+                    sp.setVisible(True)
+            array_matrix.reset_offsets()
 
             all_shifts = 0
             for stretch_ix, stretch in enumerate(singular_stretches):
@@ -629,70 +724,46 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             a_legend_end_x = new_end_x
             self.item_groups["legends"].update_array_dimensions(a_legend_start_x, a_legend_end_x)
 
-    def redraw_children_switched(self):
-        # delete old edges, bg_lines
-        self.scene.removeItem(self.item_groups["edge_group"])
-        old_obj = []
-        for item in self.item_groups["events_group"].childItems():
-            old_obj.append(item)
-            self.scene.removeItem(item)
-            self.item_groups["events_group"].removeFromGroup(item)
-        self.scene.removeItem(self.item_groups["events_group"])
-        for item in self.item_groups["array_background_lines"].childItems():
-            self.scene.removeItem(item)
-        self.item_groups["array_background_lines"] = QGraphicsItemGroup()
-
+    def redraw_children_switched(self, node_ix: int):
+        """Move the subtree of a node whose children were swapped. Its leaves swap rows among themselves, so only
+        the nodes, edges, events, tags, arrays and background lines of the subtree and its ancestors are moved."""
         tree_container = self.item_groups["tree_container"]
-        tree_container.redraw_c_swapped()
-        tree_container.tree_view_model.set_node_positions()
-        # produce new edges
-        self.item_groups["edge_group"] = create_edges(tree_container.tree_view_model, self.app_config)
-        self.scene.addItem(self.item_groups["edge_group"])
-
-        # adjust tree node offset
-        for node_item in self.item_groups["tree_nodes"]:
-            node_item.moveBy(0.5, 0.5)
-
-        # reset tag positions
-        tree_container.tree_view_model.update_leaf_tag_pos(self.item_groups["names_tags"], self.app_config)
-        max_tag_x = 0
-        for item in self.item_groups["names_tags"].values():
-            max_tag_x = max(max_tag_x, item.sceneBoundingRect().right())
-        array_pos_x = max_tag_x + self.app_config.array_to_tree_margin
-        # # reallign arrays
-        right_array_end_x = self.place_arrays_in_scene(array_pos_x, self.item_groups, self.item_groups["names_tags"],
-                                                       add_to_scene=False)
-        self.store_current_sp_positions()
+        tree_view_model = tree_container.tree_view_model
+        moved_nodes = tree_container.redraw_c_swapped(node_ix)
+        if not moved_nodes:
+            return
 
-        # # produce new bg_lines
-        self.item_groups["array_background_lines"] = QGraphicsItemGroup()
-        for name in self.item_groups["names_tags"].keys():
-            bg_line = self.produce_bg_line_from_unaligned_tag(name, self.item_groups["names_tags"], right_array_end_x)
-            self.item_groups["array_background_lines"].addToGroup(bg_line)
-        self.item_groups["array_background_lines"].setZValue(-1)
-        self.scene.addItem(self.item_groups["array_background_lines"])
+        # the edges to the children of a moved node start at its new position
+        edge_nodes = dict.fromkeys(moved_nodes)
+        for node in moved_nodes:
+            edge_nodes.update(dict.fromkeys(node.c))
+        update_edges(tree_view_model, self.item_groups["edge_group"], self.app_config, list(edge_nodes))
 
-        # # reallign tags
-        self.right_allign_tags(array_pos_x)
+        # tags, arrays and background lines follow the rows of the moved leaves
+        names_tags = self.item_groups["names_tags"]
+        array_matrix = self.item_groups.get("array_matrix")
+        for node in moved_nodes:
+            if node.name not in names_tags:
+                continue
+            tag = names_tags[node.name]
+            tag.setY(node.qnode.sceneBoundingRect().center().y() - tag.boundingRect().center().y())
+            tag_center_y = tag.sceneBoundingRect().center().y()
+            if node.name in self.array_bg_lines:
+                line = self.array_bg_lines[node.name].line()
+                self.array_bg_lines[node.name].setLine(line.x1(), tag_center_y, line.x2(), tag_center_y)
+            if array_matrix is not None and node.name in array_matrix.matrix:
+                array_matrix.set_row_y(node.name, tag_center_y - array_matrix.height / 2)
+
+        if self.shown_inner_arrays:
+            self.place_inner_arrays()
 
         # update event positions
-        self.item_groups["events_group"] = tree_container.tree_view_model.group_and_position_events(self.app_config)
-        self.scene.addItem(self.item_groups["events_group"])
+        tree_view_model.update_event_positions(self.item_groups["events_group"], self.app_config, moved_nodes)
+        self.events_timer.start()
 
     def adjust_tree_size(self, factor, position=None):
-
-        # delete old edges, bg_lines
-        self.scene.removeItem(self.item_groups["edge_group"])
-        old_obj = []
-        for item in self.item_groups["events_group"].childItems():
-            old_obj.append(item)
-            self.scene.removeItem(item)
-            self.item_groups["events_group"].removeFromGroup(item)
-        self.scene.removeItem(self.item_groups["events_group"])
-
-        for item in self.item_groups["array_background_lines"].childItems():
-            self.scene.removeItem(item)
-        self.item_groups["array_background_lines"] = QGraphicsItemGroup()
+        """Rescale the tree in x. Only positions change, so all existing items are moved instead of rebuilt.
+        Rows do not change, so tags and background lines keep their y and only the x of their tree side moves."""
 
         # rescale tree
         tree_container = self.item_groups["tree_container"]
@@ -702,57 +773,57 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             tree_container.set_scaling_min()
         else:
             tree_container.rescale_x(factor)
-        tree_container.tree_view_model.set_node_positions()
-        # produce new edges
-        self.item_groups["edge_group"] = create_edges(tree_container.tree_view_model, self.app_config)
-        self.scene.addItem(self.item_groups["edge_group"])
-
-        # adjust tree node offset
-        t_bottom_y = -float('inf')
-        t_right_x = 0
-        for node_item in self.item_groups["tree_nodes"]:
-            node_item.moveBy(0.5, 0.5)
-            t_right_x = max(t_right_x, node_item.sceneBoundingRect().right())
-            t_bottom_y = max(t_bottom_y, node_item.sceneBoundingRect().bottom())
+        tree_view_model = tree_container.tree_view_model
+        flat_tree = tree_container.flat_tree
+        tree_view_model.set_node_positions()
+        # move edges
+        if self.app_config.show_tree_edges:
+            update_edges(tree_view_model, self.item_groups["edge_group"], self.app_config)
+
+        # bounds of the node items, all of them have the same size
+        tree_nodes = self.item_groups["tree_nodes"]
+        node_rect = tree_nodes[0].boundingRect()
+        t_right_x = max(0, max(flat_tree.depth_pos) + NODE_ITEM_OFFSET + node_rect.right())
+        t_bottom_y = max(flat_tree.row_pos) + NODE_ITEM_OFFSET + node_rect.bottom()
 
-        # get old tag x
-        old_max_tag_x = 0
-        for item in self.item_groups["names_tags"].values():
-            old_max_tag_x = max(old_max_tag_x, item.sceneBoundingRect().right())
-        old_array_pos_x = old_max_tag_x + self.app_config.array_to_tree_margin
-
-        # reset tag positions
-        tree_container.tree_view_model.update_leaf_tag_pos(self.item_groups["names_tags"], self.app_config)
-        max_tag_x = 0
-        for item in self.item_groups["names_tags"].values():
-            max_tag_x = max(max_tag_x, item.sceneBoundingRect().right())
+        # the arrays start behind the rightmost tag placed next to its node
+        names_tags = self.item_groups["names_tags"]
+        tag_x = tree_view_model.leaf_tag_x(names_tags)
+        max_tag_x = max((tag_x[name] + tag.boundingRect().right() for name, tag in names_tags.items()), default=0)
+        max_tag_x = max(0, max_tag_x)
         array_pos_x = max_tag_x + self.app_config.array_to_tree_margin
 
         # move arrays according to difference in tag positions
-        additional_arrays = [node.name for node in tree_container.tree_view_model.traverse()
-                             if node.name in self.item_groups.keys() and not node.cs == 0]
-        x_diff = array_pos_x - old_array_pos_x
-        self.readjust_array_x(x_diff, additional_arrays)
-        self.store_current_sp_positions()
+        x_diff = array_pos_x - self.array_pos_x
+        if x_diff != 0:
+            self.readjust_array_x(x_diff)
+            self.store_current_sp_positions()
+        self.array_pos_x = array_pos_x
 
-        # # produce new bg_lines
+        # background lines run from the tag position next to the node to the end of the arrays
         right_array_end_x = self.item_groups["template"][-1].sceneBoundingRect().right()
-        self.item_groups["array_background_lines"] = QGraphicsItemGroup()
-        for name in self.item_groups["names_tags"].keys():
-            bg_line = self.produce_bg_line_from_unaligned_tag(name, self.item_groups["names_tags"], right_array_end_x)
-            self.item_groups["array_background_lines"].addToGroup(bg_line)
-        self.item_groups["array_background_lines"].setZValue(-1)
-        self.scene.addItem(self.item_groups["array_background_lines"])
-
-        # # reallign tags
-        self.right_allign_tags(array_pos_x)
+        for name, x in tag_x.items():
+            bg_line = self.array_bg_lines.get(name)
+            if bg_line is None:
+                bg_line = self.produce_bg_line_from_unaligned_tag(name, names_tags, right_array_end_x)
+                self.item_groups["array_background_lines"].addToGroup(bg_line)
+                self.array_bg_lines[name] = bg_line
+            y = bg_line.line().y1()
+            bg_line.setLine(x, y, right_array_end_x, y)
+        refresh_group_bounds(self.item_groups["array_background_lines"])
+
+        # tags are right aligned at the arrays, they only move when the arrays move
+        if self.tags_aligned_x != array_pos_x:
+            for tag in names_tags.values():
+                tag.setX(array_pos_x - tag.boundingRect().width() - self.app_config.array_to_tree_margin)
+            self.tags_aligned_x = array_pos_x
 
         # update event positions
-        self.item_groups["events_group"] = tree_container.tree_view_model.group_and_position_events(self.app_config)
-        self.scene.addItem(self.item_groups["events_group"])
+        tree_view_model.update_event_positions(self.item_groups["events_group"], self.app_config)
+        self.events_timer.start()
 
         new_legend_y = t_bottom_y
-        t_x_start = self.item_groups["tree_nodes"][0].sceneBoundingRect().left()
+        t_x_start = tree_nodes[0].sceneBoundingRect().left()
         t_x_end = t_right_x
 
         self.item_groups["legends"]: LegendsContainer
@@ -775,7 +846,6 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         t_right_x = 0
 
         for node_item in tree_nodes:
-            node_item.moveBy(0.5, 0.5)
             self.scene.addItem(node_item)
             t_right_x = max(t_right_x, node_item.sceneBoundingRect().right())
             t_bottom_y = max(t_bottom_y, node_item.sceneBoundingRect().bottom())
@@ -790,24 +860,26 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         scene.addItem(tags_group)
 
         array_pos_x = tags_group.sceneBoundingRect().right() + self.app_config.array_to_tree_margin
+        self.array_pos_x = array_pos_x
 
         # allign arrays
         right_array_end_x = self.place_arrays_in_scene(array_pos_x, item_groups, names_tags)
 
         # add array background lines
         self.item_groups["array_background_lines"] = QGraphicsItemGroup()
-        for name in item_groups.keys():
-            if name == "all_arrays_group" or name == "template" or name == "original_names":
-                continue
-
+        self.array_bg_lines = {}
+        for name in self.model.get_array_names():
             if name in names_tags.keys():
                 array_bg_line = self.produce_bg_line_from_unaligned_tag(name, names_tags, right_array_end_x)
                 self.item_groups["array_background_lines"].addToGroup(array_bg_line)
+                self.array_bg_lines[name] = array_bg_line
         self.scene.addItem(self.item_groups["array_background_lines"])
         self.item_groups["array_background_lines"].setZValue(-1)
 
+        self.tags_aligned_x = None
         if self.app_config.leaf_tag_alignment == "array":
             self.right_allign_tags(array_pos_x)
+            self.tags_aligned_x = array_pos_x
 
         new_legend_y = t_bottom_y
         t_x_start = tree_nodes[0].sceneBoundingRect().left()
@@ -822,38 +894,35 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
 
         self.item_groups["legends"].layout_legends()
 
-    def readjust_array_x(self, move_x_by, other_arrays=None):
-        if other_arrays is None:
-            other_arrays = []
-        arrays_to_mv = [k for k in self.item_groups['names_tags'].keys()]
-        arrays_to_mv.append("template")
-        arrays_to_mv.append("original_names")
-        for name in other_arrays:
-            arrays_to_mv.append(name)
-        for name in arrays_to_mv:
+    def readjust_array_x(self, move_x_by):
+        self.item_groups["array_matrix"].moveBy(move_x_by, 0)
+        for name in ["template", "original_names"]:
             for item in self.item_groups[name]:
                 item.moveBy(move_x_by, 0)
 
     def place_arrays_in_scene(self, array_pos_x, item_groups, names_tags, add_to_scene=True):
         min_y = self.scene.itemsBoundingRect().bottom()
-        for name in self.model.arrays_dict.keys():
-            if name == "template" or name == "original_names":
-                continue
+        array_matrix = item_groups["array_matrix"]
+        array_matrix.setPos(array_pos_x, 0)
+        for name in self.model.get_array_names():
             if name in names_tags.keys():
-                first_item = item_groups[name][0]
                 array_pos_y = (names_tags[name].sceneBoundingRect().center().y()
-                               - first_item.boundingRect().center().y())  # / 2) + 3
-                for item in item_groups[name]:
-                    item.setPos(array_pos_x, array_pos_y)
-                    if add_to_scene:
-                        self.scene.addItem(item)
+                               - array_matrix.height / 2)  # / 2) + 3
+                array_matrix.set_row_y(name, array_pos_y)
                 min_y = min(min_y, array_pos_y)
+        # inner arrays are stacked above the leaf arrays
+        self.leaf_arrays_top_y = min_y
+        if add_to_scene:
+            self.scene.addItem(array_matrix)
+            # template and original names are moved together when inner arrays are shown
+            item_groups["array_header"] = ArrayHeaderItem()
+            self.scene.addItem(item_groups["array_header"])
         if self.app_config.show_original_names and "original_names" in item_groups.keys():
             min_y = min_y - self.app_config.t_dummy_node_width
             for item in item_groups["original_names"]:
                 item.setPos(array_pos_x, min_y)
                 if add_to_scene:
-                    self.scene.addItem(item)
+                    item.setParentItem(item_groups["array_header"])
         if self.app_config.show_template and "template" in item_groups.keys():
             if self.app_config.show_original_names:
                 min_y = min_y - self.app_config.spacer_height - self.app_config.spacer_pen_width + 1
@@ -864,28 +933,36 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             for item in item_groups["template"]:
                 item.setPos(array_pos_x, min_y)
                 if add_to_scene:
-                    self.scene.addItem(item)
+                    item.setParentItem(item_groups["array_header"])
                 max_x = max(max_x, item.sceneBoundingRect().right())
         right_array_end_x = max_x
         return right_array_end_x
 
     def produce_bg_line_from_unaligned_tag(self, name, names_tags, rightmost_x):
+        array_bg_line = QGraphicsLineItem()
+        self.set_bg_line_from_unaligned_tag(array_bg_line, name, names_tags, rightmost_x)
+        array_bg_line.setPen(self.app_config.array_background_line_pen)
+        return array_bg_line
+
+    def set_bg_line_from_unaligned_tag(self, array_bg_line, name, names_tags, rightmost_x):
         node_tag_scene_brect: QRectF
         node_tag_scene_brect = names_tags[name].sceneBoundingRect()
-        array_bg_line = QGraphicsLineItem()
         bg_line_x = node_tag_scene_brect.right() + 1.5 * self.app_config.array_to_tree_margin
         bg_line_y = node_tag_scene_brect.center().y()# - self.app_config.spacer_pen_width / 2
         array_bg_line.setLine(bg_line_x, bg_line_y, rightmost_x, bg_line_y)
-        array_bg_line.setPen(self.app_config.array_background_line_pen)
-        return array_bg_line
 
     def right_allign_tags(self, rightmost_x):
+        # lines by y position, setting a line below keeps its y
+        lines_at_y = {}
+        for line in self.item_groups["array_background_lines"].childItems():
+            lines_at_y.setdefault(line.line().y1(), []).append(line)
+
         for tag in self.item_groups["names_tags"].values():
             curr_x = tag.x()
             curr_y = tag.sceneBoundingRect().center().y()# - self.app_config.spacer_pen_width / 2
             new_point = QPointF(curr_x, curr_y)# + self.app_config.spacer_pen_width / 2)
             tag.setX(rightmost_x - tag.boundingRect().width() - self.app_config.array_to_tree_margin)
-            for line in self.item_groups["array_background_lines"].childItems():
+            for line in lines_at_y.get(curr_y, []):
                 if line.line().y1() == curr_y: # - self.app_config.spacer_pen_width / 2:
                     line: QGraphicsLineItem
                     # line.setLine(new_point.x(), new_point.y(), line.line().x2(), curr_y)
@@ -924,10 +1001,7 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         # load new data
         file_name = input_folder_path.split("/")[-1]
         self.app_config.file_name = file_name
-        data = read_all_folder_data(input_folder_path)
-        self.model = ModelContainer()
-        self.model.tree = produce_tree_model(data)
-        self.model = add_array_model(data, self.model)
+        self.model = load_model(input_folder_path, self.app_config.use_model_cache)
         self.setup_color_manager()
 
         # set settings
@@ -955,7 +1029,7 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             self.app_config.color_manager.set_color_map("two_color_mode")
 
         # produce vis
-        self.scene = QGraphicsScene()
+        self.scene = LazyToolTipScene()
         self.scene.setBackgroundBrush(QBrush(QColor(255, 255, 255)))
         self.view.setScene(self.scene)
         self.produce_vis_from_model()
@@ -1011,7 +1085,7 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
 
         self.scene.deleteLater()
 
-        self.scene = QGraphicsScene()
+        self.scene = LazyToolTipScene()
         self.scene.setBackgroundBrush(QBrush(QColor(255, 255, 255)))
         self.view.setScene(self.scene)
         # self.scene.clear()
@@ -1030,6 +1104,8 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
         self.setup_color_manager()
 
         self.item_groups = dict()
+        self.shown_inner_arrays = set()
+        self.inner_array_tags = {}
         if self.app_config.show_arrays:
             self.item_groups.update(add_arrays_to_dict(self.model, self.app_config, self.settings))
 
@@ -1042,7 +1118,8 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
          self.item_groups["names_tags"],
          self.item_groups["tree_container"]) = draw_tree(self.model.tree,
                                                          array_length,
-                                                         self.app_config)
+                                                         self.app_config,
+                                                         self.model)
 
         self.item_groups["legends"] = LegendsContainer(self.app_config, self.scene)
         self.item_groups["legends"].set_t_leg_items(prod_tr_legend_items(self.app_config,
@@ -1054,15 +1131,34 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
 
     def store_current_sp_positions(self):
         # store positions
-        array_names = self.model.get_array_names()
-        array_names.append("template")
-        array_names.append("original_names")
-        for name in array_names:
+        for name in ["template", "original_names"]:
             for sp in self.item_groups[name]:
                 sp.store_pos()
 
     def fit_drawing_to_view(self):
         self.view.fitInView(self.scene.itemsBoundingRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.events_timer.start()
+
+    def show_visible_events(self):
+        """Produce the event items of the branches in view, once the zoom level is large enough to show them."""
+        if self.item_groups is None or self.item_groups.get("events_group") is None:
+            return
+        if self.app_config.level_of_detail and self.view.transform().m11() < self.app_config.lod_flat_scale:
+            return
+        visible_rect = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        self.item_groups["tree_container"].tree_view_model.show_events_in_rect(self.item_groups["events_group"],
+                                                                               visible_rect, self.app_config)
+
+    def show_all_events(self):
+        """Produce the event items of all branches, e.g. before exporting the scene."""
+        if self.item_groups is None or self.item_groups.get("events_group") is None:
+            return
+        self.item_groups["tree_container"].tree_view_model.show_events_in_rect(self.item_groups["events_group"],
+                                                                               QRectF(), self.app_config)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.events_timer.start()
 
     def load_color_map(self):
         file_path, _ = QFileDialog.getOpenFileName(self,
@@ -1092,7 +1188,7 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
     def setup_color_manager(self):
         two_color_mode = self.settings.value("colors/two_color_mode", type=bool)
         self.app_config.color_manager = ColorManager(self.app_config, self.model,
-                                                     two_color_mode)  # , self.update_array_legend)
+                                                     two_color_mode, self.scene)  # , self.update_array_legend)
         color_options = self.app_config.color_manager.metadata_color_options()
         self.ui.menuColor_By_Metadata.setEnabled(True)
         self.update_color_by_metadata(self.ui.menuColor_By_Metadata, color_options)
@@ -1116,13 +1212,8 @@ class CrAAnVisView(QMainWindow, Ui_MainWindow):
             zoom = min_zoom
         elif zoom > max_zoom:
             zoom = max_zoom
-        if zoom < 0.2:
-            if self.app_config.color_manager.current_map_name != "sp_frequency":
-                self.app_config.color_manager.set_color_map("sp_frequency")
-        else:
-            if self.app_config.color_manager.current_map_name == "sp_frequency":
-                self.app_config.color_manager.set_color_map(self.app_config.color_manager.cmap_previous_to_zoom)
         self.view.setTransform(QTransform.fromScale(zoom, zoom))
+        self.events_timer.start()
 
     def event(self, event):
         if isinstance(event, QNativeGestureEvent) and event.gestureType() == Qt.NativeGestureType.ZoomNativeGesture: